@@ -0,0 +1,162 @@
+"""Packed binary encoding for watcher valuation band exports.
+
+A ``.vbnd`` file carries the same points as ``valuation/{symbol}/{metric}/
+{window}.json`` in a layout a browser can map straight onto typed arrays.
+All integers and floats are little-endian::
+
+    offset  size  field
+    0       4     magic ``b"VBND"``
+    4       1     format version (1)
+    5       1     day-offset width in bytes (2 = int16, 4 = int32)
+    6       2     header length ``H`` (uint16)
+    8       H     UTF-8 JSON header, space-padded so the next section is
+                  4-byte aligned
+    ...     N*w   day offsets from ``header["baseDate"]`` (int16 or int32),
+                  zero-padded to a 4-byte boundary
+    ...     N*4   one float32 array per entry of ``header["series"]``:
+                  price, mean, up1, up2, down1, down2
+
+``N`` is ``header["count"]``.  Missing values are NaN.  Every section starts
+on a 4-byte boundary, so ``new Float32Array(buffer, offset, N)`` works
+without copying.  Float32 keeps about seven significant digits, which is
+well past the precision the watcher charts.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import struct
+import sys
+from array import array
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+MAGIC = b"VBND"
+FORMAT_VERSION = 1
+SERIES = ("price", "mean", "up1", "up2", "down1", "down2")
+_PREFIX = struct.Struct("<4sBBH")
+_INT16_MAX = 32767
+
+
+class BandCodecError(ValueError):
+    pass
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _pad(length: int) -> int:
+    return -length % 4
+
+
+def _float(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return math.nan
+    return float(value)
+
+
+def encode_bands(payload: Dict[str, Any]) -> bytes:
+    """Pack an ``export_valuation`` payload into the ``.vbnd`` layout."""
+
+    points = payload.get("points")
+    if not isinstance(points, list) or not points:
+        raise BandCodecError("band payload has no points")
+    try:
+        days = [date.fromisoformat(str(point["date"])[:10]) for point in points]
+    except (KeyError, TypeError, ValueError) as error:
+        raise BandCodecError(f"band payload has an invalid date: {error}") from error
+    base = days[0]
+    offsets = [(day - base).days for day in days]
+    if any(later < earlier for earlier, later in zip(offsets, offsets[1:])):
+        raise BandCodecError("band points are not in date order")
+    width = 2 if offsets[-1] <= _INT16_MAX else 4
+
+    header = {
+        "schemaVersion": payload.get("schemaVersion"),
+        "symbol": payload.get("symbol"),
+        "metric": payload.get("metric"),
+        "window": payload.get("window"),
+        "generatedAt": payload.get("generatedAt"),
+        "dataAsOf": payload.get("dataAsOf"),
+        "baseDate": base.isoformat(),
+        "count": len(points),
+        "series": list(SERIES),
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * _pad(_PREFIX.size + len(header_bytes))
+    if len(header_bytes) > 0xFFFF:
+        raise BandCodecError("band header is too large")
+
+    offset_bytes = _little_endian(array("h" if width == 2 else "i", offsets))
+    chunks = [
+        _PREFIX.pack(MAGIC, FORMAT_VERSION, width, len(header_bytes)),
+        header_bytes,
+        offset_bytes,
+        b"\0" * _pad(len(offset_bytes)),
+    ]
+    for name in SERIES:
+        if name == "price":
+            values = [_float(point.get("price")) for point in points]
+        else:
+            values = [_float((point.get("bands") or {}).get(name)) for point in points]
+        chunks.append(_little_endian(array("f", values)))
+    return b"".join(chunks)
+
+
+def decode_bands(data: bytes) -> Dict[str, Any]:
+    """Unpack a ``.vbnd`` file into its header, ISO dates and series lists."""
+
+    if len(data) < _PREFIX.size:
+        raise BandCodecError("band file is truncated")
+    magic, version, width, header_length = _PREFIX.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or width not in (2, 4):
+        raise BandCodecError("not a supported band file")
+    position = _PREFIX.size
+    try:
+        header = json.loads(data[position:position + header_length].decode("utf-8"))
+        count = int(header["count"])
+        series = list(header["series"])
+        base = date.fromisoformat(header["baseDate"])
+    except (UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as error:
+        raise BandCodecError(f"band header is invalid: {error}") from error
+    position += header_length
+    offset_length = count * width
+    expected = position + offset_length + _pad(offset_length) + 4 * count * len(series)
+    if len(data) != expected:
+        raise BandCodecError(f"band file is {len(data)} bytes, expected {expected}")
+
+    offsets = _from_little_endian("h" if width == 2 else "i", data[position:position + offset_length])
+    position += offset_length + _pad(offset_length)
+    values: Dict[str, List[Optional[float]]] = {}
+    for name in series:
+        column = _from_little_endian("f", data[position:position + 4 * count])
+        values[name] = [None if math.isnan(value) else value for value in column]
+        position += 4 * count
+    return {
+        "header": header,
+        "dates": [(base + timedelta(days=offset)).isoformat() for offset in offsets],
+        "series": values,
+    }
+
+
+__all__ = [
+    "BandCodecError",
+    "FORMAT_VERSION",
+    "MAGIC",
+    "SERIES",
+    "decode_bands",
+    "encode_bands",
+]
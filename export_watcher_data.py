@@ -8,17 +8,42 @@ from __future__ import annotations
 
 import json
 import argparse
-from datetime import datetime, timezone
+import gzip
+import hashlib
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
-from ticker_universe import UniverseValidationError, deduplicate_symbols
+from band_codec import BandCodecError, encode_bands
+from ticker_universe import UniverseValidationError, deduplicate_symbols, select_shard
+
+try:
+    import brotli
+except ImportError:  # optional; precompressed releases then carry gzip siblings only
+    brotli = None
 
 
 SCHEMA_VERSION = "1.0"
+DEFAULT_RESULTS_DIR = Path("data/results")
+DEFAULT_PROCESSED_DIR = Path("data/processed")
+DEFAULT_OUTPUT_DIR = Path("data/watcher_exports")
 MAX_EXPORT_BYTES = 64 * 1024 * 1024
 METRICS = ("pe", "fcf", "ps")
 WINDOWS = ("1Y", "2Y", "3Y", "5Y")
+BAND_KEYS = ("mean", "up1", "up2", "down1", "down2")
+# Daily points per valuation export (one trading year).
+EXPORT_POINTS = 252
+# Resolution pyramid: daily covers the last EXPORT_POINTS rows, weekly the
+# last WEEKLY_LOOKBACK_DAYS and monthly the whole history.  Each level is
+# published as ``{window}{suffix}.json``; releases carry the weekly and
+# monthly levels only when built with ``pyramid=True``.
+RESOLUTIONS = {"daily": "", "weekly": ".weekly", "monthly": ".monthly"}
+WEEKLY_LOOKBACK_DAYS = 5 * 365
+# R2 expires release prefixes after 14 days; an object is only referenced from
+# an earlier release while that release is comfortably inside the window.
+REUSE_MAX_AGE_DAYS = 7
 FINANCIAL_FIELDS = (
     "revenue",
     "netIncome",
@@ -48,14 +73,187 @@ def read_json(path: Path) -> Any:
         raise ExportValidationError(f"Cannot read {path}: {error}") from error
 
 
-def write_json(path: Path, body: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(body, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+def encode_json(body: Any) -> bytes:
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    # mtime=0 keeps the header free of timestamps, so unchanged input stays byte-identical.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+# Precompressed siblings written next to every artifact when a release opts in:
+# encoding -> (suffix, compressor).
+COMPRESSORS: dict[str, tuple[str, Any]] = {"gzip": (".gz", gzip_bytes)}
+if brotli is not None:
+    COMPRESSORS["br"] = (".br", brotli.compress)
+BUDGET_ENCODINGS = ("raw", "gzip", "br")
+
+
+class ReleaseWriter:
+    """Stream artifacts into a staging directory and promote it as one release.
+
+    Each body is encoded once and written immediately, so memory is bounded by
+    one symbol rather than the universe.  Once the byte budget is exceeded,
+    later artifacts are only measured so the abort message still reports the
+    full size.  The staging directory replaces ``output_dir`` only on
+    :meth:`promote`; :meth:`discard` leaves the previous release untouched.
+
+    With ``precompress`` every artifact also gets a sibling per entry in
+    ``COMPRESSORS``; it is off by default because each sibling is one more
+    object to publish.  ``budget_encoding`` selects which size counts against
+    the byte budget, with or without siblings.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        max_export_bytes: int = MAX_EXPORT_BYTES,
+        budget_encoding: str = "raw",
+        precompress: bool = False,
+    ) -> None:
+        if budget_encoding not in BUDGET_ENCODINGS:
+            raise ExportValidationError(f"Unknown budget encoding: {budget_encoding}")
+        if budget_encoding != "raw" and budget_encoding not in COMPRESSORS:
+            raise ExportValidationError(f"Budget encoding {budget_encoding} requires the brotli package")
+        self.output_dir = output_dir
+        self.max_export_bytes = max_export_bytes
+        self.budget_encoding = budget_encoding
+        self.encodings = list(COMPRESSORS) if precompress else []
+        self.staging_dir = output_dir.with_name(f".{output_dir.name}.{os.getpid()}.staging")
+        self.bytes_written = 0
+        self.objects: dict[str, dict[str, Any]] = {}
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        self.staging_dir.mkdir(parents=True)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.bytes_written > self.max_export_bytes
+
+    def write(self, relative_path: Path, body: Any) -> int:
+        return self.write_bytes(relative_path, encode_json(body))
+
+    def write_bytes(self, relative_path: Path, data: bytes) -> int:
+        compressed = {encoding: COMPRESSORS[encoding][1](data) for encoding in self.encodings}
+        if self.budget_encoding == "raw":
+            budget_size = len(data)
+        elif self.budget_encoding in compressed:
+            budget_size = len(compressed[self.budget_encoding])
+        else:
+            budget_size = len(COMPRESSORS[self.budget_encoding][1](data))
+        self.bytes_written += budget_size
+        entry: dict[str, Any] = {"sha256": hashlib.sha256(data).hexdigest(), "bytes": len(data)}
+        if compressed:
+            entry["encodings"] = {encoding: len(payload) for encoding, payload in compressed.items()}
+        self.objects[relative_path.as_posix()] = entry
+        if not self.over_budget:
+            path = self.staging_dir / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            for encoding, payload in compressed.items():
+                path.with_name(path.name + COMPRESSORS[encoding][0]).write_bytes(payload)
+        return budget_size
+
+    def check_budget(self) -> None:
+        if self.over_budget:
+            label = "slim payload" if self.budget_encoding == "raw" else f"slim {self.budget_encoding} payload"
+            raise ExportValidationError(
+                f"Export aborted; {label} is {self.bytes_written} bytes, exceeding the {self.max_export_bytes} byte limit"
+            )
+
+    def promote(self) -> None:
+        self.check_budget()
+        previous_dir = self.output_dir.with_name(f".{self.output_dir.name}.{os.getpid()}.previous")
+        shutil.rmtree(previous_dir, ignore_errors=True)
+        if self.output_dir.exists():
+            os.replace(self.output_dir, previous_dir)
+        try:
+            os.replace(self.staging_dir, self.output_dir)
+        except OSError:
+            if previous_dir.exists():
+                os.replace(previous_dir, self.output_dir)
+            raise
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+    def discard(self) -> None:
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+def parse_timestamp(value: Any) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(str(value or "").replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def resolve_objects(
+    objects: dict[str, dict[str, Any]],
+    previous_manifest: dict[str, Any] | None,
+    release_id: str,
+    generated_at: str,
+) -> dict[str, dict[str, Any]]:
+    """Locate every object: the prior release holding identical bytes, or this one.
+
+    Reused objects keep the release they were first uploaded to, so a chain of
+    unchanged releases still points at real bytes.  Anything the previous
+    manifest cannot vouch for is uploaded again.
+    """
+    previous_objects = (previous_manifest or {}).get("objects")
+    if not isinstance(previous_objects, dict):
+        previous_objects = {}
+    now = parse_timestamp(generated_at)
+    resolved: dict[str, dict[str, Any]] = {}
+    for key, entry in sorted(objects.items()):
+        prior = previous_objects.get(key)
+        released_at = parse_timestamp(prior.get("releasedAt")) if isinstance(prior, dict) else None
+        if (
+            isinstance(prior, dict)
+            and prior.get("sha256") == entry["sha256"]
+            and prior.get("release")
+            and released_at is not None
+            and now is not None
+            and now - released_at <= timedelta(days=REUSE_MAX_AGE_DAYS)
+        ):
+            resolved[key] = {**entry, "release": prior["release"], "releasedAt": prior["releasedAt"]}
+        else:
+            resolved[key] = {**entry, "release": release_id, "releasedAt": generated_at}
+    return resolved
+
+
+def delta_plan(manifest: dict[str, Any]) -> dict[str, Any]:
+    """Split a release into objects to upload and objects served by earlier releases."""
+    release_id = manifest["releaseId"]
+    upload = ["manifest.json", *(f"manifest.json{COMPRESSORS[encoding][0]}" for encoding in manifest.get("encodings", []) if encoding in COMPRESSORS)]
+    reuse: dict[str, str] = {}
+    upload_bytes = reused_bytes = 0
+    for key, entry in manifest["objects"].items():
+        siblings = [key, *(key + COMPRESSORS[encoding][0] for encoding in entry.get("encodings", {}) if encoding in COMPRESSORS)]
+        size = entry["bytes"] + sum(entry.get("encodings", {}).values())
+        if entry["release"] == release_id:
+            upload.extend(siblings)
+            upload_bytes += size
+        else:
+            reuse.update((sibling, entry["release"]) for sibling in siblings)
+            reused_bytes += size
+    return {
+        "schemaVersion": SCHEMA_VERSION,
+        "releaseId": release_id,
+        "previousReleaseId": manifest.get("previousReleaseId"),
+        "upload": upload,
+        "reuse": reuse,
+        "uploadBytes": upload_bytes,
+        "reusedBytes": reused_bytes,
+    }
 
 
-def encoded_json_size(body: Any) -> int:
-    """Measure exactly what write_json would publish, before creating any artifacts."""
-    return len(json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+def load_previous_manifest(path: Path) -> dict[str, Any] | None:
+    if not path.is_file():
+        return None
+    body = read_json(path)
+    if not isinstance(body, dict) or body.get("schemaVersion") != SCHEMA_VERSION:
+        raise ExportValidationError(f"previous manifest {path} has an unsupported schema")
+    return body
 
 
 def normalize_timestamp(value: Any, context: str) -> str:
@@ -82,26 +280,81 @@ def require_symbol(value: Any, path: Path) -> str:
 def latest_valuation_point(rows: list[dict[str, Any]]) -> dict[str, Any]:
     if not rows:
         raise ExportValidationError("Valuation data has no history")
-    ordered = sorted(rows, key=lambda row: str(row.get("date", "")))
-    latest = ordered[-1]
+    latest = max(rows, key=lambda row: str(row.get("date", "")))
     if not isinstance(latest.get("date"), str) or not isinstance(latest.get("valuation"), dict):
         raise ExportValidationError("Valuation history has an invalid final row")
     return latest
 
 
-def export_valuation(summary: dict[str, Any], symbol: str, metric: str, window: str) -> dict[str, Any]:
+def valuation_history(summary: dict[str, Any], symbol: str) -> list[dict[str, Any]]:
     rows = summary.get("data")
     if not isinstance(rows, list):
         raise ExportValidationError(f"{symbol} valuation data is not a list")
     ordered = sorted((row for row in rows if isinstance(row, dict)), key=lambda row: str(row.get("date", "")))
     if not ordered:
         raise ExportValidationError(f"{symbol} valuation data is empty")
+    return ordered
+
+
+def valuation_tail(summary: dict[str, Any], symbol: str) -> list[dict[str, Any]]:
+    """Sort a summary's history once and return the newest EXPORT_POINTS rows."""
+    return valuation_history(summary, symbol)[-EXPORT_POINTS:]
+
+
+def _period_key(day: str, resolution: str) -> str:
+    if resolution == "monthly":
+        return day[:7]
+    year, week, _ = datetime.fromisoformat(day[:10]).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def downsample(rows: list[dict[str, Any]], resolution: str) -> list[dict[str, Any]]:
+    """Aggregate sorted daily rows into one row per ISO week or calendar month.
+
+    The price is the period's last close, dated on its last trading day, so
+    the newest point always matches the daily series.  Each band line is the
+    mean of its values over the period; days without the band are ignored.
+    """
+    periods: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        if isinstance(row.get("date"), str):
+            periods.setdefault(_period_key(row["date"], resolution), []).append(row)
+    aggregated: list[dict[str, Any]] = []
+    for members in periods.values():
+        valuation: dict[str, dict[str, Any]] = {}
+        for window in WINDOWS:
+            for metric in METRICS:
+                bands = [row.get("valuation", {}).get(window, {}).get(metric) for row in members]
+                bands = [band for band in bands if isinstance(band, dict)]
+                if not bands:
+                    continue
+                averaged: dict[str, Any] = {}
+                for key in BAND_KEYS:
+                    values = [band[key] for band in bands if isinstance(band.get(key), (int, float)) and not isinstance(band.get(key), bool)]
+                    averaged[key] = round(sum(values) / len(values), 4) if values else None
+                valuation.setdefault(window, {})[metric] = averaged
+        aggregated.append({"date": members[-1]["date"], "price": members[-1].get("price"), "valuation": valuation})
+    return aggregated
+
+
+def export_valuation(
+    summary: dict[str, Any],
+    symbol: str,
+    metric: str,
+    window: str,
+    *,
+    tail: list[dict[str, Any]] | None = None,
+    generated_at: str | None = None,
+    resolution: str = "daily",
+) -> dict[str, Any]:
+    if tail is None:
+        tail = valuation_tail(summary, symbol)
     points: list[dict[str, Any]] = []
-    for row in ordered[-252:]:
+    for row in tail:
         bands = row.get("valuation", {}).get(window, {}).get(metric)
         if not isinstance(bands, dict) or not isinstance(row.get("date"), str):
             continue
-        points.append({"date": row["date"], "price": row.get("price"), "bands": {key: bands.get(key) for key in ("mean", "up1", "up2", "down1", "down2")}})
+        points.append({"date": row["date"], "price": row.get("price"), "bands": {key: bands.get(key) for key in BAND_KEYS}})
     if not points:
         raise ExportValidationError(f"{symbol} has no {metric}/{window} valuation points")
     latest = points[-1]
@@ -109,15 +362,64 @@ def export_valuation(summary: dict[str, Any], symbol: str, metric: str, window:
         "schemaVersion": SCHEMA_VERSION,
         "source": "ValuationCalculation hybrid valuation model",
         "symbol": symbol,
-        "generatedAt": normalize_timestamp(summary.get("last_updated"), f"{symbol} valuation"),
+        "generatedAt": generated_at or normalize_timestamp(summary.get("last_updated"), f"{symbol} valuation"),
         "dataAsOf": latest["date"],
         "metric": metric,
         "window": window,
+        "resolution": resolution,
         "latest": latest,
         "points": points,
     }
 
 
+def export_valuations(summary: dict[str, Any], symbol: str) -> dict[tuple[str, str], dict[str, Any]]:
+    """Emit every metric/window payload from one sorted, sliced view of the summary."""
+    tail = valuation_tail(summary, symbol)
+    generated_at = normalize_timestamp(summary.get("last_updated"), f"{symbol} valuation")
+    return {
+        (metric, window): export_valuation(summary, symbol, metric, window, tail=tail, generated_at=generated_at)
+        for metric in METRICS
+        for window in WINDOWS
+    }
+
+
+def export_pyramid(summary: dict[str, Any], symbol: str) -> dict[tuple[str, str, str], dict[str, Any]]:
+    """Emit every metric/window payload at every resolution from one sorted history.
+
+    Downsampled bands are period means, so every level reports the newest
+    daily point as ``latest``.
+    """
+    history = valuation_history(summary, symbol)
+    generated_at = normalize_timestamp(summary.get("last_updated"), f"{symbol} valuation")
+    cutoff = (datetime.fromisoformat(str(history[-1].get("date"))[:10]) - timedelta(days=WEEKLY_LOOKBACK_DAYS)).date().isoformat()
+    levels = {
+        "daily": history[-EXPORT_POINTS:],
+        "weekly": downsample([row for row in history if str(row.get("date", "")) >= cutoff], "weekly"),
+        "monthly": downsample(history, "monthly"),
+    }
+    payloads = {
+        (metric, window, resolution): export_valuation(
+            summary, symbol, metric, window, tail=levels[resolution], generated_at=generated_at, resolution=resolution
+        )
+        for resolution in RESOLUTIONS
+        for metric in METRICS
+        for window in WINDOWS
+    }
+    for (metric, window, resolution), payload in payloads.items():
+        if resolution != "daily":
+            payload["latest"] = payloads[(metric, window, "daily")]["latest"]
+    return payloads
+
+
+def resolution_index(resolutions: tuple[str, ...] = tuple(RESOLUTIONS)) -> dict[str, dict[str, Any]]:
+    """Describe each published pyramid level for the manifest."""
+    spans = {"daily": {"maxPoints": EXPORT_POINTS}, "weekly": {"lookbackDays": WEEKLY_LOOKBACK_DAYS}, "monthly": {}}
+    return {
+        resolution: {"path": f"valuation/{{symbol}}/{{metric}}/{{window}}{RESOLUTIONS[resolution]}.json", **spans[resolution]}
+        for resolution in resolutions
+    }
+
+
 def export_financials(rows: Any, symbol: str, generated_at: str) -> dict[str, Any]:
     if not isinstance(rows, list):
         raise ExportValidationError(f"{symbol} earnings report is not a list")
@@ -179,11 +481,47 @@ def export_all(
     generated_at: str | None = None,
     max_export_bytes: int = MAX_EXPORT_BYTES,
     expected_symbols: list[str] | None = None,
+    previous_manifest: dict[str, Any] | None = None,
+    release_id: str | None = None,
+    budget_encoding: str = "raw",
+    binary_bands: bool = False,
+    precompress: bool = False,
+    pyramid: bool = False,
 ) -> dict[str, Any]:
     generated_at = generated_at or datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    writer = ReleaseWriter(output_dir, max_export_bytes, budget_encoding, precompress)
+    try:
+        manifest = _stream_release(
+            writer,
+            results_dir,
+            processed_dir,
+            generated_at,
+            expected_symbols,
+            previous_manifest,
+            release_id or generated_at,
+            binary_bands,
+            pyramid,
+        )
+        writer.promote()
+    finally:
+        writer.discard()
+    return manifest
+
+
+def _stream_release(
+    writer: ReleaseWriter,
+    results_dir: Path,
+    processed_dir: Path,
+    generated_at: str,
+    expected_symbols: list[str] | None,
+    previous_manifest: dict[str, Any] | None,
+    release_id: str,
+    binary_bands: bool,
+    pyramid: bool = False,
+) -> dict[str, Any]:
+    resolutions = tuple(RESOLUTIONS) if pyramid else ("daily",)
     manifests: list[dict[str, Any]] = []
     failures: list[str] = []
-    staged: list[tuple[Path, Any]] = []
     summary_paths = (
         [results_dir / symbol / "valuation_summary.json" for symbol in expected_symbols]
         if expected_symbols is not None
@@ -197,12 +535,29 @@ def export_all(
             symbol = require_symbol(summary.get("ticker"), summary_path)
             earnings_path = processed_dir / f"{symbol}_combined.json"
             earnings = read_json(earnings_path)
-            financials = export_financials(earnings, symbol, generated_at)
-            staged.append((Path("financials") / f"{symbol}.json", financials))
-            for metric in METRICS:
-                for window in WINDOWS:
-                    staged.append((Path("valuation") / symbol / metric / f"{window}.json", export_valuation(summary, symbol, metric, window)))
-            manifests.append({"symbol": symbol, "dataAsOf": min(str(summary.get("last_updated") or ""), financials["dataAsOf"]), "financials": f"financials/{symbol}.json", "valuationMetrics": list(METRICS), "windows": list(WINDOWS)})
+            # Stamp financials with the symbol's run time, not the export time, so
+            # unchanged symbols produce identical bytes and can be reused.
+            symbol_generated_at = normalize_timestamp(summary.get("last_updated"), f"{symbol} valuation")
+            financials = export_financials(earnings, symbol, symbol_generated_at)
+            # Validate every payload for the symbol before any of it is streamed.
+            if pyramid:
+                valuations = export_pyramid(summary, symbol)
+            else:
+                valuations = {(metric, window, "daily"): valuation for (metric, window), valuation in export_valuations(summary, symbol).items()}
+            try:
+                packed = {key: encode_bands(valuation) for key, valuation in valuations.items()} if binary_bands else {}
+            except BandCodecError as error:
+                raise ExportValidationError(f"{symbol} band export cannot be packed: {error}") from error
+            writer.write(Path("financials") / f"{symbol}.json", financials)
+            for (metric, window, resolution), valuation in valuations.items():
+                stem = Path("valuation") / symbol / metric / f"{window}{RESOLUTIONS[resolution]}"
+                writer.write(stem.with_name(stem.name + ".json"), valuation)
+                if (metric, window, resolution) in packed:
+                    writer.write_bytes(stem.with_name(stem.name + ".vbnd"), packed[(metric, window, resolution)])
+            entry = {"symbol": symbol, "dataAsOf": min(str(summary.get("last_updated") or ""), financials["dataAsOf"]), "financials": f"financials/{symbol}.json", "valuationMetrics": list(METRICS), "windows": list(WINDOWS), "resolutions": list(resolutions)}
+            if binary_bands:
+                entry["bandFormats"] = ["json", "vbnd"]
+            manifests.append(entry)
         except ExportValidationError as error:
             failures.append(f"{summary_path.parent.name}: {error}")
     if failures:
@@ -217,15 +572,18 @@ def export_all(
             if missing:
                 details.append("missing=" + ",".join(missing))
             raise ExportValidationError("Export aborted; ticker universe does not match completed exports: " + "; ".join(details))
-    manifest = {"schemaVersion": SCHEMA_VERSION, "generatedAt": generated_at, "source": "ValuationCalculation", "symbols": manifests}
-    export_bytes = encoded_json_size(manifest) + sum(encoded_json_size(body) for _, body in staged)
-    if export_bytes > max_export_bytes:
-        raise ExportValidationError(
-            f"Export aborted; slim payload is {export_bytes} bytes, exceeding the {max_export_bytes} byte limit"
-        )
-    for relative_path, body in staged:
-        write_json(output_dir / relative_path, body)
-    write_json(output_dir / "manifest.json", manifest)
+    manifest = {
+        "schemaVersion": SCHEMA_VERSION,
+        "generatedAt": generated_at,
+        "source": "ValuationCalculation",
+        "releaseId": release_id,
+        "previousReleaseId": (previous_manifest or {}).get("releaseId"),
+        "resolutions": resolution_index(resolutions),
+        "encodings": list(writer.encodings),
+        "symbols": manifests,
+        "objects": resolve_objects(writer.objects, previous_manifest, release_id, generated_at),
+    }
+    writer.write(Path("manifest.json"), manifest)
     return manifest
 
 
@@ -240,9 +598,84 @@ def load_expected_symbols(path: Path) -> list[str]:
         raise ExportValidationError(f"resolved-symbol file is invalid: {error}") from error
 
 
-if __name__ == "__main__":
+def merge_shard_symbols(paths: list[Path]) -> list[str]:
+    """Validate per-shard resolved-symbol files and return the full universe.
+
+    Every shard must agree on the universe and shard count, each shard index
+    must appear exactly once, and each file must hold exactly the symbols the
+    hash partition assigns to it, so together they cover the universe once.
+    """
+    universe: list[str] | None = None
+    count: int | None = None
+    seen: dict[int, Path] = {}
+    for path in paths:
+        body = read_json(path)
+        shard = body.get("shard") if isinstance(body, dict) else None
+        if not isinstance(shard, dict):
+            raise ExportValidationError(f"{path} is not a shard resolved-symbol file")
+        try:
+            shard_universe = deduplicate_symbols(shard.get("universe") or [])
+            symbols = deduplicate_symbols(body.get("symbols") or [])
+        except UniverseValidationError as error:
+            raise ExportValidationError(f"{path} is invalid: {error}") from error
+        index, shard_count = shard.get("index"), shard.get("count")
+        if universe is None:
+            universe, count = shard_universe, shard_count
+        if shard_universe != universe or shard_count != count:
+            raise ExportValidationError(f"{path} was resolved against a different universe or shard count")
+        if not isinstance(index, int) or not isinstance(count, int) or not 1 <= index <= count:
+            raise ExportValidationError(f"{path} has an invalid shard index")
+        if index in seen:
+            raise ExportValidationError(f"{path} repeats shard {index}/{count} from {seen[index]}")
+        if symbols != select_shard(universe, index, count):
+            raise ExportValidationError(f"{path} does not hold the symbols of shard {index}/{count}")
+        seen[index] = path
+    if universe is None or count is None:
+        raise ExportValidationError("No shard resolved-symbol files were given")
+    missing = [index for index in range(1, count + 1) if index not in seen]
+    if missing:
+        raise ExportValidationError("Export aborted; missing shards: " + ",".join(f"{index}/{count}" for index in missing))
+    if not universe:
+        raise ExportValidationError("Export aborted; the sharded universe is empty")
+    return universe
+
+
+def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Build validated Stock Watcher exports.")
-    parser.add_argument("--expected-symbols-file", type=Path)
-    args = parser.parse_args()
+    symbols_group = parser.add_mutually_exclusive_group()
+    symbols_group.add_argument("--expected-symbols-file", type=Path)
+    symbols_group.add_argument("--merge-shards", type=Path, nargs="+", help="per-shard resolved-symbol files covering the whole universe")
+    parser.add_argument("--previous-manifest", type=Path, help="manifest.json of the last published release")
+    parser.add_argument("--release-id", help="identifier of the release prefix this export is uploaded to")
+    parser.add_argument("--delta-plan", type=Path, help="write the upload/reuse plan to this file")
+    parser.add_argument("--binary-bands", action="store_true", help="also write packed .vbnd band files")
+    parser.add_argument("--budget-encoding", choices=BUDGET_ENCODINGS, default="raw", help="which size counts against MAX_EXPORT_BYTES")
+    parser.add_argument("--precompress", action="store_true", help="also write .gz (and .br) siblings of every artifact")
+    parser.add_argument("--pyramid", action="store_true", help="also write weekly and monthly valuation levels")
+    args = parser.parse_args(argv)
     expected = load_expected_symbols(args.expected_symbols_file) if args.expected_symbols_file else None
-    export_all(Path("data/results"), Path("data/processed"), Path("data/watcher_exports"), expected_symbols=expected)
+    if args.merge_shards:
+        expected = merge_shard_symbols(args.merge_shards)
+    previous = load_previous_manifest(args.previous_manifest) if args.previous_manifest else None
+    manifest = export_all(
+        DEFAULT_RESULTS_DIR,
+        DEFAULT_PROCESSED_DIR,
+        DEFAULT_OUTPUT_DIR,
+        expected_symbols=expected,
+        previous_manifest=previous,
+        release_id=args.release_id,
+        budget_encoding=args.budget_encoding,
+        binary_bands=args.binary_bands,
+        precompress=args.precompress,
+        pyramid=args.pyramid,
+    )
+    if args.delta_plan:
+        plan = delta_plan(manifest)
+        args.delta_plan.parent.mkdir(parents=True, exist_ok=True)
+        args.delta_plan.write_bytes(encode_json(plan))
+        print(f"delta plan: upload {len(plan['upload'])} objects ({plan['uploadBytes']} bytes), reuse {len(plan['reuse'])} ({plan['reusedBytes']} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
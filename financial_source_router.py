@@ -16,15 +16,24 @@ exceptions.
 
 from __future__ import annotations
 
+import functools
 import inspect
+import json
 import logging
+import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
-from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
 from sec_company_facts import (
+    DEFAULT_CACHE_DIR as SEC_CACHE_DIR,
+    SEC_FRAMES_SOURCE,
+    SEC_FRAMES_SOURCE_TYPE,
     SECCompanyFactsError,
     SECInvalidPayloadError,
     SECRateLimitError,
@@ -41,6 +50,8 @@ from foreign_issuer_coverage import (
     SEC_FOREIGN_SOURCE_TYPE,
     is_foreign_issuer,
 )
+from source_telemetry import SourceTelemetry
+from storage import file_lock
 
 
 logger = logging.getLogger(__name__)
@@ -50,6 +61,20 @@ SEC_SOURCE_TYPE = "SEC_COMPANY_FACTS"
 FMP_SOURCE = "Financial Modeling Prep"
 FMP_SOURCE_TYPE = "FMP"
 MAX_SOURCE_AGE_DAYS = 730
+DEFAULT_ROUTE_WORKERS = 8
+# Concurrent calls allowed per source lane during ``route_many``.  SEC fair
+# access tolerates a few parallel requests; FMP keys are quota-bound, so the
+# fallback lane stays serial and the shared breaker sees every failure first.
+DEFAULT_LANE_LIMITS = {"sec": 4, "foreign": 2, "fmp": 1}
+DEFAULT_NEGATIVE_COVERAGE_PATH = SEC_CACHE_DIR / "negative_coverage.json"
+DEFAULT_NEGATIVE_COVERAGE_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_NEGATIVE_COVERAGE_MAX_TTL_SECONDS = 90 * 24 * 60 * 60
+
+# Routing decisions recorded on every result.
+ROUTE_SEC = "sec_primary"
+ROUTE_SEC_FOREIGN = "sec_foreign"
+ROUTE_FMP_SEC_UNSUPPORTED = "fmp_sec_unsupported"
+ROUTE_FMP_NEGATIVE_CACHE = "fmp_negative_coverage_cache"
 
 
 class FinancialSourceError(RuntimeError):
@@ -119,8 +144,10 @@ class FMPCircuitBreaker:
 
     cooldown_seconds: float = 300.0
     clock: Callable[[], float] = time.time
+    telemetry: Optional[SourceTelemetry] = None
     _opened_at: Optional[float] = field(default=None, init=False, repr=False)
     _reason: Optional[str] = field(default=None, init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
 
     def __post_init__(self) -> None:
         if self.cooldown_seconds < 0:
@@ -128,11 +155,13 @@ class FMPCircuitBreaker:
 
     @property
     def is_open(self) -> bool:
-        if self._opened_at is None:
+        with self._lock:
+            opened_at = self._opened_at
+        if opened_at is None:
             return False
         if self.cooldown_seconds == 0:
             return False
-        elapsed = self.clock() - self._opened_at
+        elapsed = self.clock() - opened_at
         if elapsed >= self.cooldown_seconds:
             # A half-open probe is allowed after cooldown.  The next failure
             # can open the circuit again, while success closes it explicitly.
@@ -152,20 +181,123 @@ class FMPCircuitBreaker:
     before_request = check
 
     def trip(self, reason: str) -> None:
-        self._opened_at = self.clock()
-        self._reason = str(reason or "FMP circuit opened")
+        with self._lock:
+            self._opened_at = self.clock()
+            self._reason = str(reason or "FMP circuit opened")
+        if self.telemetry is not None:
+            self.telemetry.record_breaker_trip("fmp")
         logger.warning("FMP circuit opened: %s", self._reason)
 
     record_failure = trip
 
     def record_success(self) -> None:
-        self._opened_at = None
-        self._reason = None
+        with self._lock:
+            self._opened_at = None
+            self._reason = None
 
     def reset(self) -> None:
         self.record_success()
 
 
+@dataclass
+class SECNegativeCoverageCache:
+    """Persisted record of symbols SEC explicitly does not cover.
+
+    A symbol enters the cache only after an explicit unsupported answer
+    (ticker not in the SEC map, or Company Facts without valuation anchors).
+    While an entry is live the router sends the symbol straight to the FMP
+    lane.  Each consecutive miss doubles the time until SEC is probed again,
+    from ``ttl_seconds`` up to ``max_ttl_seconds``; a successful SEC route
+    removes the entry.  An unreadable cache file is treated as empty, which
+    only costs one extra SEC probe per symbol.  Each change re-reads the file
+    and rewrites only the changed symbol under a ``file_lock``, so concurrent
+    shards sharing the file keep each other's entries.
+    """
+
+    path: Path = DEFAULT_NEGATIVE_COVERAGE_PATH
+    ttl_seconds: float = DEFAULT_NEGATIVE_COVERAGE_TTL_SECONDS
+    max_ttl_seconds: float = DEFAULT_NEGATIVE_COVERAGE_MAX_TTL_SECONDS
+    clock: Callable[[], float] = time.time
+    _entries: Optional[Dict[str, Dict[str, Any]]] = field(default=None, init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.path = Path(self.path)
+        if self.ttl_seconds <= 0 or self.max_ttl_seconds < self.ttl_seconds:
+            raise ValueError("negative coverage TTLs must be positive and ordered")
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            payload = {}
+        except (OSError, json.JSONDecodeError) as error:
+            logger.warning("ignoring unreadable negative coverage cache %s: %s", self.path, error)
+            payload = {}
+        entries = payload.get("symbols") if isinstance(payload, Mapping) else None
+        return {
+            str(symbol): dict(entry)
+            for symbol, entry in (entries or {}).items()
+            if isinstance(entry, Mapping) and isinstance(entry.get("reprobeAt"), (int, float))
+        }
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _save(self, symbol: str) -> None:
+        current = self._load()
+        try:
+            with file_lock(self.path):
+                entries = self._read()
+                if symbol in current:
+                    entries[symbol] = current[symbol]
+                else:
+                    entries.pop(symbol, None)
+                self._entries = entries
+                temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                temp_path.write_text(
+                    json.dumps({"symbols": entries}, indent=2, sort_keys=True), encoding="utf-8"
+                )
+                os.replace(temp_path, self.path)
+        except OSError as error:
+            # Losing the cache only means SEC is probed again next run.
+            logger.warning("unable to write negative coverage cache %s: %s", self.path, error)
+
+    def lookup(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Return the live entry for ``symbol``, or ``None`` when SEC is due."""
+
+        with self._lock:
+            entry = self._load().get(symbol)
+            if entry is None or float(self.clock()) >= float(entry["reprobeAt"]):
+                return None
+            return dict(entry)
+
+    def record_unsupported(self, symbol: str, reason: str) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._load()
+            now = float(self.clock())
+            previous = entries.get(symbol) or {}
+            misses = int(previous.get("misses") or 0) + 1
+            delay = min(self.ttl_seconds * (2 ** (misses - 1)), self.max_ttl_seconds)
+            entry = {
+                "reason": str(reason or "SEC does not cover symbol"),
+                "firstSeenAt": previous.get("firstSeenAt", now),
+                "lastProbedAt": now,
+                "misses": misses,
+                "reprobeAt": now + delay,
+            }
+            entries[symbol] = entry
+            self._save(symbol)
+            return dict(entry)
+
+    def clear(self, symbol: str) -> None:
+        with self._lock:
+            if self._load().pop(symbol, None) is not None:
+                self._save(symbol)
+
+
 def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
@@ -214,6 +346,11 @@ class FinancialSourceResult:
     fetched_at: str
     data_as_of: str
     latest_filing_date: Optional[str]
+    route_decision: Optional[str] = None
+    refresh_plan: Optional[Dict[str, Any]] = None
+    # ``deferred`` rows come from a cache kept past its TTL under a refresh
+    # plan; ``fetched_at`` is then when that cache was downloaded.
+    status: str = "fresh"
 
     @property
     def records(self) -> Tuple[Dict[str, Any], ...]:
@@ -240,13 +377,16 @@ class FinancialSourceResult:
         return self.latest_filing_date
 
     @property
-    def freshness(self) -> Dict[str, Optional[str]]:
-        return {
+    def freshness(self) -> Dict[str, Any]:
+        freshness: Dict[str, Any] = {
             "fetchedAt": self.fetched_at,
             "dataAsOf": self.data_as_of,
             "filingDate": self.latest_filing_date,
-            "status": "fresh",
+            "status": self.status,
         }
+        if self.refresh_plan is not None:
+            freshness["refreshPlan"] = dict(self.refresh_plan)
+        return freshness
 
     @property
     def metadata(self) -> Dict[str, Any]:
@@ -259,6 +399,7 @@ class FinancialSourceResult:
             "fetchedAt": self.fetched_at,
             "dataAsOf": self.data_as_of,
             "filingDate": self.latest_filing_date,
+            "routingDecision": self.route_decision,
             "freshness": self.freshness,
         }
 
@@ -341,6 +482,29 @@ def _classify_fmp_exception(error: BaseException) -> FMPSourceError:
     return FMPSourceError(str(error) or "FMP source failed")
 
 
+def _fetcher_adapter(
+    fetcher: Callable[..., Any],
+    *,
+    max_quarters: bool = False,
+    circuit_breaker: Optional[Callable[[], FMPCircuitBreaker]] = None,
+) -> Callable[[str], Any]:
+    """Inspect a fetcher once and return a plain ``symbol -> payload`` call."""
+
+    try:
+        parameters = inspect.signature(fetcher).parameters
+    except (TypeError, ValueError):
+        return fetcher
+    if max_quarters and "max_quarters" in parameters:
+        return functools.partial(fetcher, max_quarters=12)
+    if circuit_breaker is not None and (
+        "circuit_breaker" in parameters
+        or any(parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters.values())
+    ):
+        # The breaker is looked up per call so a replaced breaker is honoured.
+        return lambda symbol: fetcher(symbol, circuit_breaker=circuit_breaker())
+    return fetcher
+
+
 def _is_sec_unsupported(error: BaseException) -> bool:
     if isinstance(error, FinancialSourceUnsupported):
         return True
@@ -360,7 +524,12 @@ def _is_sec_unsupported(error: BaseException) -> bool:
 
 
 class FinancialSourceRouter:
-    """Route one symbol through SEC first, then a controlled FMP fallback."""
+    """Route symbols through SEC first, then a controlled FMP fallback.
+
+    Successful routes are memoized for the lifetime of the router, which is
+    one pipeline run.  ``route_many`` additionally memoizes typed failures so
+    later ``route`` calls re-raise them without touching a source again.
+    """
 
     def __init__(
         self,
@@ -372,6 +541,9 @@ class FinancialSourceRouter:
         foreign_source: Optional[Any] = None,
         fmp_circuit_breaker: Optional[FMPCircuitBreaker] = None,
         clock: Callable[[], Any] = time.time,
+        lane_limits: Optional[Mapping[str, int]] = None,
+        telemetry: Optional[SourceTelemetry] = None,
+        negative_coverage: Optional[SECNegativeCoverageCache] = None,
     ) -> None:
         if sec_fetcher is not None and sec_source is not None:
             raise ValueError("provide sec_fetcher or sec_source, not both")
@@ -383,52 +555,63 @@ class FinancialSourceRouter:
             foreign_fetcher = foreign_source.fetch
         self.sec_fetcher = sec_fetcher
         self.foreign_fetcher = foreign_fetcher
+        self.sec_source = sec_source
+        self.foreign_source = foreign_source
         self.fmp_fetcher = fmp_fetcher
         self.clock = clock
-        self.fmp_circuit_breaker = fmp_circuit_breaker or FMPCircuitBreaker(clock=clock)
+        self.telemetry = telemetry
+        self.negative_coverage = negative_coverage
+        self.fmp_circuit_breaker = fmp_circuit_breaker or FMPCircuitBreaker(clock=clock, telemetry=telemetry)
+        limits = dict(DEFAULT_LANE_LIMITS)
+        limits.update(lane_limits or {})
+        if any(int(value) <= 0 for value in limits.values()):
+            raise ValueError("source lane limits must be positive")
+        self._lanes = {lane: threading.BoundedSemaphore(int(value)) for lane, value in limits.items()}
+        self._adapters: Dict[str, Tuple[Callable[..., Any], Callable[[str], Any]]] = {}
+        self._memo_lock = threading.Lock()
+        self._routed: Dict[str, FinancialSourceResult] = {}
+        self._route_errors: Dict[str, Exception] = {}
 
     @property
     def circuit_breaker(self) -> FMPCircuitBreaker:
         return self.fmp_circuit_breaker
 
+    def _call(self, lane: str, fetcher: Callable[..., Any], symbol: str) -> Any:
+        # Fetchers may be reassigned after construction (the CLI installs its
+        # FMP adapter that way), so an adapter is reused only while the
+        # fetcher it was built for is still the configured one.
+        cached = self._adapters.get(lane)
+        if cached is None or cached[0] is not fetcher:
+            adapter = _fetcher_adapter(
+                fetcher,
+                max_quarters=lane != "fmp",
+                circuit_breaker=(lambda: self.fmp_circuit_breaker) if lane == "fmp" else None,
+            )
+            cached = (fetcher, adapter)
+            self._adapters[lane] = cached
+        with self._lanes[lane]:
+            if lane == "fmp":
+                # Another worker may have tripped the breaker while this one
+                # waited for the lane; re-check before spending quota.
+                self.fmp_circuit_breaker.check()
+            return cached[1](symbol)
+
     def _call_sec(self, symbol: str) -> Any:
         if self.sec_fetcher is None:
             raise SECUnsupportedError("SEC source is not configured")
-        try:
-            signature = inspect.signature(self.sec_fetcher)
-        except (TypeError, ValueError):
-            return self.sec_fetcher(symbol)
-        if "max_quarters" in signature.parameters:
-            return self.sec_fetcher(symbol, max_quarters=12)
-        return self.sec_fetcher(symbol)
+        return self._call("sec", self.sec_fetcher, symbol)
 
     def _call_fmp(self, symbol: str) -> Any:
         if self.fmp_fetcher is None:
             raise FinancialSourceUnavailable("FMP fallback is not configured")
-        try:
-            signature = inspect.signature(self.fmp_fetcher)
-        except (TypeError, ValueError):
-            return self.fmp_fetcher(symbol)
-        parameters = signature.parameters
-        if "circuit_breaker" in parameters or any(
-            parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters.values()
-        ):
-            return self.fmp_fetcher(symbol, circuit_breaker=self.fmp_circuit_breaker)
-        return self.fmp_fetcher(symbol)
+        return self._call("fmp", self.fmp_fetcher, symbol)
 
     def _call_foreign(self, symbol: str) -> Any:
         if self.foreign_fetcher is None:
             raise ForeignIssuerUnavailable(
                 "SEC foreign issuer coverage is not configured", symbol=symbol
             )
-        try:
-            signature = inspect.signature(self.foreign_fetcher)
-        except (TypeError, ValueError):
-            return self.foreign_fetcher(symbol)
-        parameters = signature.parameters
-        if "max_quarters" in parameters:
-            return self.foreign_fetcher(symbol, max_quarters=12)
-        return self.foreign_fetcher(symbol)
+        return self._call("foreign", self.foreign_fetcher, symbol)
 
     @staticmethod
     def _foreign_rows(payload: Any, symbol: str) -> Any:
@@ -454,6 +637,7 @@ class FinancialSourceRouter:
             source=SEC_FOREIGN_SOURCE,
             source_type=SEC_FOREIGN_SOURCE_TYPE,
             source_url=SEC_FOREIGN_FACTS_URL.format(cik=FOREIGN_ISSUER_CIKS.get(symbol, "")),
+            route_decision=ROUTE_SEC_FOREIGN,
         )
 
     def _result(
@@ -464,6 +648,7 @@ class FinancialSourceRouter:
         source: str,
         source_type: str,
         source_url: Optional[str],
+        route_decision: Optional[str] = None,
     ) -> FinancialSourceResult:
         _assert_payload_is_fresh(payload)
         try:
@@ -516,7 +701,13 @@ class FinancialSourceRouter:
                 except ValueError as error:
                     raise FinancialSourceInvalid(str(error)) from error
         latest_filing = max(filing_dates).isoformat() if filing_dates else None
-        fetched_at = _iso_now(self.clock)
+        # Sources that served cached rows under a refresh plan say so on
+        # every row; the plan is surfaced once on the result's freshness.
+        refresh_plan = rows[0].get("sourceRefreshPlan")
+        refresh_plan = dict(refresh_plan) if isinstance(refresh_plan, Mapping) else None
+        status = "fresh" if refresh_plan is None else "deferred"
+        cached_at = rows[0].get("sourceCachedAt") if refresh_plan is not None else None
+        fetched_at = str(cached_at) if cached_at else _iso_now(self.clock)
         for row in rows:
             row["source"] = source
             row["sourceType"] = source_type
@@ -524,11 +715,12 @@ class FinancialSourceRouter:
             row["sourceFetchedAt"] = fetched_at
             row["sourceDataAsOf"] = data_as_of
             row["sourceLatestFilingDate"] = latest_filing
+            row["sourceRoutingDecision"] = route_decision
             row["sourceFreshness"] = {
                 "fetchedAt": fetched_at,
                 "dataAsOf": data_as_of,
                 "filingDate": row.get("filingDate") or latest_filing,
-                "status": "fresh",
+                "status": status,
             }
         return FinancialSourceResult(
             symbol=symbol,
@@ -539,9 +731,12 @@ class FinancialSourceRouter:
             fetched_at=fetched_at,
             data_as_of=data_as_of,
             latest_filing_date=latest_filing,
+            route_decision=route_decision,
+            refresh_plan=refresh_plan,
+            status=status,
         )
 
-    def _route_fmp(self, symbol: str) -> FinancialSourceResult:
+    def _route_fmp(self, symbol: str, route_decision: str = ROUTE_FMP_SEC_UNSUPPORTED) -> FinancialSourceResult:
         self.fmp_circuit_breaker.check()
         try:
             payload = self._call_fmp(symbol)
@@ -551,6 +746,7 @@ class FinancialSourceRouter:
                 source=FMP_SOURCE,
                 source_type=FMP_SOURCE_TYPE,
                 source_url="https://financialmodelingprep.com/stable/",
+                route_decision=route_decision,
             )
         except FMPCircuitOpenError:
             raise
@@ -569,11 +765,93 @@ class FinancialSourceRouter:
 
     def route(self, symbol: str) -> FinancialSourceResult:
         symbol = _normalise_symbol(symbol)
+        with self._memo_lock:
+            result = self._routed.get(symbol)
+            error = self._route_errors.get(symbol)
+        if result is not None:
+            return result
+        if error is not None:
+            raise error
+        result = self._route_observed(symbol)
+        with self._memo_lock:
+            self._routed[symbol] = result
+        return result
+
+    def route_many(
+        self,
+        symbols: Iterable[str],
+        *,
+        max_workers: int = DEFAULT_ROUTE_WORKERS,
+    ) -> Dict[str, Union[FinancialSourceResult, Exception]]:
+        """Route a batch concurrently and memoize every outcome for the run.
+
+        Returns ``symbol -> FinancialSourceResult`` or the typed exception
+        that symbol raised, in input order.  Failures are returned rather
+        than raised so one unavailable issuer cannot hide the rest of the
+        batch; a later ``route`` call re-raises the same error.
+        """
+
+        if max_workers <= 0:
+            raise ValueError("route worker count must be positive")
+        ordered: List[str] = []
+        for value in symbols:
+            symbol = _normalise_symbol(value)
+            if symbol not in ordered:
+                ordered.append(symbol)
+        outcomes: Dict[str, Union[FinancialSourceResult, Exception]] = {}
+        if not ordered:
+            return outcomes
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(ordered))) as pool:
+            futures = {pool.submit(self.route, symbol): symbol for symbol in ordered}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    outcomes[symbol] = future.result()
+                except Exception as error:
+                    outcomes[symbol] = error
+                    with self._memo_lock:
+                        self._route_errors[symbol] = error
+        return {symbol: outcomes[symbol] for symbol in ordered}
+
+    def clear_memo(self) -> None:
+        """Forget memoized routes so the next call reaches the sources again."""
+
+        with self._memo_lock:
+            self._routed.clear()
+            self._route_errors.clear()
+
+    def _route_observed(self, symbol: str) -> FinancialSourceResult:
+        if self.telemetry is None:
+            return self._route_uncached(symbol)
+        started = self.telemetry.perf_counter()
+        # The scope attributes nested SEC/foreign adapter requests, which
+        # do not know the routed symbol, to this symbol's metrics.
+        with self.telemetry.symbol_scope(symbol):
+            try:
+                result = self._route_uncached(symbol)
+            except Exception as error:
+                self.telemetry.record_route(symbol, self.telemetry.perf_counter() - started, error=error)
+                raise
+        self.telemetry.record_route(
+            symbol, self.telemetry.perf_counter() - started, source_type=result.source_type
+        )
+        return result
+
+    def _route_uncached(self, symbol: str) -> FinancialSourceResult:
         if self.foreign_fetcher is not None and is_foreign_issuer(symbol):
             # Foreign private issuers must not pass through the domestic
             # ``us-gaap`` resolver/cache first: their source contract is
             # explicit CIK + 20-F + IFRS, and an unavailable result is typed.
             return self._route_foreign(symbol)
+        if self.negative_coverage is not None:
+            cached = self.negative_coverage.lookup(symbol)
+            if cached is not None:
+                logger.info(
+                    "%s is cached as unsupported by SEC (%s); entering FMP fallback without a SEC probe",
+                    symbol,
+                    cached["reason"],
+                )
+                return self._route_fmp(symbol, ROUTE_FMP_NEGATIVE_CACHE)
         try:
             payload = self._call_sec(symbol)
         except Exception as error:
@@ -583,6 +861,8 @@ class FinancialSourceRouter:
                     # foreign lane either returns SEC 20-F/IFRS rows or a
                     # typed UNAVAILABLE error with its concrete reason.
                     return self._route_foreign(symbol)
+                if self.negative_coverage is not None:
+                    self.negative_coverage.record_unsupported(symbol, str(error))
                 logger.info("%s is unsupported by SEC; entering controlled FMP fallback", symbol)
                 return self._route_fmp(symbol)
             if isinstance(error, (SECCompanyFactsError, FinancialSourceError)):
@@ -591,18 +871,27 @@ class FinancialSourceRouter:
                 # coverage without an opaque wrapper.
                 raise
             raise FinancialSourceUnavailable("SEC source failed for " + symbol) from error
+        source, source_type, source_url = SEC_SOURCE, SEC_SOURCE_TYPE, "https://data.sec.gov/api/xbrl/companyfacts"
+        if isinstance(payload, list) and payload and all(
+            isinstance(row, Mapping) and row.get("sourceType") == SEC_FRAMES_SOURCE_TYPE for row in payload
+        ):
+            # Frames-mode rows keep their own label rather than claiming Company Facts.
+            source, source_type, source_url = SEC_FRAMES_SOURCE, SEC_FRAMES_SOURCE_TYPE, "https://data.sec.gov/api/xbrl/frames"
         try:
             result = self._result(
                 symbol,
                 payload,
-                source=SEC_SOURCE,
-                source_type=SEC_SOURCE_TYPE,
-                source_url="https://data.sec.gov/api/xbrl/companyfacts",
+                source=source,
+                source_type=source_type,
+                source_url=source_url,
+                route_decision=ROUTE_SEC,
             )
         except FinancialSourceError:
             # A successful SEC call with malformed/empty rows is not an
             # unsupported symbol.  Never hide that defect behind FMP.
             raise
+        if self.negative_coverage is not None:
+            self.negative_coverage.clear(symbol)
         return result
 
     # Method aliases keep call sites explicit while retaining one code path.
@@ -612,6 +901,9 @@ class FinancialSourceRouter:
 
 
 __all__ = [
+    "DEFAULT_LANE_LIMITS",
+    "DEFAULT_NEGATIVE_COVERAGE_PATH",
+    "DEFAULT_ROUTE_WORKERS",
     "FMPInvalidPayloadError",
     "FMPQuotaError",
     "FMPRateLimitError",
@@ -633,6 +925,11 @@ __all__ = [
     "ForeignIssuerCoverageError",
     "ForeignIssuerCoverageResult",
     "ForeignIssuerUnavailable",
+    "ROUTE_FMP_NEGATIVE_CACHE",
+    "ROUTE_FMP_SEC_UNSUPPORTED",
+    "ROUTE_SEC",
+    "ROUTE_SEC_FOREIGN",
+    "SECNegativeCoverageCache",
     "SECUnsupportedError",
     "SEC_SOURCE",
     "SEC_SOURCE_TYPE",
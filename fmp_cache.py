@@ -0,0 +1,356 @@
+"""Consolidated per-ticker store for the FMP statement cache.
+
+Each ``data/fmp_cache/{TICKER}`` directory holds one compact
+``statements.json``.  Statements are keyed by ``"{endpoint}_{quarter}"``
+(for example ``income-statement_q4``) and then by statement date, so a
+single read returns every endpoint and quarter for the ticker.
+
+``manifest.json`` beside the store summarizes it: record counts, content
+hashes, the period and filing date of every statement date, and the newest
+date that all four statements cover.  The valuation pipeline reads the
+manifest instead of parsing statements to choose its incremental FMP target.
+
+Directories still in the legacy layout (one indented JSON file per endpoint
+and quarter) are migrated into the store the first time they are read, and
+the legacy files are removed once the store has been written.  The store and
+the manifest are always replaced atomically.
+
+``configure_store`` switches the cache to an optional SQLite backend: every
+statement row becomes one document keyed by ticker, ``endpoint_quarter`` and
+date, and a ticker's rows are replaced in one transaction.  The manifest is
+then derived from the rows on read.  A ticker already cached as JSON is
+imported on first use, and ``export_store`` writes the JSON layout back out
+for readers of the files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from storage import SQLiteStore
+
+
+logger = logging.getLogger(__name__)
+
+STORE_NAME = "statements.json"
+STORE_SCHEMA_VERSION = "1.0"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_SCHEMA_VERSION = "2.0"
+LEGACY_FILE_PATTERN = "*_q[1-4].json"
+# A date is complete once this many statements contain it (income, cash
+# flow, balance sheet and enterprise values).
+COMPLETE_STATEMENT_COUNT = 4
+
+# Re-entrant: a write may migrate a legacy directory before updating it.
+_store_lock = threading.RLock()
+# Optional SQLite backend; ``None`` keeps the per-ticker JSON files.
+_backend: Optional[SQLiteStore] = None
+
+
+def configure_store(store: Optional[SQLiteStore]) -> None:
+    """Serve the cache from ``store``, or from JSON files when ``None``."""
+
+    global _backend
+    _backend = store
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temp_path.write_text(text, encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def statement_key(endpoint: str, quarter: str) -> str:
+    return f"{endpoint}_{str(quarter).lower()}"
+
+
+def _by_date(records: Iterable[Any]) -> Dict[str, Any]:
+    dated: Dict[str, Any] = {}
+    for record in records:
+        if isinstance(record, Mapping) and record.get("date"):
+            dated[str(record["date"])] = record
+    return dict(sorted(dated.items(), reverse=True))
+
+
+def summarize_records(records: Iterable[Any], text: str) -> Dict[str, Any]:
+    """Summarize one statement from its records and serialized text."""
+
+    dates: Dict[str, List[Optional[str]]] = {}
+    for record in records:
+        if not isinstance(record, Mapping) or not record.get("date"):
+            continue
+        key = str(record["date"])[:10]
+        dates[key] = [record.get("period") or None, record.get("filingDate") or None]
+    return {
+        "records": len(dates),
+        "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        "dates": dict(sorted(dates.items(), reverse=True)),
+    }
+
+
+def _derive(statements: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
+    counts: Dict[str, int] = {}
+    periods: Dict[str, str] = {}
+    filings: Dict[str, Dict[str, Optional[str]]] = {}
+    for key in sorted(statements):
+        for day, (period, filing_date) in statements[key].get("dates", {}).items():
+            counts[day] = counts.get(day, 0) + 1
+            if period and day not in periods:
+                periods[day] = period
+            if filing_date:
+                filings.setdefault(day, {"date": day, "period": period, "filingDate": filing_date})
+    complete = [day for day, count in counts.items() if count >= COMPLETE_STATEMENT_COUNT]
+    latest = max(complete) if complete else None
+    return {
+        "latestDate": latest,
+        "latestPeriod": periods.get(latest) if latest else None,
+        "filings": [filings[day] for day in sorted(filings, reverse=True)],
+    }
+
+
+def _manifest(symbol: str, statements: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
+    return {
+        "schemaVersion": MANIFEST_SCHEMA_VERSION,
+        "symbol": symbol,
+        "store": STORE_NAME,
+        **_derive(statements),
+        "statements": dict(sorted(statements.items())),
+    }
+
+
+def _summaries(store: Mapping[str, Mapping[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {key: summarize_records(rows.values(), _compact(rows)) for key, rows in store.items()}
+
+
+def _read_store(ticker_dir: Path) -> Optional[Dict[str, Dict[str, Any]]]:
+    try:
+        payload = json.loads((ticker_dir / STORE_NAME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as error:
+        logger.warning("Unreadable FMP statement store for %s: %s", ticker_dir.name, error)
+        return None
+    if not isinstance(payload, dict):
+        payload = {}
+    statements = payload.get("statements")
+    if payload.get("schemaVersion") != STORE_SCHEMA_VERSION or not isinstance(statements, dict):
+        logger.warning("Ignoring FMP statement store with unknown schema for %s", ticker_dir.name)
+        return None
+    return statements
+
+
+def _write_store(ticker_dir: Path, store: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
+    symbol = ticker_dir.name.upper()
+    ordered = {key: dict(sorted(store[key].items(), reverse=True)) for key in sorted(store)}
+    _atomic_write_text(
+        ticker_dir / STORE_NAME,
+        _compact({"schemaVersion": STORE_SCHEMA_VERSION, "symbol": symbol, "statements": ordered}),
+    )
+    manifest = _manifest(symbol, _summaries(ordered))
+    _atomic_write_text(ticker_dir / MANIFEST_NAME, json.dumps(manifest, indent=2))
+    return manifest
+
+
+def _backend_rows(symbol: str) -> Dict[str, Dict[str, Any]]:
+    statements: Dict[str, Dict[str, Any]] = {}
+    for document in _backend.query(symbol=symbol):
+        statements.setdefault(document.kind, {})[document.date] = document.payload
+    return {key: dict(sorted(rows.items(), reverse=True)) for key, rows in sorted(statements.items())}
+
+
+def _backend_replace(symbol: str, store: Mapping[str, Mapping[str, Any]]) -> None:
+    with _backend.transaction():
+        for key, rows in store.items():
+            _backend.delete(symbol=symbol, kind=key)
+            for day, record in rows.items():
+                _backend.put(f"{symbol}/{key}/{day}", record, symbol=symbol, kind=key, date=day)
+
+
+def _backend_store(ticker_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Return the backend rows for a ticker, importing its JSON cache once."""
+
+    symbol = ticker_dir.name.upper()
+    with _store_lock:
+        statements = _backend_rows(symbol)
+        if statements or not ticker_dir.is_dir():
+            return statements
+        imported = migrate_legacy(ticker_dir)
+        if imported:
+            _backend_replace(symbol, {key: _by_date(rows.values()) for key, rows in imported.items()})
+        return _backend_rows(symbol)
+
+
+def migrate_legacy(ticker_dir: Path) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Fold legacy per-quarter files into the store and remove them.
+
+    Existing store entries win over legacy files for the same date, so a
+    half-finished earlier migration can simply run again.
+    """
+
+    ticker_dir = Path(ticker_dir)
+    with _store_lock:
+        legacy = sorted(ticker_dir.glob(LEGACY_FILE_PATTERN)) if ticker_dir.is_dir() else []
+        store = _read_store(ticker_dir)
+        if not legacy:
+            return store
+        merged: Dict[str, Dict[str, Any]] = {}
+        for path in legacy:
+            try:
+                records = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError) as error:
+                logger.warning("Skipping unreadable FMP cache file %s: %s", path, error)
+                continue
+            merged[path.stem] = _by_date(records if isinstance(records, list) else [records])
+        for key, rows in (store or {}).items():
+            merged.setdefault(key, {}).update(rows)
+        _write_store(ticker_dir, merged)
+        for path in legacy:
+            try:
+                path.unlink()
+            except OSError as error:
+                logger.warning("Unable to remove migrated FMP cache file %s: %s", path, error)
+        logger.info("Migrated %d legacy FMP cache files for %s", len(legacy), ticker_dir.name)
+        return merged
+
+
+def load_statements(ticker_dir: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """Return every cached statement keyed by ``endpoint_quarter``, rows newest first."""
+
+    if _backend is not None:
+        store = _backend_store(Path(ticker_dir))
+    else:
+        store = migrate_legacy(Path(ticker_dir)) or {}
+    return {key: list(_by_date(rows.values()).values()) for key, rows in sorted(store.items())}
+
+
+def rebuild_manifest(ticker_dir: Path) -> Optional[Dict[str, Any]]:
+    """Summarize the store once and write a fresh manifest."""
+
+    ticker_dir = Path(ticker_dir)
+    if _backend is not None:
+        store = _backend_store(ticker_dir)
+        return _manifest(ticker_dir.name.upper(), _summaries(store)) if store else None
+    if not ticker_dir.is_dir():
+        return None
+    store = migrate_legacy(ticker_dir) or {}
+    manifest = _manifest(ticker_dir.name.upper(), _summaries(store))
+    try:
+        _atomic_write_text(ticker_dir / MANIFEST_NAME, json.dumps(manifest, indent=2))
+    except OSError as error:
+        logger.warning("Unable to write FMP cache manifest for %s: %s", ticker_dir.name, error)
+    return manifest
+
+
+def load_manifest(ticker_dir: Path) -> Optional[Dict[str, Any]]:
+    """Return the manifest, rebuilding it from the store when needed."""
+
+    ticker_dir = Path(ticker_dir)
+    if _backend is not None or any(ticker_dir.glob(LEGACY_FILE_PATTERN)):
+        return rebuild_manifest(ticker_dir)
+    try:
+        manifest = json.loads((ticker_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        if isinstance(manifest, dict) and manifest.get("schemaVersion") == MANIFEST_SCHEMA_VERSION:
+            return manifest
+    except FileNotFoundError:
+        pass
+    except (OSError, json.JSONDecodeError) as error:
+        logger.warning("Rebuilding unreadable FMP cache manifest for %s: %s", ticker_dir.name, error)
+    return rebuild_manifest(ticker_dir)
+
+
+def latest_processed_quarter(ticker_dir: Path) -> Optional[str]:
+    """Return the fiscal quarter (``"q1"``..``"q4"``) of the newest complete date."""
+
+    manifest = load_manifest(ticker_dir)
+    if not manifest or not manifest.get("latestPeriod"):
+        return None
+    return str(manifest["latestPeriod"]).lower()
+
+
+def write_statement(ticker_dir: Path, key: str, records: List[Any]) -> Dict[str, Any]:
+    """Replace one statement in the store and update the manifest atomically."""
+
+    ticker_dir = Path(ticker_dir)
+    if _backend is not None:
+        with _store_lock:
+            store = _backend_store(ticker_dir)
+            store[key] = _by_date(records)
+            _backend_replace(ticker_dir.name.upper(), {key: store[key]})
+            return _manifest(ticker_dir.name.upper(), _summaries(_backend_rows(ticker_dir.name.upper())))
+    ticker_dir.mkdir(parents=True, exist_ok=True)
+    with _store_lock:
+        store = migrate_legacy(ticker_dir) or {}
+        store[key] = _by_date(records)
+        return _write_store(ticker_dir, store)
+
+
+def migrate_all(base_dir: Path) -> int:
+    """Migrate every ticker directory under ``base_dir``; return the count."""
+
+    migrated = 0
+    for ticker_dir in sorted(Path(base_dir).iterdir()):
+        if ticker_dir.is_dir() and any(ticker_dir.glob(LEGACY_FILE_PATTERN)):
+            migrate_legacy(ticker_dir)
+            migrated += 1
+    return migrated
+
+
+def export_store(base_dir: Path, symbols: Optional[Iterable[str]] = None) -> int:
+    """Write backend tickers to the JSON layout under ``base_dir``; return the count."""
+
+    if _backend is None:
+        return 0
+    exported = 0
+    for symbol in (_backend.symbols() if symbols is None else [str(symbol).upper() for symbol in symbols]):
+        store = _backend_rows(symbol)
+        if not store:
+            continue
+        ticker_dir = Path(base_dir) / symbol
+        ticker_dir.mkdir(parents=True, exist_ok=True)
+        with _store_lock:
+            _write_store(ticker_dir, store)
+        exported += 1
+    return exported
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Consolidate legacy FMP cache directories.")
+    parser.add_argument("base_dir", nargs="?", default=str(Path(__file__).resolve().parent / "data" / "fmp_cache"))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    print(f"Migrated {migrate_all(Path(args.base_dir))} ticker directories")
+    return 0
+
+
+__all__ = [
+    "MANIFEST_NAME",
+    "configure_store",
+    "export_store",
+    "MANIFEST_SCHEMA_VERSION",
+    "STORE_NAME",
+    "STORE_SCHEMA_VERSION",
+    "latest_processed_quarter",
+    "load_manifest",
+    "load_statements",
+    "migrate_all",
+    "migrate_legacy",
+    "rebuild_manifest",
+    "statement_key",
+    "summarize_records",
+    "write_statement",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -19,11 +19,12 @@ foreign financial values.
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
 from pathlib import Path
@@ -31,6 +32,9 @@ from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Seque
 
 import requests
 
+from source_telemetry import SourceTelemetry, measure
+from storage import DocumentStore, JsonFileStore
+
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +48,7 @@ DEFAULT_USER_AGENT = os.getenv(
 )
 DEFAULT_TIMEOUT_SECONDS = 30.0
 DEFAULT_CACHE_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_PREFETCH_WORKERS = 4
 
 
 # Explicitly supported foreign issuers.  Keeping this allow-list separate from
@@ -616,9 +621,16 @@ class ForeignIssuerCoverageSource:
     facts_url_template: str = SEC_FOREIGN_FACTS_URL
     clock: Callable[[], float] = time.time
     issuer_ciks: Mapping[str, str] = field(default_factory=lambda: dict(FOREIGN_ISSUER_CIKS))
+    telemetry: Optional[SourceTelemetry] = None
+    # Defaults to JSON files in ``cache_dir``; documents keep the file names.
+    store: Optional[DocumentStore] = None
+
+    telemetry_source = "sec_foreign"
 
     def __post_init__(self) -> None:
         self.cache_dir = Path(self.cache_dir)
+        if self.store is None:
+            self.store = JsonFileStore(self.cache_dir)
         self.user_agent = str(self.user_agent or "").strip()
         if not self.user_agent:
             raise ForeignIssuerCoverageError("SEC User-Agent is required")
@@ -634,23 +646,35 @@ class ForeignIssuerCoverageSource:
         return self.cache_dir / (kind + "_" + cik + ".json")
 
     def _load_cache(self, path: Path) -> Optional[Any]:
-        if not path.exists():
-            return None
         try:
-            age = self.clock() - path.stat().st_mtime
+            updated_at = self.store.updated_at(path.name)
         except OSError:
+            updated_at = None
+        if updated_at is None:
+            self._record_cache("miss")
             return None
+        age = self.clock() - updated_at
         if age < 0 or age > self.cache_ttl_seconds:
+            self._record_cache("expired")
             return None
+        self._record_cache("hit")
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError) as error:
+            document = self.store.get(path.name)
+        except OSError as error:
             raise ForeignIssuerInvalid("invalid foreign SEC cache: " + str(path)) from error
+        if document is None:
+            raise ForeignIssuerInvalid("invalid foreign SEC cache: " + str(path))
+        return document.payload
+
+    def _record_cache(self, outcome: str) -> None:
+        if self.telemetry is not None:
+            self.telemetry.record_cache(self.telemetry_source, outcome)
 
-    def _write_cache(self, path: Path, payload: Any) -> None:
+    def _write_cache(self, path: Path, payload: Any, *, symbol: str = "", kind: str = "") -> None:
         try:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            # Stores replace documents atomically, so concurrent routes never
+            # read a half-written cache document.
+            self.store.put(path.name, payload, symbol=symbol, kind=kind)
         except OSError as error:
             # A cache write cannot turn an available SEC response into an
             # unavailable one; the source response remains the authority.
@@ -658,11 +682,13 @@ class ForeignIssuerCoverageSource:
 
     def _request_json(self, url: str) -> Any:
         try:
-            response = requests.get(
-                url,
-                headers={"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"},
-                timeout=self.timeout_seconds,
-            )
+            with measure(self.telemetry, self.telemetry_source) as record:
+                response = requests.get(
+                    url,
+                    headers={"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"},
+                    timeout=self.timeout_seconds,
+                )
+                record.observe(response)
         except requests.RequestException as error:
             raise ForeignIssuerUnavailable("SEC foreign request failed: " + url) from error
         status = getattr(response, "status_code", None)
@@ -675,15 +701,31 @@ class ForeignIssuerCoverageSource:
         except (ValueError, TypeError, AttributeError) as error:
             raise ForeignIssuerInvalid("SEC foreign response is not valid JSON: " + url) from error
 
-    def _payload(self, kind: str, cik: str, url: str) -> Any:
+    def _payload(
+        self, symbol: str, kind: str, cik: str, url: str, skip: Optional[threading.Event] = None
+    ) -> Any:
         path = self._cache_path(kind, cik)
         payload = self._load_cache(path)
         if payload is not None:
             return payload
+        if skip is not None and skip.is_set():
+            return None
         payload = self._request_json(url)
-        self._write_cache(path, payload)
+        if skip is not None and skip.is_set():
+            # The issuer was ruled out while this request was in flight.
+            return payload
+        self._write_cache(path, payload, symbol=symbol, kind=kind)
         return payload
 
+    def _scoped_payload(
+        self, symbol: str, kind: str, cik: str, url: str, skip: Optional[threading.Event] = None
+    ) -> Any:
+        # Worker threads do not inherit the caller's telemetry symbol scope.
+        if self.telemetry is None:
+            return self._payload(symbol, kind, cik, url, skip)
+        with self.telemetry.symbol_scope(symbol):
+            return self._payload(symbol, kind, cik, url, skip)
+
     def resolve_cik(self, symbol: str) -> str:
         symbol = _normalise_symbol(symbol)
         try:
@@ -704,13 +746,29 @@ class ForeignIssuerCoverageSource:
         cik = _normalise_cik(cik) if cik is not None else self.resolve_cik(symbol)
         submissions_url = self.submissions_url.format(cik=cik)
         facts_url = self.facts_url_template.format(cik=cik)
-        submissions = self._payload("submissions", cik, submissions_url)
-        filing_date = _latest_filing_date(submissions)
-        if filing_date is None:
-            raise ForeignIssuerUnavailable(
-                "SEC submissions contain no 20-F/20-F/A filing", symbol=symbol, cik=cik
+        # Both documents are requested together, but the 20-F anchor is still
+        # checked first: facts are never normalized for an issuer without one,
+        # and a missing 20-F is reported ahead of any facts failure.  A ruled
+        # out issuer neither waits for nor caches its facts download.
+        ruled_out = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            submissions_future = pool.submit(self._scoped_payload, symbol, "submissions", cik, submissions_url)
+            facts_future = pool.submit(
+                self._scoped_payload, symbol, "companyfacts", cik, facts_url, ruled_out
             )
-        facts = self._payload("companyfacts", cik, facts_url)
+            submissions = submissions_future.result()
+            filing_date = _latest_filing_date(submissions)
+            if filing_date is None:
+                ruled_out.set()
+                facts_future.cancel()
+                raise ForeignIssuerUnavailable(
+                    "SEC submissions contain no 20-F/20-F/A filing", symbol=symbol, cik=cik
+                )
+            facts = facts_future.result()
+        finally:
+            # The facts future was cancelled above if the issuer was ruled out.
+            pool.shutdown(wait=not ruled_out.is_set())
         return normalize_foreign_company_facts(
             facts,
             symbol,
@@ -723,6 +781,52 @@ class ForeignIssuerCoverageSource:
     fetch_financials = fetch
     route = fetch
 
+    def prefetch(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        *,
+        max_workers: int = DEFAULT_PREFETCH_WORKERS,
+    ) -> Dict[str, str]:
+        """Warm the foreign cache for configured issuers in one bounded batch.
+
+        ``symbols`` limits the batch to the configured issuers of a run; the
+        default is every configured issuer.  Facts are warmed only for an
+        issuer whose submissions show a 20-F, as ``fetch`` would.  Failures
+        are returned as ``symbol -> reason`` rather than raised, because
+        ``fetch`` repeats the request and raises the typed error when the
+        symbol is routed.
+        """
+
+        if max_workers <= 0:
+            raise ForeignIssuerCoverageError("foreign prefetch worker count must be positive")
+        if symbols is None:
+            selected = sorted(self.issuer_ciks)
+        else:
+            selected = []
+            for value in symbols:
+                symbol = str(value or "").strip().upper()
+                if symbol in self.issuer_ciks and symbol not in selected:
+                    selected.append(symbol)
+        failures: Dict[str, str] = {}
+        if not selected:
+            return failures
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self._warm, symbol, self.resolve_cik(symbol)): symbol for symbol in selected}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    future.result()
+                except ForeignIssuerCoverageError as error:
+                    failures.setdefault(symbol, error.reason)
+                    logger.warning("foreign prefetch failed for %s: %s", symbol, error.reason)
+        return failures
+
+    def _warm(self, symbol: str, cik: str) -> None:
+        submissions = self._scoped_payload(symbol, "submissions", cik, self.submissions_url.format(cik=cik))
+        if _latest_filing_date(submissions) is None:
+            raise ForeignIssuerUnavailable("SEC submissions contain no 20-F/20-F/A filing", symbol=symbol, cik=cik)
+        self._scoped_payload(symbol, "companyfacts", cik, self.facts_url_template.format(cik=cik))
+
     def coverage(self, symbol: str, *, max_quarters: Optional[int] = 12) -> ForeignIssuerCoverageResult:
         symbol = str(symbol or "").strip().upper()
         try:
@@ -790,6 +894,7 @@ def get_foreign_issuer_coverage(
 
 __all__ = [
     "DEFAULT_FOREIGN_CACHE_DIR",
+    "DEFAULT_PREFETCH_WORKERS",
     "DEFAULT_TIMEOUT_SECONDS",
     "DEFAULT_USER_AGENT",
     "FOREIGN_ISSUER_CIKS",
@@ -0,0 +1,151 @@
+"""Date-indexed FX rates used to express reported financials in USD.
+
+Rates live in a small local CSV (``data/fx_rates.csv``) with one row per
+``date,currency,units_per_usd`` observation.  Daily and period-end rows can be
+mixed; each quarter is converted with the latest rate on or before its
+period-end date.  USD is implicit and always ``1.0``.
+
+The store fails closed: a currency without any rows, or a quarter dated
+before the first known rate for its currency, raises instead of being scaled
+as USD.  Rates are parsed once per store and shared across tickers.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_FX_RATES_PATH = BASE_DIR / "data" / "fx_rates.csv"
+BASE_CURRENCY = "USD"
+FX_RATE_COLUMNS = ("date", "currency", "units_per_usd")
+
+
+class FXRateError(RuntimeError):
+    """Raised when a reported currency cannot be converted to USD safely."""
+
+
+@dataclass
+class FXRateStore:
+    """Lazily loaded, in-memory as-of lookup over a local FX rate file."""
+
+    path: Path = DEFAULT_FX_RATES_PATH
+    _rates: Optional[pd.DataFrame] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.path = Path(self.path)
+
+    def load(self) -> pd.DataFrame:
+        """Return the parsed rate table sorted by date, loading it once."""
+
+        with self._lock:
+            if self._rates is None:
+                self._rates = self._read(self.path)
+            return self._rates
+
+    @staticmethod
+    def _read(path: Path) -> pd.DataFrame:
+        if not os.path.exists(path):
+            # Without a rate file only USD can be valued; every other
+            # currency is reported as unsupported by ``units_per_usd``.
+            return pd.DataFrame({
+                "date": pd.Series(dtype="datetime64[ns]"),
+                "currency": pd.Series(dtype=object),
+                "units_per_usd": pd.Series(dtype=float),
+            })
+        try:
+            frame = pd.read_csv(path, dtype={"currency": str})
+            missing = [column for column in FX_RATE_COLUMNS if column not in frame.columns]
+            if missing:
+                raise FXRateError(f"FX rate file {path} lacks columns: {', '.join(missing)}")
+            frame = frame[list(FX_RATE_COLUMNS)].copy()
+            frame["date"] = pd.to_datetime(frame["date"], errors="raise")
+            frame["currency"] = frame["currency"].str.strip().str.upper()
+            frame["units_per_usd"] = pd.to_numeric(frame["units_per_usd"], errors="raise")
+        except (OSError, TypeError, ValueError) as error:
+            raise FXRateError(f"FX rate file {path} is invalid: {error}") from error
+        if frame.isna().any().any() or (frame["units_per_usd"] <= 0).any():
+            raise FXRateError(f"FX rate file {path} contains empty or non-positive rates")
+        return (
+            frame.drop_duplicates(["currency", "date"], keep="last")
+            .sort_values("date", kind="mergesort")
+            .reset_index(drop=True)
+        )
+
+    def currencies(self) -> Tuple[str, ...]:
+        """Return every convertible currency, including USD."""
+
+        return tuple(sorted({BASE_CURRENCY, *self.load()["currency"].unique()}))
+
+    def units_per_usd(self, currencies: Iterable[str], dates: Iterable) -> pd.Series:
+        """Return the as-of rate for each ``(currency, date)`` pair.
+
+        The result is positionally aligned with the inputs.  One merge covers
+        every quarter of a ticker, so callers divide whole metric frames by
+        the returned series instead of looping per period.
+        """
+
+        query = pd.DataFrame({
+            "currency": [str(value or BASE_CURRENCY).strip().upper() for value in currencies],
+            "date": pd.to_datetime(list(dates)),
+        })
+        if query.empty:
+            return pd.Series(dtype=float)
+        if query["date"].dt.tz is not None:
+            query["date"] = query["date"].dt.tz_localize(None)
+        query["position"] = range(len(query))
+
+        rates = self.load()
+        unknown = sorted(set(query["currency"]) - {BASE_CURRENCY} - set(rates["currency"]))
+        if unknown:
+            raise FXRateError(
+                f"unsupported financial currency {unknown[0]}; refusing unscaled valuation"
+            )
+
+        foreign = query[query["currency"] != BASE_CURRENCY].sort_values("date", kind="mergesort")
+        result = pd.Series(1.0, index=query["position"].to_numpy(), dtype=float)
+        if not foreign.empty:
+            matched = pd.merge_asof(
+                foreign,
+                rates.astype({"date": foreign["date"].dtype}),
+                on="date",
+                by="currency",
+                direction="backward",
+            )
+            gaps = matched[matched["units_per_usd"].isna()]
+            if not gaps.empty:
+                first = gaps.iloc[0]
+                raise FXRateError(
+                    f"no {first['currency']} FX rate on or before {first['date']:%Y-%m-%d}; "
+                    "refusing unscaled valuation"
+                )
+            result.loc[matched["position"].to_numpy()] = matched["units_per_usd"].to_numpy()
+        return result.sort_index().reset_index(drop=True)
+
+    def to_usd(self, frame: pd.DataFrame, columns: Iterable[str], currencies: Iterable[str]) -> pd.DataFrame:
+        """Divide ``columns`` of a date-indexed frame by their as-of rates."""
+
+        columns = list(columns)
+        rates = self.units_per_usd(currencies, frame.index)
+        converted = frame.copy()
+        converted[columns] = frame[columns].div(rates.to_numpy(), axis=0)
+        return converted
+
+
+DEFAULT_FX_RATE_STORE = FXRateStore()
+
+
+__all__ = [
+    "BASE_CURRENCY",
+    "DEFAULT_FX_RATES_PATH",
+    "DEFAULT_FX_RATE_STORE",
+    "FXRateError",
+    "FXRateStore",
+]
@@ -1,9 +1,13 @@
 import os
 import json
 import sys
+import hashlib
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from fmp_cache import load_manifest, load_statements
+
 if hasattr(sys.stdout, "reconfigure"):
     sys.stdout.reconfigure(encoding="utf-8")
 
@@ -12,126 +16,220 @@ DATA_DIR = Path('data/fmp_cache')
 OUTPUT_DIR = Path('data/processed')
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 SOURCE_FINANCIAL_DIR = Path('data/source_financials')
+# Statement order for overlapping columns: earlier statements win.
+STATEMENT_PRECEDENCE = (
+    'income-statement',
+    'cash-flow-statement',
+    'enterprise-values',
+    'balance-sheet-statement',
+)
+# Input digests of the last run; unchanged tickers are not rewritten.
+DIGEST_NAME = '.digests.json'
+# Bump when the report output changes so every ticker is rebuilt once.
+REPORT_FORMAT_VERSION = '3'
+REPORT_WORKERS = 4
+GROWTH_KPIS = ['revenue', 'netIncome', 'operatingCashFlow', 'eps']
+# The prior quarter / same quarter last year is the latest period end
+# between (min, max) days earlier. The ranges admit 12-16 week fiscal
+# quarters and 52/53-week years, and skip near-duplicate period ends.
+GROWTH_WINDOWS = {'qoq': (45, 125), 'yoy': (340, 390)}
 
 def load_and_normalize_data(ticker_path):
     """
-    Reads all JSON files, handles lists correctly, and grabs all dates found.
+    Reads the ticker's consolidated statement store (migrating a legacy
+    per-quarter directory on first read) and grabs all dates found.
     """
-    data_store = {
-        'income-statement': [],
-        'cash-flow-statement': [],
-        'enterprise-values': [], # Added support for this file type
-        'balance-sheet-statement': []
-    }
-    
-    print(f"--- Scanning files for {ticker_path.name} ---")
+    data_store = {statement: [] for statement in STATEMENT_PRECEDENCE}
+    skipped = []
 
-    for file_path in ticker_path.glob('*.json'):
-        filename = file_path.name
-        
+    for key, items in load_statements(ticker_path).items():
         # Identify Statement Type
-        if 'income-statement' in filename:
-            st_type = 'income-statement'
-        elif 'cash-flow' in filename:
-            st_type = 'cash-flow-statement'
-        elif 'enterprise-values' in filename:
-            st_type = 'enterprise-values'
-        elif 'balance-sheet-statement' in filename:
-            st_type = 'balance-sheet-statement'
-        else:
-            print(f"⚠️  Skipping unknown file type: {filename}")
+        st_type = key.rsplit('_', 1)[0]
+        if st_type not in data_store:
+            skipped.append(key)
             continue
+        data_store[st_type].extend(items)
 
-        try:
-            with open(file_path, 'r') as f:
-                content = json.load(f)
-                
-                # FIX: Handle both Lists and Single Objects
-                if isinstance(content, list):
-                    items = content # Take ALL items, not just [0]
-                else:
-                    items = [content]
-
-                # Append valid items
-                count_added = 0
-                for item in items:
-                    if item and 'date' in item:
-                        data_store[st_type].append(item)
-                        count_added += 1
-                
-                # Debug: Show user what dates were found in this file
-                if count_added > 0:
-                    found_dates = [x['date'] for x in items if 'date' in x]
-                    print(f"   📄 {filename}: Found {count_added} records. Dates: {found_dates}")
-                else:
-                    print(f"   ⚠️ {filename}: Valid JSON but no 'date' field found.")
-
-        except Exception as e:
-            print(f"   ❌ Error reading {filename}: {e}")
-
+    total = sum(len(records) for records in data_store.values())
+    print(f"--- {ticker_path.name}: {total} statement records loaded ---")
+    if skipped:
+        print(f"⚠️  Skipping unknown statement types: {skipped}")
     return data_store
 
+def calculate_growth_metrics_universe(frames):
+    """
+    Calculates QoQ and YoY growth for every ticker in one long-format frame.
+
+    Quarters are keyed by period-end date. The prior quarter and the same
+    quarter last year are found with a vectorized backward as-of join per
+    ticker: the latest row inside the GROWTH_WINDOWS day range before each
+    period end. A missing quarter yields NaN instead of a comparison
+    against whichever row happens to sit four positions earlier.
+
+    ``frames`` maps ticker -> frame with a datetime ``date`` column; the
+    result maps each ticker to its frame with growth columns, newest first.
+    """
+    parts = [df.assign(_ticker=ticker) for ticker, df in frames.items() if df is not None and not df.empty]
+    if not parts:
+        return {ticker: df for ticker, df in frames.items()}
+    universe = pd.concat(parts, ignore_index=True)
+    kpis = [kpi for kpi in GROWTH_KPIS if kpi in universe.columns]
+    universe['_row'] = range(len(universe))
+
+    history = universe[['_ticker', 'date', *kpis]].rename(columns={'date': '_match'})
+    history = history.rename(columns={kpi: f'{kpi}_prior' for kpi in kpis}).sort_values('_match')
+    for suffix, (min_days, max_days) in GROWTH_WINDOWS.items():
+        targets = universe[['_row', '_ticker', 'date']].assign(
+            _match=universe['date'] - pd.Timedelta(days=min_days)
+        )
+        matched = pd.merge_asof(
+            targets.sort_values('_match'),
+            history,
+            on='_match',
+            by='_ticker',
+            direction='backward',
+            tolerance=pd.Timedelta(days=max_days - min_days),
+        ).set_index('_row').sort_index()
+        for kpi in kpis:
+            universe[f'{kpi}_{suffix}'] = (universe[kpi] / matched[f'{kpi}_prior'].to_numpy() - 1) * 100
+
+    results = {}
+    for ticker, group in universe.groupby('_ticker', sort=False):
+        original = frames[ticker]
+        growth_columns = [f'{kpi}_{suffix}' for kpi in kpis if kpi in original.columns for suffix in GROWTH_WINDOWS]
+        columns = [column for column in original.columns if column not in growth_columns] + growth_columns
+        # Return to descending order (newest first) for the JSON export
+        results[ticker] = group[columns].sort_values('date', ascending=False).reset_index(drop=True)
+    for ticker, df in frames.items():
+        results.setdefault(ticker, df)
+    return results
+
 def calculate_growth_metrics(df):
     """
-    Calculates YoY and QoQ growth for key financial metrics.
-    Assumes data is sorted by date ascending for shift operations.
+    Calculates YoY and QoQ growth for key financial metrics of one ticker.
     """
-    # Sort ascending for time-series calculations
-    df = df.sort_values('date', ascending=True)
-    
-    # Define which columns we want to track growth for
-    kpis = ['revenue', 'netIncome', 'operatingCashFlow', 'eps']
-    
-    for kpi in kpis:
-        if kpi in df.columns:
-            # QoQ: Compare to the row immediately above (previous quarter)
-            df[f'{kpi}_qoq'] = df[kpi].pct_change(periods=1, fill_method=None) * 100
-
-            # YoY: Compare to 4 rows above (same quarter last year)
-            # This assumes your data is consistently quarterly with no gaps
-            df[f'{kpi}_yoy'] = df[kpi].pct_change(periods=4, fill_method=None) * 100
-            
-    # Return to descending order (newest first) for the JSON export
-    return df.sort_values('date', ascending=False)
+    return calculate_growth_metrics_universe({'_': df})['_']
 
-def combine_statements(data_store):
-    dfs = []
-    
-    for st_type, records in data_store.items():
-        if not records:
-            continue
-        
-        # Create DataFrame and Remove Duplicates (in case multiple files have same date)
-        df = pd.DataFrame(records)
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Deduplicate based on date (keep the last one found if duplicates exist)
-        df = df.drop_duplicates(subset=['date'], keep='last')
-        
-        df = df.set_index('date')
-        
-        # Optional: Add suffix to columns if you want to distinguish source (e.g., _inc, _bs)
-        # For simplicity in visuals, we often keep original names, but be careful of overlapping keys like 'symbol'
-        dfs.append(df)
-
-    if not dfs:
+def merge_statements(data_store):
+    """
+    Concatenates every statement record once and collapses them to one row
+    per date, newest first. Overlapping columns (``symbol``, ``period``,
+    ...) take the first non-null value in STATEMENT_PRECEDENCE order instead
+    of getting ``_1``/``_2`` suffixed copies.
+    """
+    records = []
+    ranks = []
+    for rank, st_type in enumerate(STATEMENT_PRECEDENCE):
+        items = data_store.get(st_type) or []
+        records.extend(items)
+        ranks.extend([rank] * len(items))
+
+    if not records:
         return None
 
-    # Merge all DataFrames on 'date' index
-    combined_df = dfs[0]
-    for i in range(1, len(dfs)):
-        combined_df = combined_df.join(dfs[i], how='outer', rsuffix=f'_{i}') 
-        # Note: rsuffix handles colliding column names (like 'symbol' or 'period')
+    frame = pd.DataFrame.from_records(records)
+    frame['date'] = pd.to_datetime(frame['date'])
+    frame['_rank'] = ranks
+
+    # Deduplicate within a statement (keep the last one found if the same
+    # date appears twice), then let higher-precedence statements win.
+    frame = frame.drop_duplicates(subset=['_rank', 'date'], keep='last')
+    frame = frame.sort_values('_rank', kind='stable').drop(columns='_rank')
+    merged = frame.groupby('date', sort=False).first()
+
+    return merged.sort_index(ascending=False).reset_index()
+
+def combine_statements(data_store):
+    """
+    Merges one ticker's statements and adds growth metrics for export.
+    """
+    combined_df = merge_statements(data_store)
+    if combined_df is None:
+        return None
 
-    combined_df = combined_df.sort_index(ascending=False).reset_index()
-    
-    # --- NEW: Calculate Growth ---
     combined_df = calculate_growth_metrics(combined_df)
 
     combined_df['date'] = combined_df['date'].dt.strftime('%Y-%m-%d')
     
     return combined_df
 
+def input_digest(ticker_path):
+    """
+    Returns a digest of the inputs a ticker's report is built from: the
+    routed financial artifact when one exists, otherwise the FMP cache
+    manifest (whose per-statement hashes cover the whole store).
+    """
+    routed_path = SOURCE_FINANCIAL_DIR / f"{ticker_path.name.upper()}_combined.json"
+    if routed_path.is_file():
+        kind, payload = 'routed', routed_path.read_bytes()
+    else:
+        manifest = load_manifest(ticker_path) or {}
+        statements = {key: entry.get('sha256') for key, entry in (manifest.get('statements') or {}).items()}
+        kind, payload = 'fmp_cache', json.dumps(statements, sort_keys=True).encode('utf-8')
+    return f"{REPORT_FORMAT_VERSION}:{kind}:{hashlib.sha256(payload).hexdigest()}"
+
+def load_digests():
+    try:
+        digests = json.loads((OUTPUT_DIR / DIGEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return digests if isinstance(digests, dict) else {}
+
+def write_digests(digests):
+    path = OUTPUT_DIR / DIGEST_NAME
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps(dict(sorted(digests.items())), indent=2), encoding="utf-8")
+    os.replace(temp_path, path)
+
+def process_ticker(ticker_path, previous_digest=None):
+    """
+    Prepares one ticker's report and returns ``(digest, merged_df)``.
+
+    Routed artifacts are written here and unchanged inputs with an existing
+    output are skipped; both return no frame. FMP cache tickers return
+    their merged statements, which still need growth metrics and writing.
+    The digest is None when there was nothing to combine.
+    """
+    ticker = ticker_path.name.upper()
+    digest = input_digest(ticker_path)
+    output_file = OUTPUT_DIR / f"{ticker}_combined.json"
+    if digest == previous_digest and output_file.is_file():
+        print(f"Unchanged inputs for {ticker}; keeping {output_file}")
+        return digest, None
+
+    print(f"\nPROCESSING TICKER: {ticker_path.name}")
+
+    # Prefer the rows routed by the valuation batch. This prevents the
+    # earnings export from silently reverting to legacy FMP cache data.
+    routed_path = SOURCE_FINANCIAL_DIR / f"{ticker}_combined.json"
+    if routed_path.is_file():
+        try:
+            routed_rows = json.loads(routed_path.read_text(encoding="utf-8"))
+            if not isinstance(routed_rows, list) or not routed_rows:
+                raise ValueError("routed financial rows are empty")
+            if any(not isinstance(row, dict) or not row.get("sourceType") for row in routed_rows):
+                raise ValueError("routed financial rows lack source provenance")
+            output_file.write_text(json.dumps(routed_rows, ensure_ascii=False, indent=4), encoding="utf-8")
+            print(f"Using routed financial source for {ticker_path.name}: {routed_path}")
+            return digest, None
+        except (OSError, json.JSONDecodeError, ValueError) as error:
+            raise RuntimeError(f"{ticker_path.name}: invalid routed financial artifact: {error}") from error
+
+    merged_df = merge_statements(load_and_normalize_data(ticker_path))
+    if merged_df is None or merged_df.empty:
+        print(f"❌ No combineable data found for {ticker_path.name}")
+        return None, None
+    return digest, merged_df
+
+def write_combined(ticker, combined_df):
+    combined_df = combined_df.copy()
+    combined_df['date'] = combined_df['date'].dt.strftime('%Y-%m-%d')
+    output_file = OUTPUT_DIR / f"{ticker}_combined.json"
+    combined_df.to_json(output_file, orient='records', indent=4)
+    print(f"✅ Success! Combined data saved to {output_file}")
+    print(f"   Total Rows (Quarters): {len(combined_df)}")
+    print(f"   Date Range: {combined_df['date'].min()} to {combined_df['date'].max()}")
+
 def main():
     if not DATA_DIR.exists():
         print(f"Directory {DATA_DIR} not found.")
@@ -142,38 +240,40 @@ def main():
         ticker_paths.setdefault(path.name.removesuffix("_combined.json").upper(), DATA_DIR / path.name.removesuffix("_combined.json"))
     tickers = [ticker_paths[name] for name in sorted(ticker_paths)]
 
-    for ticker_path in tickers:
-        print(f"\nPROCESSING TICKER: {ticker_path.name}")
-
-        # Prefer the rows routed by the valuation batch. This prevents the
-        # earnings export from silently reverting to legacy FMP cache data.
-        routed_path = SOURCE_FINANCIAL_DIR / f"{ticker_path.name.upper()}_combined.json"
-        if routed_path.is_file():
+    previous = load_digests()
+    digests = {}
+    pending = {}
+    errors = []
+    with ThreadPoolExecutor(max_workers=REPORT_WORKERS) as pool:
+        futures = {
+            pool.submit(process_ticker, path, previous.get(path.name.upper())): path.name.upper()
+            for path in tickers
+        }
+        for future in as_completed(futures):
             try:
-                routed_rows = json.loads(routed_path.read_text(encoding="utf-8"))
-                if not isinstance(routed_rows, list) or not routed_rows:
-                    raise ValueError("routed financial rows are empty")
-                if any(not isinstance(row, dict) or not row.get("sourceType") for row in routed_rows):
-                    raise ValueError("routed financial rows lack source provenance")
-                (OUTPUT_DIR / f"{ticker_path.name.upper()}_combined.json").write_text(
-                    json.dumps(routed_rows, ensure_ascii=False, indent=4), encoding="utf-8"
-                )
-                print(f"Using routed financial source for {ticker_path.name}: {routed_path}")
+                digest, merged_df = future.result()
+            except Exception as error:
+                errors.append(error)
                 continue
-            except (OSError, json.JSONDecodeError, ValueError) as error:
-                raise RuntimeError(f"{ticker_path.name}: invalid routed financial artifact: {error}") from error
-        
-        data_store = load_and_normalize_data(ticker_path)
-        combined_df = combine_statements(data_store)
-        
-        if combined_df is not None and not combined_df.empty:
-            output_file = OUTPUT_DIR / f"{ticker_path.name}_combined.json"
-            combined_df.to_json(output_file, orient='records', indent=4)
-            print(f"✅ Success! Combined data saved to {output_file}")
-            print(f"   Total Rows (Quarters): {len(combined_df)}")
-            print(f"   Date Range: {combined_df['date'].min()} to {combined_df['date'].max()}")
-        else:
-            print(f"❌ No combineable data found for {ticker_path.name}")
+            if merged_df is not None:
+                pending[futures[future]] = (digest, merged_df)
+            elif digest is not None:
+                digests[futures[future]] = digest
+
+    try:
+        # Growth for every rebuilt ticker is computed in one vectorized pass,
+        # then scattered back to the per-ticker outputs.
+        if pending:
+            with_growth = calculate_growth_metrics_universe({ticker: df for ticker, (_, df) in pending.items()})
+            for ticker, (digest, _) in sorted(pending.items()):
+                write_combined(ticker, with_growth[ticker])
+                digests[ticker] = digest
+    finally:
+        # Only tickers rebuilt (or confirmed unchanged) in this run keep a
+        # digest, so a failed ticker is always rebuilt next time.
+        write_digests(digests)
+    if errors:
+        raise errors[0]
 
 if __name__ == "__main__":
     main()
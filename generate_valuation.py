@@ -7,11 +7,13 @@ import os
 import time
 import logging
 import argparse
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
 
 from price_adapter import PriceSourceUnavailable, YahooPriceAdapter
 from financial_source_router import (
+    DEFAULT_ROUTE_WORKERS,
     FMPInvalidPayloadError,
     FMPQuotaError,
     FMPRateLimitError,
@@ -19,10 +21,27 @@ from financial_source_router import (
     FinancialSourceResult,
     FinancialSourceRouter,
     FMPCircuitBreaker,
+    SECNegativeCoverageCache,
 )
-from sec_company_facts import SECCompanyFactsSource
+from sec_company_facts import SECCompanyFactsSource, SECFramesSource
 from foreign_issuer_coverage import ForeignIssuerCoverageSource
-from ticker_universe import DEFAULT_TICKERS, UniverseValidationError, resolve_tickers, yahoo_symbol
+import fmp_cache
+from fmp_cache import latest_processed_quarter, load_manifest, load_statements, statement_key, write_statement
+from fx_rates import DEFAULT_FX_RATE_STORE
+from refresh_planner import RefreshPlanner
+from run_status import StatusIndex
+from pipeline_runner import PRICE_CHECKPOINT_DIR, file_digest, input_digest
+from source_telemetry import SourceTelemetry, measure
+from storage import DEFAULT_SQLITE_PATH, STORAGE_BACKENDS, JsonFileStore, SQLiteDatabase, export_json
+from ticker_scheduler import TickerScheduler
+from ticker_universe import (
+    DEFAULT_TICKERS,
+    UniverseValidationError,
+    parse_shard,
+    resolve_tickers,
+    select_shard,
+    yahoo_symbol,
+)
 
 # from dotenv import load_dotenv
 
@@ -41,10 +60,17 @@ FMP_API_KEY = os.getenv('FMP_API_KEY')
 FMP_API_KEY_2 = os.getenv('FMP_API_KEY_2')
 FMP_API_KEY_3 = os.getenv('FMP_API_KEY_3')
 FMP_REQUEST_TIMEOUT_SECONDS = 30
+# Bounded fan-out for the endpoint x quarter requests of one fallback ticker.
+FMP_MAX_CONCURRENT_REQUESTS = 4
+# Price frames are fetched and held for at most this many tickers at a time.
+PRICE_BATCH_SIZE = 4 * DEFAULT_ROUTE_WORKERS
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(BASE_DIR, "data")
 CACHE_BASE_DIR = os.path.join(OUTPUT_DIR, "fmp_cache") # ç·©å­˜ä¸»ç›®éŒ„
 SOURCE_FINANCIAL_DIR = os.path.join(OUTPUT_DIR, "source_financials")
+SOURCE_METRICS_PATH = os.path.join(OUTPUT_DIR, "telemetry", "source_metrics.json")
+RUN_COSTS_PATH = os.path.join(OUTPUT_DIR, "results", "run_costs.json")
+STATUS_INDEX = StatusIndex(Path(OUTPUT_DIR) / "results" / "status_index.json", base_dir=Path(BASE_DIR))
 DOW_30 = list(DEFAULT_TICKERS)
 # DOW_30 = [
 #     "AAPL", "ABBV", "ADBE", "AMD", "AMZN", "BA", "BABA", "BAC",
@@ -58,55 +84,29 @@ DOW_30 = list(DEFAULT_TICKERS)
 
 WINDOWS = {"1Y": 252, "2Y": 504, "3Y": 756, "5Y": 1260}
 QUARTERS = ['q1', 'q2', 'q3', 'q4']
-SUPPORTED_FX_RATES = {"USD": 1.0, "TWD": 32.5}
-CACHE_EXPIRY_DAYS = 3
+PER_SHARE_COLUMNS = ["sales_ps_adj", "eps_adj", "fcf_ps_adj"]
+FX_RATE_STORE = DEFAULT_FX_RATE_STORE
+REFRESH_PLANNER = RefreshPlanner()
 YFINANCE_MAX_ATTEMPTS = 3
 YFINANCE_RETRY_DELAY_SECONDS = 15
 YFINANCE_TIMEOUT_SECONDS = 30
 FINANCIAL_SOURCE_ROUTER = None
 LAST_FINANCIAL_SOURCE_RESULT = None
+SOURCE_TELEMETRY = SourceTelemetry()
+# Installed by pipeline_runner; ``None`` keeps direct runs checkpoint-free.
+CHECKPOINTS = None
+# SQLite ``results`` namespace when ``--storage sqlite``; ``None`` writes the
+# JSON files under ``OUTPUT_DIR/results`` directly.
+RESULTS_STORE = None
 
 # --- Helper Functions --- Get latest processed quarter ---
 def get_latest_processed_quarter(ticker):
-    # Path to the ticker's cache directory
-    ticker_cache_dir = os.path.join(CACHE_BASE_DIR, ticker.upper())
-    if not os.path.exists(ticker_cache_dir):
-        return None
-
-    # Use pandas to read all JSON files in the directory
-    try:
-        dfs = []
-        for f_name in os.listdir(ticker_cache_dir):
-            if f_name.endswith('.json'):
-                file_path = os.path.join(ticker_cache_dir, f_name)
-                df = pd.read_json(file_path)
-                # Extract the statement type from the filename (e.g., "income-statement_q1.json" -> "income-statement")
-                df['statement_type'] = f_name.split('_')[0]
-                dfs.append(df)
-    except Exception as e:
-        logger.warning(f"Error reading JSON files from {ticker_cache_dir}: {e}")
-        return None
-
-    if not dfs:
-        return None
-
-    combined_df = pd.concat(dfs).set_index('date')
-    combined_df = combined_df.groupby('date').agg(statement_count=('statement_type', 'count'), period=('period', 'first')).reset_index().set_index('date').sort_index()
-
-    # Filter for dates where all statement types are present (or at least 4, assuming 4 statement types)
-    combined_df = combined_df[combined_df['statement_count'] > 3]
-
-    # Find the maximum date from the combined DataFrame's index
-
-    if combined_df.empty:
-        return None
-    else:
-        latest_date_str = combined_df.index.max().strftime('%Y-%m-%d')
-        latest_period = combined_df.loc[latest_date_str, 'period']
-        quarter = latest_period.lower()  # e.g., 'Q1', 'Q2', etc.
-        return quarter
-
+    """Return the fiscal quarter of the newest date all four statements cover.
 
+    The answer comes from the ticker's FMP cache manifest; a cache directory
+    without one is scanned once and the manifest is written for next time.
+    """
+    return latest_processed_quarter(Path(CACHE_BASE_DIR) / ticker.upper())
 
 
 def get_next_quarter(current_q_str):
@@ -122,14 +122,9 @@ def get_next_quarter(current_q_str):
         return "q1"
 
 # --- 2. æŠ½å–å±¤ (Extract Layer) ---
-def get_fmp_fragmented(endpoint, ticker, *, api_keys=None, circuit_breaker=None):
-    """
-    [Data Engineering Logic]:
-    è‡ªå‹•å»ºç«‹å°æ‡‰ ticker çš„å­è³‡æ–™å¤¾ï¼Œä¸¦å¯¦æ–½ã€Žå¢žé‡åˆä½µç­–ç•¥ã€ã€‚
-    é˜²æ­¢æ–° API æ•¸æ“šè¦†è“‹æŽ‰èˆŠçš„æ­·å²è²¡å ±æ•¸æ“š (å°¤å…¶æ˜¯è§£æ±º FMP 5å¹´é™åˆ¶)ã€‚
-    """
-    ticker = ticker.upper()
-    combined_all_quarters = []
+def _fmp_cache_state(ticker):
+    """Read the cache state every endpoint/quarter task of ``ticker`` shares."""
+
     ticker_cache_dir = os.path.join(CACHE_BASE_DIR, ticker)
     os.makedirs(ticker_cache_dir, exist_ok=True)
 
@@ -139,145 +134,218 @@ def get_fmp_fragmented(endpoint, ticker, *, api_keys=None, circuit_breaker=None)
 
     logger.info(f"<{ticker}> Start fragmented fetch. Latest processed: {latest_q} and next target is: {next_q}")
 
-    # 2. éæ­·å››å­£é€²è¡Œè™•ç†
-    for q in QUARTERS:
-        print("--- Processing", q, "for", ticker," ", endpoint, "---")
-        cache_path = os.path.join(ticker_cache_dir, f"{endpoint}_{q}.json")
-        is_target_increment = (q == next_q)
-
-        # æª¢æŸ¥ç·©å­˜ç‹€æ…‹
-        cache_exists = os.path.exists(cache_path)
-        is_expired = False
-        if cache_exists:
-            mtime = os.path.getmtime(cache_path)
-            is_expired = (time.time() - mtime) > (CACHE_EXPIRY_DAYS * 86400)
-            is_expired = True # Forcing expiry for running in Github Actions frequently
-
-        # æ±ºå®šæ˜¯å¦éœ€è¦èª¿ç”¨ API
-        # æ¢ä»¶ï¼šç·©å­˜ä¸å­˜åœ¨ OR è©²å­£åº¦æ˜¯æˆ‘å€‘è¿½è¹¤çš„ã€Œä¸‹ä¸€å€‹å¢žé‡é»žã€ä¸”å·²éŽæœŸ
-        needs_api_call = not cache_exists or (is_target_increment and is_expired)
-        print(f"needs_api_call for {ticker} {q} {endpoint}: {needs_api_call}")
-
-        existing_data = []
-        if cache_exists:
+    # The target quarter is refreshed only once its filing can exist; until
+    # the expected window opens the cached statements are served as-is.
+    refresh_plan = REFRESH_PLANNER.plan((load_manifest(Path(ticker_cache_dir)) or {}).get("filings", []))
+    logger.info(f"<{ticker}> Refresh due: {refresh_plan.due} ({refresh_plan.reason})")
+    # One read of the consolidated store serves all four quarters.
+    cached_statements = load_statements(Path(ticker_cache_dir))
+    return ticker_cache_dir, next_q, refresh_plan, cached_statements
+
+
+def _fetch_fmp_quarter(endpoint, ticker, q, cache_state, *, api_keys=None, circuit_breaker=None):
+    """Serve or refresh one endpoint/quarter statement.
+
+    Returns its rows and whether the statement needed an API call.
+    """
+
+    ticker_cache_dir, next_q, refresh_plan, cached_statements = cache_state
+    print("--- Processing", q, "for", ticker," ", endpoint, "---")
+    cache_key = statement_key(endpoint, q)
+    is_target_increment = (q == next_q)
+
+    # æª¢æŸ¥ç·©å­˜ç‹€æ…‹
+    cache_exists = cache_key in cached_statements
+    is_expired = False
+    if cache_exists:
+        is_expired = refresh_plan.due
+
+    # æ±ºå®šæ˜¯å¦éœ€è¦èª¿ç”¨ API
+    # æ¢ä»¶ï¼šç·©å­˜ä¸å­˜åœ¨ OR è©²å­£åº¦æ˜¯æˆ‘å€‘è¿½è¹¤çš„ã€Œä¸‹ä¸€å€‹å¢žé‡é»žã€ä¸”å·²éŽæœŸ
+    needs_api_call = not cache_exists or (is_target_increment and is_expired)
+    cache_outcome = "miss" if not cache_exists else ("expired" if needs_api_call else "hit")
+    SOURCE_TELEMETRY.record_cache("fmp", cache_outcome, symbol=ticker)
+    print(f"needs_api_call for {ticker} {q} {endpoint}: {needs_api_call}")
+
+    existing_data = cached_statements.get(cache_key, [])
+
+    if needs_api_call:
+        action = "Incremental Update" if cache_exists else "Initial Fetch"
+        logger.info(f"<{ticker}> {action} for {q} {endpoint}...")
+        refresh_succeeded = False
+
+        configured_keys = [key for key in (FMP_API_KEY, FMP_API_KEY_2, FMP_API_KEY_3) if key] if api_keys is None else list(api_keys)
+        # FMP fallback is intentionally single-key.  Additional keys are
+        # not a retry lane: a rate-limit/quota response must stop the
+        # ticker rather than hide provider exhaustion.
+        if api_keys is None:
+            configured_keys = configured_keys[:1]
+        api_keys_to_try = [key for key in configured_keys if key]
+        if not api_keys_to_try:
+            logger.error(f"<{ticker}> No FMP API keys configured; cannot refresh {q} {endpoint}.")
+        else:
+          for api_key in api_keys_to_try:
+            if circuit_breaker is not None:
+                circuit_breaker.check()
+            url = f"https://financialmodelingprep.com/stable/{endpoint}/?symbol={ticker}&period={q}&apikey={api_key}"
             try:
-                with open(cache_path, 'r') as f:
-                    logger.info(f"<{ticker}> Loading existing cache for {q} {endpoint}...")
-                    existing_data = json.load(f)
-            except Exception as e:
-                logger.error(f"<{ticker}> Failed to load cache {q} {endpoint}: {e}")
-
-        if needs_api_call:
-            action = "Incremental Update" if cache_exists else "Initial Fetch"
-            logger.info(f"<{ticker}> {action} for {q} {endpoint}...")
-            refresh_succeeded = False
-
-            configured_keys = [key for key in (FMP_API_KEY, FMP_API_KEY_2, FMP_API_KEY_3) if key] if api_keys is None else list(api_keys)
-            # FMP fallback is intentionally single-key.  Additional keys are
-            # not a retry lane: a rate-limit/quota response must stop the
-            # ticker rather than hide provider exhaustion.
-            if api_keys is None:
-                configured_keys = configured_keys[:1]
-            api_keys_to_try = [key for key in configured_keys if key]
-            if not api_keys_to_try:
-                logger.error(f"<{ticker}> No FMP API keys configured; cannot refresh {q} {endpoint}.")
-            else:
-              for api_key in api_keys_to_try:
-                if circuit_breaker is not None:
-                    circuit_breaker.check()
-                url = f"https://financialmodelingprep.com/stable/{endpoint}/?symbol={ticker}&period={q}&apikey={api_key}"
-                try:
+                with measure(SOURCE_TELEMETRY, "fmp", symbol=ticker) as record:
                     response = requests.get(url, timeout=FMP_REQUEST_TIMEOUT_SECONDS)
-                    response.raise_for_status() # æª¢æŸ¥ HTTP ç‹€æ…‹ç¢¼
-                    res_json = response.json()
-
-                    if isinstance(res_json, list):
-                        if len(res_json) > 0:
-                            incoming_dates = []
-                            invalid_date = False
-                            for item in res_json:
-                                try:
-                                    incoming_dates.append(pd.to_datetime(item["date"], errors="raise"))
-                                except (KeyError, TypeError, ValueError):
-                                    invalid_date = True
-                                    break
-                            if invalid_date or not incoming_dates:
-                                logger.error(f"<{ticker}> API returned records with invalid dates for {q} {endpoint} using key: {api_key}.")
-                                if circuit_breaker is not None:
-                                    raise FMPInvalidPayloadError(f"{ticker}: invalid FMP dates for {q} {endpoint}")
-                                continue
-                            existing_dates = []
-                            for item in existing_data:
-                                try:
-                                    existing_dates.append(pd.to_datetime(item["date"], errors="raise"))
-                                except (KeyError, TypeError, ValueError):
-                                    existing_dates = []
-                                    break
-                            if existing_dates and max(incoming_dates) <= max(existing_dates):
-                                logger.error(f"<{ticker}> API returned stale dates for {q} {endpoint} using key: {api_key}; refusing stale refresh.")
-                                if circuit_breaker is not None:
-                                    raise FMPStalePayloadError(f"{ticker}: stale FMP payload for {q} {endpoint}")
-                                continue
-                            # åŸ·è¡Œå¢žé‡åˆä½µé‚è¼¯
-                            data_map = {item['date']: item for item in existing_data}
-                            for item in res_json:
-                                data_map[item['date']] = item
-
-                            merged_res = sorted(data_map.values(), key=lambda x: x['date'], reverse=True)
-
-                            with open(cache_path, 'w') as f:
-                                json.dump(merged_res, f, indent=4)
-
-                            existing_data = merged_res
-                            refresh_succeeded = True
-                            logger.info(f"<{ticker}> {q} Cache updated. Records: {len(merged_res)} using key: {api_key}")
-                            break # Successfully fetched, break from API key loop
-                        else:
-                            logger.warning(f"<{ticker}> API returned empty list for {q} using key: {api_key}.")
-                            # If empty list, try next key if available, or continue if it's the last key
-                    else:
-                        # è™•ç† API å›žå‚³éŒ¯èª¤è¨Šæ¯çš„æƒ…æ³ (ä¾‹å¦‚ï¼šInvalid API Key)
-                        error_msg = res_json.get("Error Message", "Unknown API error")
-                        logger.error(f"<{ticker}> API Error for {q} using key: {api_key}: {error_msg}")
-                        lowered_error = str(error_msg).lower()
-                        if circuit_breaker is not None and any(
-                            marker in lowered_error for marker in ("quota", "rate limit", "limit reached", "too many requests")
-                        ):
-                            reason = f"{ticker}: FMP quota/rate limit for {q} {endpoint}: {error_msg}"
-                            circuit_breaker.trip(reason)
-                            raise FMPQuotaError(reason)
-                        # If error, try next key if available
-
-                    time.sleep(0.1) # ç¨å¾®é™ä½Žé »çŽ‡ï¼Œé¿å… Rate Limit
-                except requests.exceptions.HTTPError as http_err:
-                    status_code = getattr(getattr(http_err, "response", None), "status_code", None)
-                    if status_code == 429:
-                        logger.warning(f"<{ticker}> Rate limit hit (429) for {q} {endpoint} using key: {api_key}. Trying next key if available.")
-                        if circuit_breaker is not None:
-                            reason = f"{ticker}: FMP HTTP 429 for {q} {endpoint}"
-                            circuit_breaker.trip(reason)
-                            raise FMPRateLimitError(reason)
-                        time.sleep(1) # Wait a bit longer before trying the next key
-                        continue # Try the next API key
+                    record.observe(response)
+                response.raise_for_status() # æª¢æŸ¥ HTTP ç‹€æ…‹ç¢¼
+                res_json = response.json()
+
+                if isinstance(res_json, list):
+                    if len(res_json) > 0:
+                        incoming_dates = []
+                        invalid_date = False
+                        for item in res_json:
+                            try:
+                                incoming_dates.append(pd.to_datetime(item["date"], errors="raise"))
+                            except (KeyError, TypeError, ValueError):
+                                invalid_date = True
+                                break
+                        if invalid_date or not incoming_dates:
+                            logger.error(f"<{ticker}> API returned records with invalid dates for {q} {endpoint} using key: {api_key}.")
+                            if circuit_breaker is not None:
+                                raise FMPInvalidPayloadError(f"{ticker}: invalid FMP dates for {q} {endpoint}")
+                            continue
+                        existing_dates = []
+                        for item in existing_data:
+                            try:
+                                existing_dates.append(pd.to_datetime(item["date"], errors="raise"))
+                            except (KeyError, TypeError, ValueError):
+                                existing_dates = []
+                                break
+                        if existing_dates and max(incoming_dates) <= max(existing_dates):
+                            logger.error(f"<{ticker}> API returned stale dates for {q} {endpoint} using key: {api_key}; refusing stale refresh.")
+                            if circuit_breaker is not None:
+                                raise FMPStalePayloadError(f"{ticker}: stale FMP payload for {q} {endpoint}")
+                            continue
+                        # åŸ·è¡Œå¢žé‡åˆä½µé‚è¼¯
+                        data_map = {item['date']: item for item in existing_data}
+                        for item in res_json:
+                            data_map[item['date']] = item
+
+                        merged_res = sorted(data_map.values(), key=lambda x: x['date'], reverse=True)
+
+                        write_statement(ticker_cache_dir, cache_key, merged_res)
+
+                        existing_data = merged_res
+                        refresh_succeeded = True
+                        logger.info(f"<{ticker}> {q} Cache updated. Records: {len(merged_res)} using key: {api_key}")
+                        break # Successfully fetched, break from API key loop
                     else:
-                        logger.error(f"<{ticker}> HTTP error fetching {q} {endpoint} using key: {api_key}: {http_err}")
-                        break # Other HTTP errors are critical, stop trying
-                except Exception as e:
-                    logger.error(f"<{ticker}> Critical error fetching {q} {endpoint} using key: {api_key}: {e}")
-                    break # Other errors are critical, stop trying
+                        logger.warning(f"<{ticker}> API returned empty list for {q} using key: {api_key}.")
+                        # If empty list, try next key if available, or continue if it's the last key
+                else:
+                    # è™•ç† API å›žå‚³éŒ¯èª¤è¨Šæ¯çš„æƒ…æ³ (ä¾‹å¦‚ï¼šInvalid API Key)
+                    error_msg = res_json.get("Error Message", "Unknown API error")
+                    logger.error(f"<{ticker}> API Error for {q} using key: {api_key}: {error_msg}")
+                    lowered_error = str(error_msg).lower()
+                    if circuit_breaker is not None and any(
+                        marker in lowered_error for marker in ("quota", "rate limit", "limit reached", "too many requests")
+                    ):
+                        reason = f"{ticker}: FMP quota/rate limit for {q} {endpoint}: {error_msg}"
+                        circuit_breaker.trip(reason)
+                        raise FMPQuotaError(reason)
+                    # If error, try next key if available
+            except requests.exceptions.HTTPError as http_err:
+                status_code = getattr(getattr(http_err, "response", None), "status_code", None)
+                if status_code == 429:
+                    logger.warning(f"<{ticker}> Rate limit hit (429) for {q} {endpoint} using key: {api_key}. Trying next key if available.")
+                    if circuit_breaker is not None:
+                        reason = f"{ticker}: FMP HTTP 429 for {q} {endpoint}"
+                        circuit_breaker.trip(reason)
+                        raise FMPRateLimitError(reason)
+                    time.sleep(1) # Wait a bit longer before trying the next key
+                    continue # Try the next API key
+                else:
+                    logger.error(f"<{ticker}> HTTP error fetching {q} {endpoint} using key: {api_key}: {http_err}")
+                    break # Other HTTP errors are critical, stop trying
+            except Exception as e:
+                logger.error(f"<{ticker}> Critical error fetching {q} {endpoint} using key: {api_key}: {e}")
+                break # Other errors are critical, stop trying
+
+        if is_target_increment and is_expired and not refresh_succeeded:
+            raise RuntimeError(f"{ticker}: {endpoint} {q} refresh failed; refusing stale financial release")
+
+    # å°‡æ•¸æ“šåŒ¯ç¸½åˆ°æœ€çµ‚çµæžœ
+    return existing_data, needs_api_call
+
+
+def _fetch_fmp_statements(ticker, endpoints, *, api_keys=None, circuit_breaker=None):
+    """Fetch every endpoint x quarter of ``ticker`` under a bounded pool.
+
+    At most ``FMP_MAX_CONCURRENT_REQUESTS`` requests are in flight.  The first
+    failure (a tripped circuit breaker, a refused stale increment) cancels
+    every task that has not started; tasks already running re-check the
+    shared breaker before each request, so a quota or 429 response stops
+    them too.
 
-            if is_target_increment and is_expired and not refresh_succeeded:
-                raise RuntimeError(f"{ticker}: {endpoint} {q} refresh failed; refusing stale financial release")
+    Returns the rows per endpoint and whether any statement needed an API
+    call; ``False`` means every row was served from the cache.
+    """
+
+    ticker = ticker.upper()
+    cache_state = _fmp_cache_state(ticker)
+    tasks = [(endpoint, q) for endpoint in endpoints for q in QUARTERS]
+    results = {}
+    requested = False
+    pool = ThreadPoolExecutor(max_workers=max(1, min(FMP_MAX_CONCURRENT_REQUESTS, len(tasks))))
+    futures = {}
+    try:
+        futures = {
+            pool.submit(
+                _fetch_fmp_quarter,
+                endpoint,
+                ticker,
+                q,
+                cache_state,
+                api_keys=api_keys,
+                circuit_breaker=circuit_breaker,
+            ): (endpoint, q)
+            for endpoint, q in tasks
+        }
+        for future in as_completed(futures):
+            results[futures[future]], needed_api_call = future.result()
+            requested = requested or needed_api_call
+    finally:
+        # Cancel what has not started (``cancel_futures`` needs Python 3.9).
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=True)
+    statements = {endpoint: [row for q in QUARTERS for row in results[(endpoint, q)]] for endpoint in endpoints}
+    return statements, requested
 
-        # å°‡æ•¸æ“šåŒ¯ç¸½åˆ°æœ€çµ‚çµæžœ
-        combined_all_quarters.extend(existing_data)
+
+def get_fmp_fragmented(endpoint, ticker, *, api_keys=None, circuit_breaker=None):
+    """
+    [Data Engineering Logic]:
+    è‡ªå‹•å»ºç«‹å°æ‡‰ ticker çš„å­è³‡æ–™å¤¾ï¼Œä¸¦å¯¦æ–½ã€Žå¢žé‡åˆä½µç­–ç•¥ã€ã€‚
+    é˜²æ­¢æ–° API æ•¸æ“šè¦†è“‹æŽ‰èˆŠçš„æ­·å²è²¡å ±æ•¸æ“š (å°¤å…¶æ˜¯è§£æ±º FMP 5å¹´é™åˆ¶)ã€‚
+    """
+    ticker = ticker.upper()
+    statements, _ = _fetch_fmp_statements(
+        ticker, [endpoint], api_keys=api_keys, circuit_breaker=circuit_breaker
+    )
+    combined_all_quarters = statements[endpoint]
 
     logger.info(f"<{ticker}> Completed. Total records across all quarters: {len(combined_all_quarters)}")
     return combined_all_quarters
 
 
 def fetch_fmp_financials(ticker, *, circuit_breaker=None):
-    """Fetch all FMP statements with one controlled API key."""
+    """Fetch all FMP statements with one controlled API key.
+
+    All endpoint x quarter requests share one bounded pool and the caller's
+    circuit breaker, so a quota or 429 response stops the whole ticker.
+
+    Every row carries the refresh schedule as ``sourceRefreshSchedule``.
+    Only rows served entirely from the cache, with no API call, also carry
+    ``sourceRefreshPlan`` and ``sourceCachedAt`` so the router reports them
+    as deferred.
+    """
 
     ticker = ticker.upper()
     configured_keys = [key for key in (FMP_API_KEY, FMP_API_KEY_2, FMP_API_KEY_3) if key]
@@ -288,17 +356,15 @@ def fetch_fmp_financials(ticker, *, circuit_breaker=None):
         "enterprise-values",
         "balance-sheet-statement",
     )
-    statement_rows = {}
-    for endpoint in endpoints:
-        rows = get_fmp_fragmented(
-            endpoint,
-            ticker,
-            api_keys=api_keys,
-            circuit_breaker=circuit_breaker,
-        )
+    statement_rows, requested = _fetch_fmp_statements(
+        ticker,
+        endpoints,
+        api_keys=api_keys,
+        circuit_breaker=circuit_breaker,
+    )
+    for endpoint, rows in statement_rows.items():
         if not rows:
             raise FMPInvalidPayloadError(f"{ticker}: FMP returned no {endpoint} rows")
-        statement_rows[endpoint] = rows
 
     merged = {}
     for rows in statement_rows.values():
@@ -311,15 +377,44 @@ def fetch_fmp_financials(ticker, *, circuit_breaker=None):
                 raise FMPInvalidPayloadError(f"{ticker}: FMP row has invalid date") from error
             merged.setdefault(key, {}).update(raw)
             merged[key]["date"] = key
-    return [merged[key] for key in sorted(merged, reverse=True)]
-
-
-def create_financial_source_router():
-    """Construct the SEC-first router used by the normal valuation CLI."""
+    rows = [merged[key] for key in sorted(merged, reverse=True)]
+    refresh_plan = REFRESH_PLANNER.plan(rows).as_metadata()
+    cached_at = None
+    if not requested:
+        store_path = Path(CACHE_BASE_DIR) / ticker / fmp_cache.STORE_NAME
+        if store_path.exists():
+            cached_at = datetime.fromtimestamp(store_path.stat().st_mtime, tz=timezone.utc).replace(microsecond=0)
+    for row in rows:
+        row["sourceRefreshSchedule"] = dict(refresh_plan)
+        if not requested:
+            row["sourceRefreshPlan"] = dict(refresh_plan)
+            if cached_at is not None:
+                row["sourceCachedAt"] = cached_at.isoformat().replace("+00:00", "Z")
+    return rows
+
+
+SEC_INGESTION_MODES = ("companyfacts", "frames")
+
+
+def create_financial_source_router(sec_ingestion="companyfacts", database=None):
+    """Construct the SEC-first router used by the normal valuation CLI.
+
+    ``sec_ingestion="frames"`` reads cross-sectional SEC frames for the whole
+    universe and keeps Company Facts as the per-issuer fallback.  With a
+    ``database`` the SEC and foreign caches live in its namespaces instead
+    of their JSON cache directories.
+    """
 
+    if sec_ingestion not in SEC_INGESTION_MODES:
+        raise ValueError(f"unknown SEC ingestion mode: {sec_ingestion}")
+    source_class = SECFramesSource if sec_ingestion == "frames" else SECCompanyFactsSource
+    sec_store = database.namespace("sec") if database is not None else None
+    foreign_store = database.namespace("sec_foreign") if database is not None else None
     router = FinancialSourceRouter(
-        sec_source=SECCompanyFactsSource(),
-        foreign_source=ForeignIssuerCoverageSource(),
+        sec_source=source_class(telemetry=SOURCE_TELEMETRY, refresh_planner=REFRESH_PLANNER, store=sec_store),
+        foreign_source=ForeignIssuerCoverageSource(telemetry=SOURCE_TELEMETRY, store=foreign_store),
+        telemetry=SOURCE_TELEMETRY,
+        negative_coverage=SECNegativeCoverageCache(),
     )
     router.fmp_fetcher = fetch_fmp_financials
     return router
@@ -347,16 +442,12 @@ def _build_quarterly_ttm_from_rows(rows):
     if source_df["revenue"].isna().all() or source_df["netIncome"].isna().all() or source_df["numberOfShares"].isna().all():
         return None, None, None
 
-    currency_values = source_df["reportedCurrency"].dropna()
-    currency = str(currency_values.iloc[-1]).upper() if not currency_values.empty else "USD"
-    try:
-        fx_rate = SUPPORTED_FX_RATES[currency]
-    except KeyError as error:
-        raise RuntimeError(f"unsupported financial currency {currency}; refusing unscaled valuation") from error
+    currencies = source_df["reportedCurrency"].ffill().bfill().fillna("USD")
     df_main = source_df[["eps", "revenue", "netIncome", "freeCashFlow", "numberOfShares"]].copy().ffill()
-    df_main["sales_ps_adj"] = (df_main["revenue"] / df_main["numberOfShares"]) / fx_rate
-    df_main["eps_adj"] = (df_main["netIncome"] / df_main["numberOfShares"]) / fx_rate
-    df_main["fcf_ps_adj"] = (df_main["freeCashFlow"] / df_main["numberOfShares"]) / fx_rate
+    df_main["sales_ps_adj"] = df_main["revenue"] / df_main["numberOfShares"]
+    df_main["eps_adj"] = df_main["netIncome"] / df_main["numberOfShares"]
+    df_main["fcf_ps_adj"] = df_main["freeCashFlow"] / df_main["numberOfShares"]
+    df_main = FX_RATE_STORE.to_usd(df_main, PER_SHARE_COLUMNS, currencies)
     df_main["eps_ttm"] = df_main["eps_adj"].rolling(window=4).sum()
     df_main["fcf_ps_ttm"] = df_main["fcf_ps_adj"].rolling(window=4).sum()
     df_main["sales_ps_ttm"] = df_main["sales_ps_adj"].rolling(window=4).sum()
@@ -404,11 +495,6 @@ def build_quarterly_ttm(ticker, *, source_router=None):
         df.index = pd.to_datetime(df.index).tz_localize(None)
 
     # --- é—œéµä¿®æ­£ï¼šè‡ªå‹•åµæ¸¬åŒ¯çŽ‡èˆ‡ ADR æ¯”ä¾‹ ---
-    currency = df_inc['reportedCurrency'].iloc[-1] if 'reportedCurrency' in df_inc.columns else "USD"
-    try:
-        fx_rate = SUPPORTED_FX_RATES[str(currency).upper()]
-    except KeyError as error:
-        raise RuntimeError(f"unsupported financial currency {currency}; refusing unscaled valuation") from error
 
     # --- è¨ˆç®— P/S å¿…å‚™çš„ Revenue TTM ---
     # å…ˆè¨ˆç®—æ¯å­£åº¦çš„ Sales Per Share
@@ -423,9 +509,15 @@ def build_quarterly_ttm(ticker, *, source_router=None):
     # é€™æ¨£ç®—å‡ºä¾†æ‰æ˜¯ã€Œæ¯ä¸€å–®ä½ç¾Žé‡‘ ADRã€å°æ‡‰çš„åƒ¹å€¼
     # è¨ˆç®—æ¯è‚¡ç‡Ÿæ”¶ (Sales Per Share)
 
-    df_main['sales_ps_adj'] = (df_main['revenue'] / df_main['numberOfShares'] ) / fx_rate
-    df_main['eps_adj'] = (df_main['netIncome'] / df_main['numberOfShares'] ) / fx_rate
-    df_main['fcf_ps_adj'] = (df_main['freeCashFlow'] / df_main['numberOfShares'] ) / fx_rate
+    df_main['sales_ps_adj'] = df_main['revenue'] / df_main['numberOfShares']
+    df_main['eps_adj'] = df_main['netIncome'] / df_main['numberOfShares']
+    df_main['fcf_ps_adj'] = df_main['freeCashFlow'] / df_main['numberOfShares']
+    # Each quarter is converted with the FX rate in force at its period end.
+    if 'reportedCurrency' in df_inc.columns:
+        currencies = df_inc['reportedCurrency'].reindex(df_main.index).ffill().bfill().fillna("USD")
+    else:
+        currencies = ["USD"] * len(df_main)
+    df_main = FX_RATE_STORE.to_usd(df_main, PER_SHARE_COLUMNS, currencies)
 
     # Set to None to display all columns
     # pd.set_option('display.max_columns', None)
@@ -541,6 +633,7 @@ def fetch_price_history(
         timeout_seconds=timeout_seconds,
         sleep=time.sleep,
         logger=logger,
+        telemetry=SOURCE_TELEMETRY,
     )
     try:
         return adapter.fetch_history(ticker)
@@ -549,11 +642,22 @@ def fetch_price_history(
         return pd.DataFrame()
 
 # --- 5. ä¸»ç¨‹åº ---
+def _shard_argument(value):
+    try:
+        return parse_shard(value)
+    except UniverseValidationError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+
+
 def parse_args(argv=None):
     parser = argparse.ArgumentParser(description="Generate valuation data for the configured ticker universe.")
     parser.add_argument("--symbols", help="Comma-separated symbols. When present, does not include the default universe.")
     parser.add_argument("--universe-file", type=Path, help="Local copy of the private coverage/universe.json R2 object.")
     parser.add_argument("--write-resolved-symbols", type=Path, help="Write the exact resolved universe for downstream export validation.")
+    parser.add_argument("--shard", type=_shard_argument, help="Process only shard i of N (1-based) of the resolved universe, e.g. 2/4.")
+    parser.add_argument("--sec-ingestion", choices=SEC_INGESTION_MODES, default="companyfacts", help="SEC ingestion mode: per-issuer Company Facts or cross-sectional frames with Company Facts fallback.")
+    parser.add_argument("--storage", choices=STORAGE_BACKENDS, default="json", help="Cache and results backend. sqlite keeps them in one database and exports the JSON files readers need.")
+    parser.add_argument("--storage-path", type=Path, default=DEFAULT_SQLITE_PATH, help="SQLite database used by --storage sqlite.")
     return parser.parse_args(argv)
 
 
@@ -579,109 +683,275 @@ def _has_routed_financial_artifact(path):
         return False
 
 
+def _write_result(ticker, output_data):
+    """Write a ticker's valuation summary and return its JSON path.
+
+    With the SQLite backend the summary is stored first and then exported,
+    since the status index, checkpoints and watcher export read the file.
+    """
+
+    results_dir = Path(OUTPUT_DIR) / "results"
+    name = f"{ticker.upper()}/valuation_summary.json"
+    history = output_data.get("data") or []
+    as_of = history[-1]["date"] if history else ""
+    store = RESULTS_STORE if RESULTS_STORE is not None else JsonFileStore(results_dir, indent=4)
+    with store.transaction():
+        store.put(name, clean_nans(output_data), symbol=ticker.upper(), kind="valuation_summary", date=as_of)
+    if RESULTS_STORE is not None:
+        export_json(RESULTS_STORE, results_dir, names=[name], indent=4)
+    return results_dir / name
+
+
+def _valuation_is_fresh(ticker):
+    """Return true when a ticker's release is under a day old and complete.
+
+    The status index answers for every ticker built since it was added; the
+    full parse below only runs for unknown tickers and backfills the index.
+    """
+
+    indexed = STATUS_INDEX.is_fresh(ticker)
+    if indexed is not None:
+        return indexed
+    output_file = os.path.join(OUTPUT_DIR, "results", ticker.upper(), "valuation_summary.json")
+    source_file = os.path.join(SOURCE_FINANCIAL_DIR, f"{ticker.upper()}_combined.json")
+    if not os.path.exists(output_file):
+        return False
+    with open(output_file, 'r') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Error decoding JSON for {ticker}, reprocessing.")
+            return False
+    last_updated_str = data.get("last_updated")
+    if not last_updated_str or not _has_routed_financial_artifact(source_file):
+        return False
+    last_updated = datetime.strptime(last_updated_str, "%Y-%m-%d %H:%M:%S")
+    if (datetime.now() - last_updated).days >= 1:
+        return False
+    STATUS_INDEX.record(
+        ticker,
+        {"summary": Path(output_file), "financials": Path(source_file)},
+        built_at=last_updated.timestamp(),
+    )
+    return True
+
+
+def _price_frame(ticker, checkpoints):
+    """Return the Close/Adj Close frame, reusing this run's price checkpoint."""
+
+    price_file = PRICE_CHECKPOINT_DIR / f"{ticker.upper()}.csv"
+    inputs = input_digest(checkpoints.run_id, ticker.upper()) if checkpoints is not None else None
+    if checkpoints is not None and checkpoints.is_complete(ticker, "prices", inputs):
+        print(f"Resuming {ticker}: prices from checkpoint")
+        return pd.read_csv(price_file, index_col=0, parse_dates=True)
+    prices = fetch_price_history(ticker)
+    if prices.empty:
+        raise RuntimeError(f"{ticker}: no Yahoo price data; refusing partial valuation release")
+    prices.index = prices.index.tz_localize(None)
+    prices_df = prices[['Close', 'Adj Close']].copy()
+    if checkpoints is not None:
+        price_file.parent.mkdir(parents=True, exist_ok=True)
+        prices_df.to_csv(price_file)
+        checkpoints.record(ticker, "prices", inputs, [price_file])
+    return prices_df
+
+
+def _financials_inputs(checkpoints, ticker):
+    return input_digest(checkpoints.run_id, ticker.upper())
+
+
+def _routed_financials(ticker, source_file, checkpoints):
+    """Return TTM series and source metadata, resuming a routed checkpoint.
+
+    A resumed ticker rebuilds its TTM series from the routed artifact it
+    wrote earlier in the run instead of routing again.
+    """
+
+    if checkpoints is not None and checkpoints.is_complete(ticker, "financials", _financials_inputs(checkpoints, ticker)):
+        print(f"Resuming {ticker}: routed financials from checkpoint")
+        with open(source_file, "r", encoding="utf-8") as handle:
+            rows = json.load(handle)
+        return (*_build_quarterly_ttm_from_rows(rows), checkpoints.metadata(ticker, "financials"))
+    eps_ttm, fcf_ttm, sales_ttm = build_quarterly_ttm(ticker, source_router=FINANCIAL_SOURCE_ROUTER)
+    if eps_ttm is None:
+        raise RuntimeError(f"{ticker}: no usable routed quarterly data; refusing partial valuation release")
+    if LAST_FINANCIAL_SOURCE_RESULT is None:
+        return eps_ttm, fcf_ttm, sales_ttm, None
+    os.makedirs(SOURCE_FINANCIAL_DIR, exist_ok=True)
+    with open(source_file, "w", encoding="utf-8") as source_handle:
+        json.dump(list(LAST_FINANCIAL_SOURCE_RESULT.rows), source_handle, indent=2)
+    metadata = LAST_FINANCIAL_SOURCE_RESULT.metadata
+    if checkpoints is not None:
+        checkpoints.record(ticker, "financials", _financials_inputs(checkpoints, ticker), [source_file], metadata=metadata)
+    return eps_ttm, fcf_ttm, sales_ttm, metadata
+
+
 def main(argv=None):
     args = parse_args(argv)
+    global SOURCE_TELEMETRY
+    SOURCE_TELEMETRY = SourceTelemetry()
+    try:
+        run_pipeline(args)
+    finally:
+        # Metrics are written even when a ticker aborts the release; the
+        # failing run is usually the one whose slow lane needs finding.
+        metrics_path = SOURCE_METRICS_PATH
+        if args.shard:
+            # Shards may share a machine and telemetry directory; keep one file each.
+            metrics_path = metrics_path.replace(".json", ".shard-{}-of-{}.json".format(*args.shard))
+        metrics_path = SOURCE_TELEMETRY.write(metrics_path)
+        print(f"Source metrics written to {metrics_path}")
+        scheduler = TickerScheduler(Path(RUN_COSTS_PATH))
+        scheduler.record_telemetry(SOURCE_TELEMETRY.snapshot())
+        scheduler.write()
+
+
+def run_pipeline(args):
+    global RESULTS_STORE
+    database = SQLiteDatabase(args.storage_path) if args.storage == "sqlite" else None
+    if database is not None:
+        fmp_cache.configure_store(database.namespace("fmp"))
+        RESULTS_STORE = database.namespace("results")
+    try:
+        _run_pipeline(args, database)
+    finally:
+        if database is not None:
+            # generate_earning_report and the workflow read the FMP JSON files.
+            exported = fmp_cache.export_store(Path(CACHE_BASE_DIR))
+            print(f"Exported {exported} FMP cache tickers from {args.storage_path}")
+            fmp_cache.configure_store(None)
+            RESULTS_STORE = None
+            database.close()
+
+
+def _build_valuation(ticker, prices_df, checkpoints):
+    """Build and write one pending ticker's valuation from its prices and routed financials."""
+
+    source_file = os.path.join(SOURCE_FINANCIAL_DIR, f"{ticker.upper()}_combined.json")
+
+    # 1. ç²å–è‚¡åƒ¹æ•¸æ“š
+    # æˆ‘å€‘ä½¿ç”¨ auto_adjust=False ä»¥æ‰‹å‹•è™•ç† Close/Adj Close ä¾†å°é½ŠæŒ‡æ¨™é‡ç´š
+    print(f"\nðŸ—ï¸  Pipeline Starting: {ticker}")
+
+    # 2. ç²å–è²¡å‹™æŒ‡æ¨™æ•¸æ“š (TTM)
+    # ç¾åœ¨ build_quarterly_ttm æœƒå›žå‚³ä¸‰å€‹æŒ‡æ¨™
+    eps_ttm, fcf_ttm, sales_ttm, source_metadata = _routed_financials(ticker, source_file, checkpoints)
+
+    # 3. è¨ˆç®—ä¼°å€¼å¸¶
+    pe_res, pe_avgs = calculate_bands(ticker, prices_df, eps_ttm, 'eps_ttm')
+    fcf_res, fcf_avgs = calculate_bands(ticker, prices_df, fcf_ttm, 'fcf_ps_ttm')
+    ps_res, ps_avgs = calculate_bands(ticker, prices_df, sales_ttm, 'sales_ps_ttm')
+
+    # 4. å°è£æ­·å²æ•¸æ“šç”¨æ–¼å‰ç«¯ç¹ªåœ–
+    history = []
+    # åªå– 2021 å¹´ä»¥å¾Œçš„æ•¸æ“šé»žä»¥å„ªåŒ–å‰ç«¯åŠ è¼‰é€Ÿåº¦
+    plot_df = prices_df[prices_df.index >= '2021-01-01']
+    plot_df.index = plot_df.index.tz_localize(None).normalize()
+
+    for date, row in plot_df.iterrows():
+        # ç¢ºä¿è©²æ—¥æœŸåœ¨æ‰€æœ‰æŒ‡æ¨™è¨ˆç®—çµæžœä¸­éƒ½å­˜åœ¨
+        if date not in pe_res["1Y"].index: continue
+        history.append({
+            "date": date.strftime("%Y-%m-%d"),
+            "price": round(float(row['Adj Close']), 2),
+            "valuation": {
+                lb: {
+                    "pe": pe_res[lb].loc[date].round(2).to_dict(),
+                    "fcf": fcf_res[lb].loc[date].round(2).to_dict(),
+                    "ps": ps_res[lb].loc[date].to_dict()   # åŠ å…¥ P/S
+                } for lb in WINDOWS
+            }
+        })
+    # --- æ›´æ–° JSON çµæ§‹ï¼ŒåŠ å…¥ last_updated ---
+    built_at = datetime.now()
+    output_data = {
+        "ticker": ticker.upper(),
+        "last_updated": built_at.strftime("%Y-%m-%d %H:%M:%S"),  # åŠ å…¥é€™è¡Œ
+        "averages": {
+            "pe": pe_avgs,
+            "fcf": fcf_avgs,
+            "ps": ps_avgs
+        },
+        "data": history,
+    }
+    if source_metadata is not None:
+        output_data["financialSource"] = source_metadata
+
+    # æœ€å¾Œçµæžœä¹Ÿå­˜å…¥ ticker è³‡æ–™å¤¾
+    summary_file = str(_write_result(ticker, output_data))
+    final_dir = os.path.dirname(summary_file)
+    if _has_routed_financial_artifact(source_file):
+        STATUS_INDEX.record(
+            ticker,
+            {"summary": Path(summary_file), "financials": Path(source_file)},
+            inputs={
+                "prices": input_digest(prices_df.to_csv()),
+                "financials": file_digest(Path(source_file)),
+            },
+            built_at=built_at.timestamp(),
+        )
+    print(f"âœ¨ [Success] {ticker} pipeline execution completed. Folder: {final_dir} {len(history)} points generated.")
+
+def _run_pipeline(args, database):
     try:
         tickers = resolve_tickers(args.symbols, args.universe_file)
     except UniverseValidationError as error:
         raise RuntimeError(f"Ticker universe is invalid: {error}") from error
+    resolved = {"symbols": tickers}
+    if args.shard:
+        index, count = args.shard
+        universe = tickers
+        tickers = select_shard(universe, index, count)
+        # The full universe travels with each shard so a merge can prove coverage.
+        resolved = {"symbols": tickers, "shard": {"index": index, "count": count, "universe": universe}}
+        print(f"Shard {index}/{count}: {len(tickers)} of {len(universe)} tickers")
     if args.write_resolved_symbols:
         args.write_resolved_symbols.parent.mkdir(parents=True, exist_ok=True)
-        args.write_resolved_symbols.write_text(json.dumps({"symbols": tickers}, separators=(",", ":")), encoding="utf-8")
+        args.write_resolved_symbols.write_text(json.dumps(resolved, separators=(",", ":")), encoding="utf-8")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     global FINANCIAL_SOURCE_ROUTER
-    FINANCIAL_SOURCE_ROUTER = create_financial_source_router()
+    FINANCIAL_SOURCE_ROUTER = create_financial_source_router(args.sec_ingestion, database)
+    foreign_source = FINANCIAL_SOURCE_ROUTER.foreign_source
+    if foreign_source is not None:
+        for symbol, reason in foreign_source.prefetch(tickers).items():
+            print(f"Foreign prefetch failed for {symbol}: {reason}")
 
     # å‘¼å« Debug
     ## test_amzn_valuation_logic()
 
-    for ticker in tickers:
-        final_dir = os.path.join(OUTPUT_DIR, "results", ticker.upper())
-        output_file = os.path.join(final_dir, "valuation_summary.json")
-        source_file = os.path.join(SOURCE_FINANCIAL_DIR, f"{ticker.upper()}_combined.json")
-
-        if os.path.exists(output_file):
-            with open(output_file, 'r') as f:
-                try:
-                    data = json.load(f)
-                    last_updated_str = data.get("last_updated")
-                    if last_updated_str and _has_routed_financial_artifact(source_file):
-                        last_updated = datetime.strptime(last_updated_str, "%Y-%m-%d %H:%M:%S")
-                        if (datetime.now() - last_updated).days < 1:
-                            print(f"Skipping {ticker}: Valuation data is less than 1 day old.")
-                            continue
-                except json.JSONDecodeError:
-                    print(f"Error decoding JSON for {ticker}, reprocessing.")
-
-        # 1. ç²å–è‚¡åƒ¹æ•¸æ“š
-        # æˆ‘å€‘ä½¿ç”¨ auto_adjust=False ä»¥æ‰‹å‹•è™•ç† Close/Adj Close ä¾†å°é½ŠæŒ‡æ¨™é‡ç´š
-        print(f"\nðŸ—ï¸  Pipeline Starting: {ticker}")
-        prices = fetch_price_history(ticker)
-
-        if prices.empty:
-            raise RuntimeError(f"{ticker}: no Yahoo price data; refusing partial valuation release")
-
-        prices.index = prices.index.tz_localize(None)
-
-        prices_df = prices[['Close', 'Adj Close']].copy()
-
-        # 2. ç²å–è²¡å‹™æŒ‡æ¨™æ•¸æ“š (TTM)
-        # ç¾åœ¨ build_quarterly_ttm æœƒå›žå‚³ä¸‰å€‹æŒ‡æ¨™
-        eps_ttm, fcf_ttm, sales_ttm = build_quarterly_ttm(ticker, source_router=FINANCIAL_SOURCE_ROUTER)
-        if eps_ttm is None:
-            raise RuntimeError(f"{ticker}: no usable routed quarterly data; refusing partial valuation release")
-
-        if LAST_FINANCIAL_SOURCE_RESULT is not None:
-            os.makedirs(SOURCE_FINANCIAL_DIR, exist_ok=True)
-            with open(source_file, "w", encoding="utf-8") as source_handle:
-                json.dump(list(LAST_FINANCIAL_SOURCE_RESULT.rows), source_handle, indent=2)
-
-        # 3. è¨ˆç®—ä¼°å€¼å¸¶
-        pe_res, pe_avgs = calculate_bands(ticker, prices_df, eps_ttm, 'eps_ttm')
-        fcf_res, fcf_avgs = calculate_bands(ticker, prices_df, fcf_ttm, 'fcf_ps_ttm')
-        ps_res, ps_avgs = calculate_bands(ticker, prices_df, sales_ttm, 'sales_ps_ttm')
-
-        # 4. å°è£æ­·å²æ•¸æ“šç”¨æ–¼å‰ç«¯ç¹ªåœ–
-        history = []
-        # åªå– 2021 å¹´ä»¥å¾Œçš„æ•¸æ“šé»žä»¥å„ªåŒ–å‰ç«¯åŠ è¼‰é€Ÿåº¦
-        plot_df = prices_df[prices_df.index >= '2021-01-01']
-        plot_df.index = plot_df.index.tz_localize(None).normalize()
-
-        for date, row in plot_df.iterrows():
-            # ç¢ºä¿è©²æ—¥æœŸåœ¨æ‰€æœ‰æŒ‡æ¨™è¨ˆç®—çµæžœä¸­éƒ½å­˜åœ¨
-            if date not in pe_res["1Y"].index: continue
-            history.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "price": round(float(row['Adj Close']), 2),
-                "valuation": {
-                    lb: {
-                        "pe": pe_res[lb].loc[date].round(2).to_dict(),
-                        "fcf": fcf_res[lb].loc[date].round(2).to_dict(),
-                        "ps": ps_res[lb].loc[date].to_dict()   # åŠ å…¥ P/S
-                    } for lb in WINDOWS
-                }
-            })
-        # --- æ›´æ–° JSON çµæ§‹ï¼ŒåŠ å…¥ last_updated ---
-        output_data = {
-            "ticker": ticker.upper(),
-            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),  # åŠ å…¥é€™è¡Œ
-            "averages": {
-                "pe": pe_avgs,
-                "fcf": fcf_avgs,
-                "ps": ps_avgs
-            },
-            "data": history,
-        }
-        if LAST_FINANCIAL_SOURCE_RESULT is not None:
-            output_data["financialSource"] = LAST_FINANCIAL_SOURCE_RESULT.metadata
-
-        # æœ€å¾Œçµæžœä¹Ÿå­˜å…¥ ticker è³‡æ–™å¤¾
-        final_dir = os.path.join(OUTPUT_DIR, "results", ticker.upper())
-        os.makedirs(final_dir, exist_ok=True)
+    pending = [ticker for ticker in tickers if not _valuation_is_fresh(ticker)]
+    checkpoints = CHECKPOINTS
+    unrouted = [
+        ticker for ticker in pending
+        if checkpoints is None
+        or not checkpoints.is_complete(ticker, "financials", _financials_inputs(checkpoints, ticker))
+    ]
+    # The routing plan covers every pending symbol up front; slowest-first
+    # submission keeps a long FMP/foreign route from starting last.
+    sec_source = getattr(FINANCIAL_SOURCE_ROUTER, "sec_source", None)
+    cache_probe = sec_source.cache_state if sec_source is not None else None
+    schedule = TickerScheduler(Path(RUN_COSTS_PATH), cache_probe=cache_probe).plan(unrouted, DEFAULT_ROUTE_WORKERS)
+    print(schedule.describe())
 
-        with open(os.path.join(final_dir, "valuation_summary.json"), "w") as f:
-            json.dump(clean_nans(output_data), f, indent=4)
-        print(f"âœ¨ [Success] {ticker} pipeline execution completed. Folder: {final_dir} {len(history)} points generated.")
+    for ticker in tickers:
+        if ticker not in pending:
+            print(f"Skipping {ticker}: Valuation data is less than 1 day old.")
+
+    # Prices are checked before a batch is routed: a ticker without Yahoo
+    # prices aborts the release before FMP quota is spent on its batch.
+    # Only one batch of price frames is held at a time.
+    to_route = set(unrouted)
+    order = schedule.order + [ticker for ticker in pending if ticker not in to_route]
+    for offset in range(0, len(order), PRICE_BATCH_SIZE):
+        batch = order[offset:offset + PRICE_BATCH_SIZE]
+        price_frames = {ticker: _price_frame(ticker, checkpoints) for ticker in batch}
+        # Route the batch's symbols together so SEC, foreign and FMP lanes run
+        # concurrently; the build below reuses the memoized results.
+        FINANCIAL_SOURCE_ROUTER.route_many(
+            [ticker for ticker in batch if ticker in to_route], max_workers=DEFAULT_ROUTE_WORKERS
+        )
+        for ticker in batch:
+            _build_valuation(ticker, price_frames.pop(ticker), checkpoints)
 
 if __name__ == "__main__":
     main()
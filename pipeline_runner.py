@@ -0,0 +1,242 @@
+"""Checkpointed, resumable driver for the daily valuation pipeline.
+
+The daily job runs ``generate_valuation``, ``generate_earning_report`` and
+``export_watcher_data`` in order.  A timeout or one failing ticker used to
+lose the whole run.  This runner records a checkpoint each time a ticker
+finishes a network stage:
+
+``prices``      the Yahoo price history, kept as a CSV under ``data/checkpoints``
+``financials``  the routed statements in ``source_financials``
+
+plus a release-wide ``export`` checkpoint.  Each checkpoint stores a digest
+of the stage's inputs and the sha256 of every artifact it wrote.  A rerun
+skips a stage only when both still match, so an edited or deleted artifact
+is rebuilt rather than trusted.  Finished valuations are already skipped
+through the status index, and the earnings report keeps its own input
+digests, so neither needs a checkpoint here.
+
+Checkpoints belong to one run id (the UTC date by default).  A file left by
+another run is ignored, so stale network results are never resumed into a
+new day's release.  ``generate_valuation`` only consults checkpoints when a
+store is installed, so running the scripts directly is unchanged.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+BASE_DIR = Path(__file__).resolve().parent
+CHECKPOINT_DIR = BASE_DIR / "data" / "checkpoints"
+DEFAULT_CHECKPOINT_PATH = CHECKPOINT_DIR / "pipeline.json"
+PRICE_CHECKPOINT_DIR = CHECKPOINT_DIR / "prices"
+CHECKPOINT_SCHEMA_VERSION = "1.0"
+TICKER_STAGES = ("prices", "financials")
+# Checkpoint key for stages that cover the whole release rather than one ticker.
+RELEASE_KEY = "*"
+DEFAULT_RESOLVED_SYMBOLS_PATH = BASE_DIR / "data" / "watcher_coverage_symbols.json"
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """Return the sha256 of a file, or ``None`` when it cannot be read."""
+
+    digest = hashlib.sha256()
+    try:
+        with Path(path).open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def input_digest(*parts: Any) -> str:
+    """Digest JSON-serializable stage inputs (values, digests, run ids)."""
+
+    text = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _default_run_id(clock: Callable[[], float]) -> str:
+    return datetime.fromtimestamp(float(clock()), tz=timezone.utc).date().isoformat()
+
+
+def _iso(value: float) -> str:
+    stamp = datetime.fromtimestamp(float(value), tz=timezone.utc)
+    return stamp.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+class CheckpointStore:
+    """Thread-safe per-ticker, per-stage completion records for one run."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CHECKPOINT_PATH,
+        *,
+        run_id: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.clock = clock
+        self.run_id = run_id or _default_run_id(clock)
+        self._lock = threading.Lock()
+        self._tickers: Dict[str, Dict[str, Dict[str, Any]]] = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        # An unreadable or foreign checkpoint only costs redoing the work.
+        try:
+            body = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if (
+            not isinstance(body, dict)
+            or body.get("schemaVersion") != CHECKPOINT_SCHEMA_VERSION
+            or body.get("runId") != self.run_id
+            or not isinstance(body.get("tickers"), dict)
+        ):
+            return {}
+        return {
+            str(ticker): {stage: entry for stage, entry in stages.items() if isinstance(entry, dict)}
+            for ticker, stages in body["tickers"].items()
+            if isinstance(stages, dict)
+        }
+
+    def _write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        body = {
+            "schemaVersion": CHECKPOINT_SCHEMA_VERSION,
+            "runId": self.run_id,
+            "updatedAt": _iso(self.clock()),
+            "tickers": dict(sorted(self._tickers.items())),
+        }
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_text(json.dumps(body, indent=2), encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+    def _entry(self, ticker: str, stage: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._tickers.get(str(ticker).upper(), {}).get(stage)
+
+    def is_complete(self, ticker: str, stage: str, inputs: str) -> bool:
+        """True when ``stage`` finished on ``inputs`` and its artifacts are intact."""
+
+        entry = self._entry(ticker, stage)
+        if not entry or entry.get("inputDigest") != inputs:
+            return False
+        artifacts = entry.get("artifacts")
+        if not isinstance(artifacts, dict):
+            return False
+        return all(file_digest(Path(path)) == digest for path, digest in artifacts.items())
+
+    def metadata(self, ticker: str, stage: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry(ticker, stage)
+        metadata = entry.get("metadata") if entry else None
+        return metadata if isinstance(metadata, dict) else None
+
+    def record(
+        self,
+        ticker: str,
+        stage: str,
+        inputs: str,
+        artifacts: Iterable[Path],
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        hashes: Dict[str, str] = {}
+        for path in artifacts:
+            digest = file_digest(Path(path))
+            if digest is None:
+                raise FileNotFoundError(f"checkpoint artifact is missing: {path}")
+            hashes[str(path)] = digest
+        entry: Dict[str, Any] = {"inputDigest": inputs, "artifacts": hashes, "completedAt": _iso(self.clock())}
+        if metadata is not None:
+            entry["metadata"] = metadata
+        with self._lock:
+            self._tickers.setdefault(str(ticker).upper(), {})[stage] = entry
+            self._write()
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                stage: sum(1 for stages in self._tickers.values() if stage in stages)
+                for stage in (*TICKER_STAGES, "export")
+            }
+
+
+def _resolved_symbols(path: Path) -> List[str]:
+    try:
+        body = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return []
+    symbols = body.get("symbols") if isinstance(body, dict) else None
+    return [str(symbol).upper() for symbol in symbols] if isinstance(symbols, list) else []
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run valuation, earnings report and watcher export with resumable checkpoints.",
+        epilog="Unrecognized arguments are passed to generate_valuation.",
+    )
+    parser.add_argument("--run-id", help="Checkpoint run id; defaults to the UTC date so same-day reruns resume.")
+    parser.add_argument("--checkpoints", type=Path, default=DEFAULT_CHECKPOINT_PATH)
+    parser.add_argument("--resolved-symbols", type=Path, default=DEFAULT_RESOLVED_SYMBOLS_PATH)
+    parser.add_argument("--skip-export", action="store_true")
+    args, valuation_args = parser.parse_known_args(argv)
+
+    # Imported here so ``--help`` and checkpoint tooling stay cheap.
+    import export_watcher_data
+    import generate_earning_report
+    import generate_valuation
+
+    store = CheckpointStore(args.checkpoints, run_id=args.run_id)
+    print(f"Resuming run {store.run_id}: {store.summary()}")
+    generate_valuation.CHECKPOINTS = store
+    try:
+        generate_valuation.main([*valuation_args, "--write-resolved-symbols", str(args.resolved_symbols)])
+    finally:
+        generate_valuation.CHECKPOINTS = None
+
+    # The report keeps its own input digests and skips unchanged tickers.
+    generate_earning_report.main()
+    tickers = _resolved_symbols(args.resolved_symbols)
+
+    if not args.skip_export:
+        # Everything the export reads: the universe, each summary and report.
+        summaries = {
+            ticker: file_digest(export_watcher_data.DEFAULT_RESULTS_DIR / ticker / "valuation_summary.json")
+            for ticker in tickers
+        }
+        reports = {ticker: file_digest(generate_earning_report.OUTPUT_DIR / f"{ticker}_combined.json") for ticker in tickers}
+        inputs = input_digest(store.run_id, file_digest(args.resolved_symbols), summaries, reports)
+        manifest = export_watcher_data.DEFAULT_OUTPUT_DIR / "manifest.json"
+        if store.is_complete(RELEASE_KEY, "export", inputs):
+            print("Skipping export: checkpoint inputs are unchanged.")
+        else:
+            export_watcher_data.main(["--expected-symbols-file", str(args.resolved_symbols)])
+            store.record(RELEASE_KEY, "export", inputs, [manifest])
+    print(f"Run {store.run_id} complete: {store.summary()}")
+    return 0
+
+
+__all__ = [
+    "CHECKPOINT_SCHEMA_VERSION",
+    "CheckpointStore",
+    "DEFAULT_CHECKPOINT_PATH",
+    "PRICE_CHECKPOINT_DIR",
+    "TICKER_STAGES",
+    "file_digest",
+    "input_digest",
+    "run",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(run())
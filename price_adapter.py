@@ -21,6 +21,7 @@ from typing import Any, Callable, Iterable, Mapping, Sequence
 import pandas as pd
 import yfinance as yf
 
+from source_telemetry import SourceTelemetry, measure
 from ticker_universe import normalize_symbol, yahoo_symbol
 
 
@@ -140,6 +141,7 @@ class YahooPriceAdapter:
         sleep: Callable[[float], None] | None = None,
         fallback_sources: Iterable[FallbackSource] = (),
         logger: logging.Logger | None = None,
+        telemetry: SourceTelemetry | None = None,
     ) -> None:
         if isinstance(max_attempts, bool):
             raise ValueError("max_attempts must be a positive integer")
@@ -184,6 +186,7 @@ class YahooPriceAdapter:
             )
         self._fallback_sources = tuple(normalized_fallbacks)
         self._logger = logger or logging.getLogger(__name__)
+        self._telemetry = telemetry
 
     def _fetch_yahoo(self, symbol: str, timeout_seconds: float) -> Any:
         return self._ticker_factory(symbol).history(
@@ -213,7 +216,10 @@ class YahooPriceAdapter:
         for source_label, fetcher in self._sources():
             for attempt_number in range(1, self.max_attempts + 1):
                 try:
-                    prices = fetcher(lookup, self.timeout_seconds)
+                    with measure(self._telemetry, source_label, symbol=cache_symbol) as record:
+                        prices = fetcher(lookup, self.timeout_seconds)
+                        invalid_reason = validate_price_history(prices)
+                        record.error = invalid_reason is not None
                 except Exception as error:  # provider transport/runtime failure
                     reason = f"{type(error).__name__}: {error}"
                     attempts.append(
@@ -236,7 +242,6 @@ class YahooPriceAdapter:
                         self._sleep(self.retry_delay_seconds)
                     continue
 
-                invalid_reason = validate_price_history(prices)
                 if invalid_reason is None:
                     return prices
                 attempts.append(
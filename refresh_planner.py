@@ -0,0 +1,154 @@
+"""Filing-calendar-aware refresh decisions for cached financial sources.
+
+Issuers file on a steady cadence: a quarter ends roughly every 91 days and
+its report follows after a lag that varies little from year to year.  The
+planner reads that cadence from cached rows (period-end ``date`` plus
+``filingDate``), projects the next period end, and opens an expected filing
+window from the shortest to the longest historical lag around it.
+
+A refresh is due inside or after that window.  Before it opens, cached rows
+may be served without a network call.  The planner fails open toward
+refreshing: too little history, unparseable dates, or a newest filing older
+than ``max_deferral_days`` all make a refresh due, so a cache can never be
+served indefinitely on the strength of a bad estimate.
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+DEFAULT_MIN_HISTORY = 4
+DEFAULT_WINDOW_SLACK_DAYS = 7
+DEFAULT_MAX_DEFERRAL_DAYS = 120
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value or "").strip()[:10])
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class RefreshPlan:
+    """One refresh decision plus the estimate it was based on."""
+
+    due: bool
+    reason: str
+    evaluated_on: str
+    latest_period_end: Optional[str] = None
+    latest_filing_date: Optional[str] = None
+    expected_period_end: Optional[str] = None
+    window_start: Optional[str] = None
+    window_end: Optional[str] = None
+
+    def as_metadata(self) -> Dict[str, Any]:
+        """JSON-safe projection for freshness metadata."""
+
+        return {
+            "refreshDue": self.due,
+            "reason": self.reason,
+            "evaluatedOn": self.evaluated_on,
+            "latestPeriodEnd": self.latest_period_end,
+            "latestFilingDate": self.latest_filing_date,
+            "expectedPeriodEnd": self.expected_period_end,
+            "expectedFilingWindow": (
+                {"start": self.window_start, "end": self.window_end} if self.window_start else None
+            ),
+        }
+
+
+@dataclass
+class RefreshPlanner:
+    """Estimate an issuer's next filing window from its filing history."""
+
+    clock: Callable[[], float] = time.time
+    min_history: int = DEFAULT_MIN_HISTORY
+    slack_days: int = DEFAULT_WINDOW_SLACK_DAYS
+    max_deferral_days: int = DEFAULT_MAX_DEFERRAL_DAYS
+
+    def __post_init__(self) -> None:
+        if self.min_history < 2:
+            raise ValueError("refresh planner needs at least two filings of history")
+        if self.slack_days < 0 or self.max_deferral_days <= 0:
+            raise ValueError("refresh planner windows must be non-negative")
+
+    def today(self) -> date:
+        return datetime.fromtimestamp(float(self.clock()), tz=timezone.utc).date()
+
+    @staticmethod
+    def filing_history(rows: Iterable[Any]) -> List[Tuple[date, date]]:
+        """Return unique ``(period_end, filing_date)`` pairs, oldest first."""
+
+        pairs: Dict[date, date] = {}
+        for row in rows:
+            if not isinstance(row, Mapping):
+                continue
+            period_end = _as_date(row.get("date"))
+            filed = _as_date(row.get("filingDate") or row.get("filed"))
+            if period_end is None or filed is None or filed < period_end:
+                continue
+            # Amendments re-file an old period; the first filing sets cadence.
+            pairs[period_end] = min(filed, pairs.get(period_end, filed))
+        return sorted(pairs.items())
+
+    def plan(self, rows: Iterable[Any]) -> RefreshPlan:
+        today = self.today()
+        history = self.filing_history(rows)
+        evaluated_on = today.isoformat()
+        if len(history) < self.min_history:
+            return RefreshPlan(
+                due=True,
+                reason=f"insufficient filing history ({len(history)} of {self.min_history} filings)",
+                evaluated_on=evaluated_on,
+            )
+        latest_end, _ = history[-1]
+        latest_filed = max(filed for _, filed in history)
+        spacing = statistics.median(
+            (later[0] - earlier[0]).days for earlier, later in zip(history, history[1:])
+        )
+        lags = [(filed - period_end).days for period_end, filed in history]
+        expected_end = latest_end + timedelta(days=int(round(spacing)))
+        window_start = expected_end + timedelta(days=min(lags) - self.slack_days)
+        window_end = expected_end + timedelta(days=max(lags) + self.slack_days)
+        estimate = dict(
+            evaluated_on=evaluated_on,
+            latest_period_end=latest_end.isoformat(),
+            latest_filing_date=latest_filed.isoformat(),
+            expected_period_end=expected_end.isoformat(),
+            window_start=window_start.isoformat(),
+            window_end=window_end.isoformat(),
+        )
+        if (today - latest_filed).days > self.max_deferral_days:
+            return RefreshPlan(
+                due=True,
+                reason=f"newest filing is older than {self.max_deferral_days} days",
+                **estimate,
+            )
+        if today > window_end:
+            return RefreshPlan(due=True, reason="expected filing window has passed", **estimate)
+        if today >= window_start:
+            return RefreshPlan(due=True, reason="inside expected filing window", **estimate)
+        return RefreshPlan(
+            due=False,
+            reason=f"next filing not expected before {window_start.isoformat()}",
+            **estimate,
+        )
+
+
+__all__ = [
+    "DEFAULT_MAX_DEFERRAL_DAYS",
+    "DEFAULT_MIN_HISTORY",
+    "DEFAULT_WINDOW_SLACK_DAYS",
+    "RefreshPlan",
+    "RefreshPlanner",
+]
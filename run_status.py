@@ -0,0 +1,191 @@
+"""Sidecar status index for the valuation skip-if-fresh check.
+
+Deciding whether a ticker can be skipped used to mean parsing its
+multi-megabyte ``valuation_summary.json`` for ``last_updated`` and the whole
+routed ``source_financials`` file for provenance.  ``status_index.json``
+records, per ticker, when the last successful build finished, digests of
+the inputs it was built from and the artifacts it wrote (path, size,
+mtime and sha256).
+
+A freshness check reads one small entry and stats the artifacts.  When the
+stat no longer matches (a fresh git checkout resets mtimes) the artifact is
+hashed instead, and a matching hash re-stamps the entry.  Any other
+difference means the artifact changed outside the pipeline, so the ticker
+is rebuilt.  A ticker without an entry is unknown and the caller falls
+back to its full check.
+
+Entries are only written after a build succeeds, and the index is always
+replaced atomically.  A write re-reads the file and replaces only the
+entries this process changed, all under a ``file_lock``, so concurrent
+shards keep each other's.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Set
+
+from pipeline_runner import file_digest
+from storage import file_lock
+
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_STATUS_INDEX_PATH = BASE_DIR / "data" / "results" / "status_index.json"
+STATUS_SCHEMA_VERSION = "1.0"
+# Matches the one-day reuse window of the valuation release.
+DEFAULT_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+def _iso(value: float) -> str:
+    stamp = datetime.fromtimestamp(float(value), tz=timezone.utc)
+    return stamp.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _parse_iso(value: Any) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class StatusIndex:
+    """Per-ticker record of the last successful valuation build."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_STATUS_INDEX_PATH,
+        *,
+        base_dir: Path = BASE_DIR,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.base_dir = Path(base_dir)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._tickers: Optional[Dict[str, Dict[str, Any]]] = None
+        self._changed: Set[str] = set()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        # A missing or unreadable index only costs the slow freshness check.
+        try:
+            body = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        tickers = body.get("tickers") if isinstance(body, dict) else None
+        if not isinstance(body, dict) or body.get("schemaVersion") != STATUS_SCHEMA_VERSION or not isinstance(tickers, dict):
+            return {}
+        return {str(symbol).upper(): entry for symbol, entry in tickers.items() if isinstance(entry, dict)}
+
+    def _loaded(self) -> Dict[str, Dict[str, Any]]:
+        if self._tickers is None:
+            self._tickers = self._read()
+        return self._tickers
+
+    def _write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        loaded = self._loaded()
+        with file_lock(self.path):
+            # Other shards may have written since this process loaded the
+            # index; any copy of their entries held here is stale.
+            merged = self._read()
+            merged.update((ticker, loaded[ticker]) for ticker in self._changed)
+            self._tickers = merged
+            self._changed.clear()
+            body = {
+                "schemaVersion": STATUS_SCHEMA_VERSION,
+                "updatedAt": _iso(self.clock()),
+                "tickers": dict(sorted(merged.items())),
+            }
+            temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_text(json.dumps(body, indent=2), encoding="utf-8")
+            os.replace(temp_path, self.path)
+
+    def _relative(self, path: Path) -> str:
+        path = Path(path)
+        try:
+            return path.resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _absolute(self, path: str) -> Path:
+        return self.base_dir / path
+
+    def _describe(self, path: Path) -> Dict[str, Any]:
+        stat = Path(path).stat()
+        digest = file_digest(Path(path))
+        if digest is None:
+            raise FileNotFoundError(f"status artifact is missing: {path}")
+        return {"path": self._relative(path), "bytes": stat.st_size, "mtimeNs": stat.st_mtime_ns, "sha256": digest}
+
+    def entry(self, ticker: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._loaded().get(str(ticker).upper())
+
+    def is_fresh(self, ticker: str, *, max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS) -> Optional[bool]:
+        """True or False from the index, or ``None`` when the ticker is unknown."""
+
+        ticker = str(ticker).upper()
+        with self._lock:
+            entry = self._loaded().get(ticker)
+            if entry is None:
+                return None
+            built_at = _parse_iso(entry.get("builtAt"))
+            artifacts = entry.get("artifacts")
+            if built_at is None or not isinstance(artifacts, dict) or not artifacts:
+                return False
+            if self.clock() - built_at >= max_age_seconds:
+                return False
+            restamped = False
+            for artifact in artifacts.values():
+                path = self._absolute(str(artifact.get("path")))
+                try:
+                    stat = path.stat()
+                except OSError:
+                    return False
+                if stat.st_size != artifact.get("bytes"):
+                    return False
+                if stat.st_mtime_ns == artifact.get("mtimeNs"):
+                    continue
+                if file_digest(path) != artifact.get("sha256"):
+                    return False
+                artifact["mtimeNs"] = stat.st_mtime_ns
+                restamped = True
+            if restamped:
+                self._changed.add(ticker)
+                self._write()
+            return True
+
+    def record(
+        self,
+        ticker: str,
+        artifacts: Mapping[str, Path],
+        *,
+        inputs: Optional[Mapping[str, Optional[str]]] = None,
+        built_at: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Record a successful build of ``ticker`` and write the index."""
+
+        entry = {
+            "builtAt": _iso(self.clock() if built_at is None else built_at),
+            "inputs": dict(sorted((inputs or {}).items())),
+            "artifacts": {name: self._describe(path) for name, path in sorted(artifacts.items())},
+        }
+        ticker = str(ticker).upper()
+        with self._lock:
+            self._loaded()[ticker] = entry
+            self._changed.add(ticker)
+            self._write()
+        return entry
+
+
+__all__ = [
+    "DEFAULT_MAX_AGE_SECONDS",
+    "DEFAULT_STATUS_INDEX_PATH",
+    "STATUS_SCHEMA_VERSION",
+    "StatusIndex",
+]
@@ -7,28 +7,39 @@ facts into normalized quarterly rows used by the valuation pipeline.
 
 The adapter fails closed.  An expired cache is never used as a substitute for
 a failed refresh, and malformed or rate-limited SEC responses are surfaced to
-the caller with a source-specific exception.
+the caller with a source-specific exception.  An expired Company Facts cache is
+reused only after a successful submissions check shows no new periodic filing.
 """
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 import re
+import threading
 import time
-from dataclasses import dataclass
-from datetime import date
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
 from pathlib import Path
 from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 import requests
 
+from refresh_planner import RefreshPlanner
+from source_telemetry import SourceTelemetry, measure
+from storage import DocumentStore, JsonFileStore
+
 
 logger = logging.getLogger(__name__)
 
 SEC_TICKER_URL = "https://www.sec.gov/files/company_tickers.json"
 SEC_FACTS_URL = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
+SEC_SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
+SEC_FRAMES_URL = "https://data.sec.gov/api/xbrl/frames/{taxonomy}/{tag}/{unit}/{period}.json"
+SEC_CONCEPT_URL = "https://data.sec.gov/api/xbrl/companyconcept/CIK{cik}/us-gaap/{tag}.json"
+SEC_FRAMES_SOURCE = "SEC XBRL Frames"
+SEC_FRAMES_SOURCE_TYPE = "SEC_FRAMES"
+DEFAULT_FRAME_QUARTERS = 12
 DEFAULT_TIMEOUT_SECONDS = 30.0
 DEFAULT_CACHE_TTL_SECONDS = 24 * 60 * 60
 DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / "data" / "sec_cache"
@@ -105,6 +116,46 @@ _FACT_UNITS: Mapping[str, Tuple[str, ...]] = {
     "shares": ("shares",),
 }
 
+# Frames are cross-sectional: one document per concept and calendar quarter
+# covers every filer.  Only the common tag of each field is requested so a
+# universe refresh stays at a few dozen documents; issuers reporting under a
+# sibling tag are covered by the per-CIK Company Facts fallback instead.
+# Quarterly frames only carry discrete three-month durations, so they are
+# requested only for income-statement fields, which filers report per quarter.
+_FRAME_CONCEPTS: Tuple[Tuple[str, str], ...] = (
+    ("RevenueFromContractWithCustomerExcludingAssessedTax", "USD"),
+    ("Revenues", "USD"),
+    ("NetIncomeLoss", "USD"),
+    ("EarningsPerShareDiluted", "USD-per-shares"),
+    ("WeightedAverageNumberOfDilutedSharesOutstanding", "shares"),
+)
+
+# Many filers report their fourth quarter only in the 10-K, so the CY####Q4
+# frames miss them.  The annual CY#### frames let the normalizer derive Q4 as
+# the annual value less Q1-Q3, as it does for Company Facts.  Weighted-average
+# shares are not additive; the cover-page share count (an instant dei frame)
+# fills the quarter instead.
+_ANNUAL_FRAME_CONCEPTS: Tuple[Tuple[str, str], ...] = _FRAME_CONCEPTS[:4]
+_INSTANT_FRAME_CONCEPTS: Tuple[Tuple[str, str], ...] = (("EntityCommonStockSharesOutstanding", "shares"),)
+
+# Most filers report Q2/Q3 cash flows only as year-to-date values and Q4 only
+# in the annual filing, none of which a quarterly frame contains.  These come
+# from the issuer's companyconcept documents (tens of KB each, with the YTD
+# and annual durations), which the Company Facts normalizer differences into
+# quarters.
+_CONCEPT_FIELDS = ("operatingCashFlow", "capex")
+
+# A frames row set is used only when every quarter carries these fields;
+# otherwise Company Facts derives them.
+_FRAME_REQUIRED_FIELDS = ("revenue", "netIncome", "operatingCashFlow", "capex", "shares")
+
+# Filing forms whose arrival makes a cached Company Facts payload stale.
+# Amendments are left out: a Part III-only 10-K/A carries no financial facts,
+# so it would never match the accession Company Facts includes and would
+# force a download on every run.  Restated figures are picked up with the
+# issuer's next original periodic filing.
+_PERIODIC_FORMS = frozenset({"10-Q", "10-K", "20-F"})
+
 
 @dataclass(frozen=True)
 class _Observation:
@@ -181,6 +232,73 @@ def _ticker_equivalent(value: str) -> str:
     return value.replace("-", "").replace(".", "").upper()
 
 
+def _cik_from_ticker_map(body: Any, symbol: str) -> str:
+    rows = body.values() if isinstance(body, Mapping) else body
+    equivalent = _ticker_equivalent(symbol)
+    for row in rows:
+        if not isinstance(row, Mapping):
+            continue
+        ticker = str(row.get("ticker") or "").strip().upper()
+        if ticker == symbol or _ticker_equivalent(ticker) == equivalent:
+            return _normalise_cik(row.get("cik_str", row.get("cik")))
+    raise SECTickerNotFoundError("SEC ticker not found: " + symbol)
+
+
+def _recent_calendar_quarters(today: date, count: int) -> List[str]:
+    """Return the ``count`` most recent completed frame periods, newest first."""
+
+    year, quarter = today.year, (today.month - 1) // 3 + 1
+    periods: List[str] = []
+    for _ in range(count):
+        quarter -= 1
+        if quarter == 0:
+            year, quarter = year - 1, 4
+        periods.append("CY" + str(year) + "Q" + str(quarter))
+    return periods
+
+
+def _latest_periodic_accession(submissions: Any) -> Optional[str]:
+    """Return the accession number of the newest original 10-Q/10-K/20-F filing."""
+
+    filings = submissions.get("filings") if isinstance(submissions, Mapping) else None
+    recent = filings.get("recent") if isinstance(filings, Mapping) else None
+    if not isinstance(recent, Mapping):
+        raise SECInvalidPayloadError("SEC submissions payload has no recent filings")
+    forms = recent.get("form")
+    accessions = recent.get("accessionNumber")
+    filing_dates = recent.get("filingDate")
+    if not isinstance(forms, list) or not isinstance(accessions, list) or not isinstance(filing_dates, list):
+        raise SECInvalidPayloadError("SEC submissions payload has malformed recent filings")
+    latest: Optional[Tuple[str, str]] = None
+    for form, accession, filed in zip(forms, accessions, filing_dates):
+        if str(form or "").upper() not in _PERIODIC_FORMS or not accession:
+            continue
+        candidate = (str(filed or ""), str(accession))
+        if latest is None or candidate > latest:
+            latest = candidate
+    return latest[1] if latest else None
+
+
+def _latest_facts_accession(payload: Any) -> Optional[str]:
+    """Return the newest original periodic accession that Company Facts includes."""
+
+    latest: Optional[Tuple[str, str]] = None
+    facts = payload.get("facts") if isinstance(payload, Mapping) else None
+    for namespace in (facts or {}).values():
+        for concept in (namespace or {}).values() if isinstance(namespace, Mapping) else ():
+            units = concept.get("units") if isinstance(concept, Mapping) else None
+            for observations in (units or {}).values() if isinstance(units, Mapping) else ():
+                for item in observations if isinstance(observations, list) else ():
+                    if not isinstance(item, Mapping) or not item.get("accn"):
+                        continue
+                    if str(item.get("form") or "").upper() not in _PERIODIC_FORMS:
+                        continue
+                    candidate = (str(item.get("filed") or ""), str(item["accn"]))
+                    if latest is None or candidate > latest:
+                        latest = candidate
+    return latest[1] if latest else None
+
+
 def _parse_frame_period(frame: Optional[str]) -> Optional[str]:
     if not frame:
         return None
@@ -576,9 +694,19 @@ class SECCompanyFactsSource:
     ticker_url: str = SEC_TICKER_URL
     facts_url_template: str = SEC_FACTS_URL
     clock: Callable[[], float] = time.time
+    submissions_url_template: str = SEC_SUBMISSIONS_URL
+    revalidate_with_submissions: bool = True
+    telemetry: Optional[SourceTelemetry] = None
+    refresh_planner: Optional[RefreshPlanner] = None
+    # Defaults to JSON files in ``cache_dir``; documents keep the file names.
+    store: Optional[DocumentStore] = None
+
+    telemetry_source = "sec"
 
     def __post_init__(self) -> None:
         self.cache_dir = Path(self.cache_dir)
+        if self.store is None:
+            self.store = JsonFileStore(self.cache_dir)
         self.user_agent = str(self.user_agent or "").strip()
         if not self.user_agent:
             raise SECCompanyFactsError("SEC User-Agent is required")
@@ -590,36 +718,67 @@ class SECCompanyFactsSource:
     def _cache_path(self, name: str) -> Path:
         return self.cache_dir / name
 
-    def _load_cache(self, path: Path) -> Optional[Any]:
-        if not path.exists():
-            return None
+    def _cached(self, path: Path) -> bool:
+        try:
+            return self.store.updated_at(path.name) is not None
+        except OSError:
+            return False
+
+    def _read_cached(self, path: Path) -> Any:
+        """Return a cached document regardless of age; raise ``OSError`` if unreadable."""
+
+        document = self.store.get(path.name)
+        if document is None:
+            raise FileNotFoundError(str(path))
+        return document.payload
+
+    def _load_cache(self, path: Path, *, record_expired: bool = True) -> Optional[Any]:
+        # ``record_expired=False`` leaves the outcome of an expired read to a
+        # caller that may still serve it as deferred or revalidated.
         try:
-            age = self.clock() - path.stat().st_mtime
+            updated_at = self.store.updated_at(path.name)
         except OSError:
+            updated_at = None
+        if updated_at is None:
+            self._record_cache("miss")
             return None
+        age = self.clock() - updated_at
         if age < 0 or age > self.cache_ttl_seconds:
+            if record_expired:
+                self._record_cache("expired")
             return None
+        self._record_cache("hit")
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError) as error:
+            return self._read_cached(path)
+        except OSError as error:
             raise SECInvalidPayloadError("invalid SEC cache: " + str(path)) from error
 
-    def _write_cache(self, path: Path, payload: Any) -> None:
+    def _record_cache(self, outcome: str) -> None:
+        if self.telemetry is not None:
+            self.telemetry.record_cache(self.telemetry_source, outcome)
+
+    def _write_cache(self, path: Path, payload: Any, *, symbol: str = "", kind: str = "", date: str = "") -> None:
         try:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            # Stores replace documents atomically, so concurrent routes never
+            # read a half-written cache document.
+            self.store.put(path.name, payload, symbol=symbol, kind=kind, date=date)
         except OSError as error:
             # A cache write must not make a valid source unavailable.  Log the
             # condition, but never treat an old cache as a fresh response.
             logger.warning("unable to write SEC cache %s: %s", path, error)
 
-    def _request_json(self, url: str) -> Any:
+    def _request_json(self, url: str, *, allow_missing: bool = False) -> Any:
         headers = {"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"}
         try:
-            response = requests.get(url, headers=headers, timeout=self.timeout_seconds)
+            with measure(self.telemetry, self.telemetry_source) as record:
+                response = requests.get(url, headers=headers, timeout=self.timeout_seconds)
+                record.observe(response)
         except requests.RequestException as error:
             raise SECRequestError("SEC request failed: " + url) from error
         status = getattr(response, "status_code", None)
+        if status == 404 and allow_missing:
+            # The SEC publishes no document for a frame nobody has filed yet.
+            return None
         if status == 429:
             raise SECRateLimitError("SEC request rate limited (429): " + url)
         if status is not None and status >= 400:
@@ -638,32 +797,136 @@ class SECCompanyFactsSource:
             return cached
         payload = self._request_json(self.ticker_url)
         _validate_ticker_map(payload)
-        self._write_cache(path, payload)
+        self._write_cache(path, payload, kind="company_tickers")
         return payload
 
     def resolve_cik(self, symbol: str) -> str:
-        symbol = _normalise_ticker(symbol)
-        body = self._load_ticker_map()
-        rows = body.values() if isinstance(body, Mapping) else body
-        equivalent = _ticker_equivalent(symbol)
+        return _cik_from_ticker_map(self._load_ticker_map(), _normalise_ticker(symbol))
+
+    def cache_state(self, symbol: str) -> Optional[str]:
+        """Return ``warm`` if ``symbol``'s facts cache is within its TTL, else ``cold``.
+
+        Reads only cached documents and records no cache outcome; ``None``
+        when the ticker is not in the cached ticker map.
+        """
+
+        try:
+            body = self._read_cached(self._cache_path("company_tickers.json"))
+            _validate_ticker_map(body)
+            cik = _cik_from_ticker_map(body, _normalise_ticker(symbol))
+            stamps = [self.store.updated_at(name) for name in self._issuer_cache_names(cik)]
+        except (OSError, SECCompanyFactsError):
+            return None
+        now = self.clock()
+        fresh = any(stamp is not None and 0 <= now - stamp <= self.cache_ttl_seconds for stamp in stamps)
+        return "warm" if fresh else "cold"
+
+    def _issuer_cache_names(self, cik: str) -> List[str]:
+        """Per-issuer cache documents, any one of which serves a route."""
+
+        return ["companyfacts_" + cik + ".json"]
+
+    def _revalidate_company_facts(self, cik: str, path: Path) -> Tuple[Optional[Any], Optional[str]]:
+        """Reuse an expired Company Facts cache when no new filing exists.
+
+        The submissions index is a few KB, while Company Facts is often
+        several MB.  The cache is reused only after a successful submissions
+        request shows the same newest periodic accession that was recorded
+        with the cached payload.  A failed submissions request raises
+        ``SECRequestError`` like any other SEC refresh failure: it neither
+        returns the old facts nor falls back to downloading Company Facts.
+        """
+
+        submissions = self._request_json(self.submissions_url_template.format(cik=cik))
+        accession = _latest_periodic_accession(submissions)
+        state_path = self._cache_path("companyfacts_" + cik + ".state.json")
+        try:
+            state = self._read_cached(state_path)
+            cached = self._read_cached(path) if accession else None
+        except OSError:
+            return None, accession
+        if not accession or not isinstance(state, Mapping) or state.get("accessionNumber") != accession:
+            return None, accession
+        try:
+            _validate_company_facts(cached)
+        except SECInvalidPayloadError:
+            return None, accession
+        if _latest_facts_accession(cached) != accession:
+            # The recorded state does not describe this payload.
+            return None, accession
+        try:
+            self.store.touch(path.name, self.clock())
+        except OSError as error:
+            logger.warning("unable to refresh SEC cache timestamp %s: %s", path, error)
+        return cached, accession
+
+    def _deferred_company_facts(
+        self, symbol: str, cik: str, path: Path, max_quarters: Optional[int]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Serve an expired Company Facts cache while no filing is due.
+
+        The refresh planner reads the issuer's filing cadence from the cached
+        rows themselves.  Any doubt (unreadable cache, thin history, an open
+        or missed filing window) returns ``None`` and the normal refresh
+        path runs.
+        """
+
+        try:
+            updated_at = self.store.updated_at(path.name)
+            cached = self._read_cached(path)
+            _validate_company_facts(cached)
+            url = self.facts_url_template.format(cik=cik)
+            history = normalize_company_facts(cached, symbol, cik, max_quarters=None, source_url=url)
+        except (OSError, SECCompanyFactsError):
+            return None
+        if updated_at is None:
+            return None
+        plan = self.refresh_planner.plan(history)
+        if plan.due:
+            return None
+        self._record_cache("deferred")
+        rows = history[:max_quarters] if max_quarters is not None else history
+        metadata = plan.as_metadata()
+        # When the served facts were actually downloaded.
+        cached_at = datetime.fromtimestamp(updated_at, tz=timezone.utc).replace(microsecond=0)
         for row in rows:
-            if not isinstance(row, Mapping):
-                continue
-            ticker = str(row.get("ticker") or "").strip().upper()
-            if ticker == symbol or _ticker_equivalent(ticker) == equivalent:
-                return _normalise_cik(row.get("cik_str", row.get("cik")))
-        raise SECTickerNotFoundError("SEC ticker not found: " + symbol)
+            row["sourceRefreshPlan"] = dict(metadata)
+            row["sourceCachedAt"] = cached_at.isoformat().replace("+00:00", "Z")
+        return rows
 
     def fetch(self, symbol: str, *, max_quarters: Optional[int] = 12, cik: Optional[str] = None) -> List[Dict[str, Any]]:
         symbol = _normalise_ticker(symbol)
         cik = _normalise_cik(cik) if cik is not None else self.resolve_cik(symbol)
         path = self._cache_path("companyfacts_" + cik + ".json")
-        payload = self._load_cache(path)
+        payload = self._load_cache(path, record_expired=False)
+        # Each read records one outcome: deferred, revalidated or expired.
+        expired = payload is None and self._cached(path)
+        if expired and self.refresh_planner is not None:
+            deferred = self._deferred_company_facts(symbol, cik, path, max_quarters)
+            if deferred is not None:
+                return deferred
         if payload is None:
             url = self.facts_url_template.format(cik=cik)
-            payload = self._request_json(url)
-            _validate_company_facts(payload)
-            self._write_cache(path, payload)
+            if expired and self.revalidate_with_submissions:
+                payload, _ = self._revalidate_company_facts(cik, path)
+                if payload is not None:
+                    self._record_cache("revalidated")
+            if payload is None and expired:
+                self._record_cache("expired")
+            if payload is None:
+                payload = self._request_json(url)
+                _validate_company_facts(payload)
+                self._write_cache(path, payload, symbol=symbol, kind="companyfacts")
+                if self.revalidate_with_submissions:
+                    # Record the filing the payload actually includes.  Company
+                    # Facts can lag the submissions index, and a lagging
+                    # payload must not be reused once that filing lands.
+                    self._write_cache(
+                        self._cache_path("companyfacts_" + cik + ".state.json"),
+                        {"accessionNumber": _latest_facts_accession(payload)},
+                        symbol=symbol,
+                        kind="companyfacts.state",
+                    )
         else:
             _validate_company_facts(payload)
             url = self.facts_url_template.format(cik=cik)
@@ -688,6 +951,162 @@ def _validate_company_facts(payload: Any) -> None:
         raise SECInvalidPayloadError("SEC Company Facts payload has no us-gaap facts")
 
 
+@dataclass
+class SECFramesSource(SECCompanyFactsSource):
+    """Frames-based ingestion mode with a per-CIK Company Facts fallback.
+
+    One frames document per income-statement concept and calendar quarter is
+    shared by every issuer, together with the annual frames of each complete
+    calendar year (for issuers whose Q4 is only in the 10-K) and the
+    quarter-end cover-page share counts.  Cash flow comes from two small per-issuer
+    companyconcept documents instead, since frames never carry the
+    year-to-date and annual durations most filers report it in.  Together
+    they replace one multi-MB Company Facts download per CIK.  Observations
+    are re-shaped into Company Facts form and normalized by the same code
+    path.  Issuers missing from the frames, or lacking a required field in
+    any quarter, are fetched through ``SECCompanyFactsSource.fetch``
+    unchanged.
+
+    Rows are labelled ``SEC_FRAMES``.  Frame periods are calendar aligned
+    (``CY2024Q4``), so ``period`` reflects the calendar quarter;
+    ``filingDate`` comes from the cash-flow filings, the only frames-mode
+    observations that carry one.
+    """
+
+    frames_url_template: str = SEC_FRAMES_URL
+    concept_url_template: str = SEC_CONCEPT_URL
+    frame_quarters: int = DEFAULT_FRAME_QUARTERS
+    _frame_facts: Optional[Dict[str, Dict[str, Any]]] = field(default=None, init=False, repr=False)
+    _frame_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.frame_quarters <= 0:
+            raise SECCompanyFactsError("SEC frame quarter count must be positive")
+
+    @property
+    def frames_source_url(self) -> str:
+        return self.frames_url_template.split("/{taxonomy}")[0]
+
+    def frame_periods(self) -> List[str]:
+        today = datetime.fromtimestamp(float(self.clock()), tz=timezone.utc).date()
+        return _recent_calendar_quarters(today, self.frame_quarters)
+
+    def _load_frame(self, tag: str, unit: str, period: str, taxonomy: str = "us-gaap") -> List[Mapping[str, Any]]:
+        path = self._cache_path("frames_" + taxonomy + "_" + tag + "_" + unit + "_" + period + ".json")
+        payload = self._load_cache(path)
+        if payload is None:
+            url = self.frames_url_template.format(taxonomy=taxonomy, tag=tag, unit=unit, period=period)
+            payload = self._request_json(url, allow_missing=True)
+            if payload is None:
+                payload = {"ccp": period, "data": []}
+            _validate_frame(payload)
+            self._write_cache(path, payload, kind="frames_" + taxonomy + "_" + tag + "_" + unit, date=period)
+        else:
+            _validate_frame(payload)
+        return payload["data"]
+
+    def load_frames(self) -> Dict[str, Dict[str, Any]]:
+        """Fetch every configured frame once and index it by CIK.
+
+        The index is built at most once per source instance; each CIK maps to
+        a Company Facts-shaped ``{"facts": {"us-gaap": ...}}`` payload.
+        """
+
+        with self._frame_lock:
+            if self._frame_facts is not None:
+                return self._frame_facts
+            periods = self.frame_periods()
+            # Only years whose Q4 is in range: an open year has no annual frame.
+            years = [period[:6] for period in periods if period.endswith("Q4")]
+            documents = [("us-gaap", tag, unit, period) for period in periods for tag, unit in _FRAME_CONCEPTS]
+            documents += [("us-gaap", tag, unit, year) for year in years for tag, unit in _ANNUAL_FRAME_CONCEPTS]
+            documents += [("dei", tag, unit, period + "I") for period in periods for tag, unit in _INSTANT_FRAME_CONCEPTS]
+            index: Dict[str, Dict[str, Any]] = {}
+            for taxonomy, tag, unit, period in documents:
+                facts_unit = unit.replace("-per-", "/")
+                for raw in self._load_frame(tag, unit, period, taxonomy):
+                    if not isinstance(raw, Mapping):
+                        continue
+                    # Annual frames line up with the calendar-quarter frames
+                    # only for fiscal years ending in December.
+                    if period in years and str(raw.get("end") or "")[5:7] != "12":
+                        continue
+                    try:
+                        cik = _normalise_cik(raw.get("cik"))
+                    except SECInvalidPayloadError:
+                        continue
+                    payload = index.setdefault(cik, {"cik": int(cik), "facts": {"us-gaap": {}, "dei": {}}})
+                    units = payload["facts"][taxonomy].setdefault(tag, {"units": {}})["units"]
+                    units.setdefault(facts_unit, []).append(
+                        {
+                            "start": raw.get("start"),
+                            "end": raw.get("end"),
+                            "val": raw.get("val"),
+                            "accn": raw.get("accn"),
+                            "frame": period,
+                        }
+                    )
+            self._frame_facts = index
+            return index
+
+    def _load_concept(self, symbol: str, cik: str, tag: str) -> Mapping[str, Any]:
+        """Return one issuer concept's ``units``; empty when the issuer lacks the tag."""
+
+        path = self._cache_path("companyconcept_" + cik + "_" + tag + ".json")
+        payload = self._load_cache(path)
+        if payload is None:
+            payload = self._request_json(self.concept_url_template.format(cik=cik, tag=tag), allow_missing=True)
+            if payload is None:
+                # Cache the absence too, so a missing tag is probed once per TTL.
+                payload = {"units": {}}
+            self._write_cache(path, payload, symbol=symbol, kind="companyconcept_" + tag)
+        units = payload.get("units") if isinstance(payload, Mapping) else None
+        if not isinstance(units, Mapping):
+            raise SECInvalidPayloadError("SEC companyconcept payload has no units")
+        return units
+
+    def _issuer_cache_names(self, cik: str) -> List[str]:
+        names = ["companyconcept_" + cik + "_" + _FACT_TAGS[field_name][0] + ".json" for field_name in _CONCEPT_FIELDS]
+        return super()._issuer_cache_names(cik) + names
+
+    def _with_concepts(self, symbol: str, cik: str, payload: Mapping[str, Any]) -> Dict[str, Any]:
+        us_gaap = dict(payload["facts"]["us-gaap"])
+        for field_name in _CONCEPT_FIELDS:
+            for tag in _FACT_TAGS[field_name]:
+                units = self._load_concept(symbol, cik, tag)
+                if units:
+                    us_gaap[tag] = {"units": units}
+                    break
+        return {**payload, "facts": {**payload["facts"], "us-gaap": us_gaap}}
+
+    def fetch(self, symbol: str, *, max_quarters: Optional[int] = 12, cik: Optional[str] = None) -> List[Dict[str, Any]]:
+        symbol = _normalise_ticker(symbol)
+        cik = _normalise_cik(cik) if cik is not None else self.resolve_cik(symbol)
+        payload = self.load_frames().get(cik)
+        if payload is not None:
+            try:
+                rows = normalize_company_facts(
+                    self._with_concepts(symbol, cik, payload), symbol, cik, max_quarters=max_quarters, source_url=self.frames_source_url
+                )
+            except SECInvalidPayloadError:
+                rows = []
+            if len(rows) >= 4 and all(
+                row.get(field_name) is not None for row in rows for field_name in _FRAME_REQUIRED_FIELDS
+            ):
+                for row in rows:
+                    row["source"] = SEC_FRAMES_SOURCE
+                    row["sourceType"] = SEC_FRAMES_SOURCE_TYPE
+                return rows
+        logger.info("%s is not fully covered by SEC frames; using Company Facts", symbol)
+        return super().fetch(symbol, max_quarters=max_quarters, cik=cik)
+
+
+def _validate_frame(payload: Any) -> None:
+    if not isinstance(payload, Mapping) or not isinstance(payload.get("data"), list):
+        raise SECInvalidPayloadError("SEC frame payload has no data list")
+
+
 def fetch_sec_financials(
     symbol: str,
     *,
@@ -712,10 +1131,14 @@ def fetch_sec_financials(
 __all__ = [
     "DEFAULT_CACHE_DIR",
     "DEFAULT_CACHE_TTL_SECONDS",
+    "DEFAULT_FRAME_QUARTERS",
     "DEFAULT_TIMEOUT_SECONDS",
     "DEFAULT_USER_AGENT",
+    "SEC_FRAMES_SOURCE",
+    "SEC_FRAMES_SOURCE_TYPE",
     "SECCompanyFactsError",
     "SECCompanyFactsSource",
+    "SECFramesSource",
     "SECInvalidPayloadError",
     "SECRateLimitError",
     "SECRequestError",
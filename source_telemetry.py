@@ -0,0 +1,252 @@
+"""Structured per-run telemetry for the financial and price source lanes.
+
+Adapters record what they did, not what it meant: request counts and
+latency, bytes received, HTTP status codes, cache outcomes and circuit
+breaker trips.  Every figure is kept per source for the whole run and per
+symbol, so a slow lane can be traced to the issuers that made it slow.
+
+Telemetry is optional everywhere.  Adapters take ``telemetry=None`` and the
+:func:`measure` helper is a no-op without a collector, so instrumentation
+never changes source behaviour or failure handling.
+
+The collector is thread safe.  A symbol scope is thread local, which lets
+the router attribute nested SEC/foreign requests to the symbol being routed
+without threading a symbol through every adapter signature.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+BASE_DIR = Path(__file__).resolve().parent
+# Outside the committed data/results tree; the workflow uploads it as an artifact.
+DEFAULT_METRICS_PATH = BASE_DIR / "data" / "telemetry" / "source_metrics.json"
+METRICS_SCHEMA_VERSION = "1.0"
+# Upper bounds (inclusive, milliseconds); a final overflow bucket follows.
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# One outcome per cache read.  ``deferred``: an expired cache served because
+# no filing is due yet; ``revalidated``: one confirmed current upstream.
+CACHE_OUTCOMES = ("hit", "miss", "expired", "revalidated", "deferred")
+
+
+def _iso(value: float) -> str:
+    stamp = datetime.fromtimestamp(float(value), tz=timezone.utc)
+    return stamp.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        "requests": 0,
+        "errors": 0,
+        "bytes": 0,
+        "statusCodes": {},
+        "latencyMs": {
+            "count": 0,
+            "total": 0.0,
+            "max": 0.0,
+            "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        },
+        "cache": {outcome: 0 for outcome in CACHE_OUTCOMES},
+        "breakerTrips": 0,
+    }
+
+
+class RequestRecord:
+    """Mutable result slot filled in by the caller inside :func:`measure`."""
+
+    __slots__ = ("status", "bytes", "error")
+
+    def __init__(self) -> None:
+        self.status: Optional[int] = None
+        self.bytes = 0
+        self.error = False
+
+    def observe(self, response: Any) -> None:
+        """Capture status and body size from a ``requests``-style response."""
+
+        status = getattr(response, "status_code", None)
+        self.status = status if isinstance(status, int) else None
+        content = getattr(response, "content", None)
+        if isinstance(content, (bytes, bytearray)):
+            self.bytes = len(content)
+        if self.status is not None and self.status >= 400:
+            self.error = True
+
+
+class SourceTelemetry:
+    """Thread-safe collector for one pipeline run."""
+
+    def __init__(
+        self,
+        *,
+        clock: Callable[[], float] = time.time,
+        perf_counter: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.clock = clock
+        self.perf_counter = perf_counter
+        self.started_at = clock()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._run: Dict[str, Dict[str, Any]] = {}
+        self._symbols: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def current_symbol(self) -> Optional[str]:
+        return getattr(self._local, "symbol", None)
+
+    @contextmanager
+    def symbol_scope(self, symbol: Optional[str]) -> Iterator[None]:
+        """Attribute records made on this thread to ``symbol``."""
+
+        previous = self.current_symbol
+        self._local.symbol = str(symbol).upper() if symbol else None
+        try:
+            yield
+        finally:
+            self._local.symbol = previous
+
+    def _targets(self, source: str, symbol: Optional[str]):
+        symbol = str(symbol).upper() if symbol else self.current_symbol
+        targets = [self._run.setdefault(source, _empty_stats())]
+        if symbol:
+            entry = self._symbols.setdefault(symbol, {"sources": {}})
+            targets.append(entry["sources"].setdefault(source, _empty_stats()))
+        return targets
+
+    def record_request(
+        self,
+        source: str,
+        latency_seconds: float,
+        *,
+        status: Optional[int] = None,
+        bytes_received: int = 0,
+        error: bool = False,
+        symbol: Optional[str] = None,
+    ) -> None:
+        latency_ms = max(0.0, float(latency_seconds) * 1000.0)
+        bucket = len(LATENCY_BUCKETS_MS)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                bucket = index
+                break
+        with self._lock:
+            for stats in self._targets(source, symbol):
+                stats["requests"] += 1
+                stats["errors"] += 1 if error else 0
+                stats["bytes"] += max(0, int(bytes_received or 0))
+                if status is not None:
+                    key = str(status)
+                    stats["statusCodes"][key] = stats["statusCodes"].get(key, 0) + 1
+                latency = stats["latencyMs"]
+                latency["count"] += 1
+                latency["total"] += latency_ms
+                latency["max"] = max(latency["max"], latency_ms)
+                latency["buckets"][bucket] += 1
+
+    def record_cache(self, source: str, outcome: str, *, symbol: Optional[str] = None) -> None:
+        if outcome not in CACHE_OUTCOMES:
+            raise ValueError("unknown cache outcome: " + str(outcome))
+        with self._lock:
+            for stats in self._targets(source, symbol):
+                stats["cache"][outcome] += 1
+
+    def record_breaker_trip(self, source: str, *, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            for stats in self._targets(source, symbol):
+                stats["breakerTrips"] += 1
+
+    def record_route(
+        self,
+        symbol: str,
+        latency_seconds: float,
+        *,
+        source_type: Optional[str] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        route = {
+            "sourceType": source_type,
+            "latencyMs": round(max(0.0, float(latency_seconds) * 1000.0), 3),
+            "outcome": "error" if error is not None else "ok",
+        }
+        if error is not None:
+            route["error"] = type(error).__name__
+        with self._lock:
+            entry = self._symbols.setdefault(str(symbol).upper(), {"sources": {}})
+            entry["route"] = route
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-safe copy of everything recorded so far."""
+
+        with self._lock:
+            payload = json.loads(json.dumps({"run": self._run, "symbols": self._symbols}))
+        for stats in [*payload["run"].values()] + [
+            source for entry in payload["symbols"].values() for source in entry["sources"].values()
+        ]:
+            stats["latencyMs"]["total"] = round(stats["latencyMs"]["total"], 3)
+            stats["latencyMs"]["max"] = round(stats["latencyMs"]["max"], 3)
+        return {
+            "schemaVersion": METRICS_SCHEMA_VERSION,
+            "startedAt": _iso(self.started_at),
+            "generatedAt": _iso(self.clock()),
+            "latencyBucketsMs": list(LATENCY_BUCKETS_MS),
+            "run": payload["run"],
+            "symbols": dict(sorted(payload["symbols"].items())),
+        }
+
+    def write(self, path: Path = DEFAULT_METRICS_PATH) -> Path:
+        """Atomically write :meth:`snapshot` as JSON and return the path."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        temp_path.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+        os.replace(temp_path, path)
+        return path
+
+
+@contextmanager
+def measure(
+    telemetry: Optional[SourceTelemetry],
+    source: str,
+    *,
+    symbol: Optional[str] = None,
+) -> Iterator[RequestRecord]:
+    """Time one source request; a raised exception is counted as an error."""
+
+    record = RequestRecord()
+    if telemetry is None:
+        yield record
+        return
+    started = telemetry.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        record.error = True
+        raise
+    finally:
+        telemetry.record_request(
+            source,
+            telemetry.perf_counter() - started,
+            status=record.status,
+            bytes_received=record.bytes,
+            error=record.error,
+            symbol=symbol,
+        )
+
+
+__all__ = [
+    "CACHE_OUTCOMES",
+    "DEFAULT_METRICS_PATH",
+    "LATENCY_BUCKETS_MS",
+    "RequestRecord",
+    "SourceTelemetry",
+    "measure",
+]
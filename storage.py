@@ -0,0 +1,436 @@
+"""Document storage backends for the source caches and valuation results.
+
+The caches and results are JSON documents addressed by name: ``companyfacts_
+{CIK}.json`` in the SEC cache, ``{TICKER}/valuation_summary.json`` under
+``data/results``.  ``DocumentStore`` is the interface the SEC, foreign and FMP
+caches and the results writer use to read and write them.
+
+``JsonFileStore`` is the default and keeps the existing layout: one file per
+document, written atomically, with the file mtime as the document's update
+time (the cache TTLs read it).
+
+``file_lock`` serializes the read-merge-replace of the small side files that
+concurrent shards share (negative coverage, run costs, the status index).
+
+``SQLiteStore`` is an optional single-file backend.  Every namespace (``sec``,
+``sec_foreign``, ``fmp``, ``results``) is one table partition indexed by
+``(symbol, kind, date)``, so a point query does not touch other tickers.  The
+database runs in WAL mode, so routing threads read while one thread writes,
+and ``transaction()`` batches many writes into one commit.  ``export_json``
+materializes a namespace back into the JSON layout for the tools and
+workflows that read files.
+"""
+
+from __future__ import annotations
+
+import abc
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows; side files are then merged without a lock
+    fcntl = None
+
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_SQLITE_PATH = BASE_DIR / "data" / "store.sqlite3"
+STORAGE_BACKENDS = ("json", "sqlite")
+SQLITE_SCHEMA_VERSION = 1
+SQLITE_BUSY_TIMEOUT_SECONDS = 30.0
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    namespace TEXT NOT NULL,
+    name TEXT NOT NULL,
+    symbol TEXT NOT NULL DEFAULT '',
+    kind TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    updated_at REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (namespace, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS documents_symbol_kind_date ON documents (namespace, symbol, kind, date);
+"""
+
+
+class StorageError(OSError):
+    """A stored document exists but cannot be decoded."""
+
+
+@contextlib.contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on ``{path}.lock`` across processes.
+
+    The lock file sits beside ``path`` and is never removed.  Without
+    ``fcntl`` (Windows) it is a no-op.
+    """
+
+    if fcntl is None:
+        yield
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a", encoding="utf-8") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+@dataclass(frozen=True)
+class StoredDocument:
+    name: str
+    payload: Any
+    updated_at: float
+    symbol: str = ""
+    kind: str = ""
+    date: str = ""
+
+
+class DocumentStore(abc.ABC):
+    """Named JSON documents with an update time.
+
+    ``get`` and ``updated_at`` return ``None`` for a missing document.  Write
+    failures raise ``OSError`` (including ``StorageError``), which the caches
+    already treat as a lost cache write rather than a source failure.
+    """
+
+    @abc.abstractmethod
+    def get(self, name: str) -> Optional[StoredDocument]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def updated_at(self, name: str) -> Optional[float]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put(
+        self,
+        name: str,
+        payload: Any,
+        *,
+        symbol: str = "",
+        kind: str = "",
+        date: str = "",
+        updated_at: Optional[float] = None,
+    ) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def touch(self, name: str, when: float) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def transaction(self) -> contextlib.AbstractContextManager:
+        raise NotImplementedError
+
+
+class JsonFileStore(DocumentStore):
+    """One JSON file per document under ``root``."""
+
+    def __init__(self, root: Path, *, indent: Optional[int] = None) -> None:
+        self.root = Path(root)
+        self.indent = indent
+
+    def path(self, name: str) -> Path:
+        return self.root / name
+
+    def updated_at(self, name: str) -> Optional[float]:
+        try:
+            return self.path(name).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def get(self, name: str) -> Optional[StoredDocument]:
+        path = self.path(name)
+        try:
+            text = path.read_text(encoding="utf-8")
+            updated_at = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as error:
+            raise StorageError(f"invalid JSON document: {path}") from error
+        return StoredDocument(name, payload, updated_at)
+
+    def _encode(self, payload: Any) -> str:
+        if self.indent is None:
+            return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return json.dumps(payload, indent=self.indent)
+
+    def put(
+        self,
+        name: str,
+        payload: Any,
+        *,
+        symbol: str = "",
+        kind: str = "",
+        date: str = "",
+        updated_at: Optional[float] = None,
+    ) -> None:
+        path = self.path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write beside the target and rename so concurrent readers never see
+        # a half-written document.
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_text(self._encode(payload), encoding="utf-8")
+        if updated_at is not None:
+            os.utime(temp_path, (updated_at, updated_at))
+        os.replace(temp_path, path)
+
+    def touch(self, name: str, when: float) -> None:
+        os.utime(self.path(name), (when, when))
+
+    def transaction(self) -> contextlib.AbstractContextManager:
+        # Every file write is already atomic on its own.
+        return contextlib.nullcontext()
+
+
+class SQLiteDatabase:
+    """One WAL-mode SQLite file shared by every namespace.
+
+    Each thread gets its own connection.  Writes outside ``transaction()``
+    commit immediately; inside it they commit together, and nested
+    transactions join the outermost one.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_SQLITE_PATH,
+        *,
+        clock: Callable[[], float] = time.time,
+        timeout_seconds: float = SQLITE_BUSY_TIMEOUT_SECONDS,
+    ) -> None:
+        self.path = Path(path)
+        self.clock = clock
+        self.timeout_seconds = timeout_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self.connection()
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SQLITE_SCHEMA_VERSION):
+            raise StorageError(f"unsupported storage schema version {version}: {self.path}")
+        connection.executescript(_SCHEMA)
+        connection.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                str(self.path), timeout=self.timeout_seconds, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            # WAL with NORMAL sync stays consistent after a crash and only
+            # risks the last commits on power loss; caches can refetch those.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.depth = 0
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self.connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield connection
+            finally:
+                self._local.depth -= 1
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def namespace(self, name: str) -> "SQLiteStore":
+        return SQLiteStore(self, name)
+
+    def namespaces(self) -> List[str]:
+        rows = self.connection().execute("SELECT DISTINCT namespace FROM documents ORDER BY namespace")
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+class SQLiteStore(DocumentStore):
+    """A namespace of ``SQLiteDatabase`` with indexed point queries."""
+
+    def __init__(self, database: SQLiteDatabase, namespace: str) -> None:
+        self.database = database
+        self.namespace = str(namespace)
+
+    def _execute(self, sql: str, parameters: Iterable[Any] = ()) -> sqlite3.Cursor:
+        try:
+            return self.database.connection().execute(sql, tuple(parameters))
+        except sqlite3.Error as error:
+            raise StorageError(f"{self.namespace} storage failed: {error}") from error
+
+    def _document(self, row: Any) -> StoredDocument:
+        name, symbol, kind, date, updated_at, payload = row
+        try:
+            decoded = json.loads(payload)
+        except json.JSONDecodeError as error:
+            raise StorageError(f"invalid JSON document: {self.namespace}/{name}") from error
+        return StoredDocument(name, decoded, float(updated_at), symbol, kind, date)
+
+    def get(self, name: str) -> Optional[StoredDocument]:
+        row = self._execute(
+            "SELECT name, symbol, kind, date, updated_at, payload FROM documents WHERE namespace = ? AND name = ?",
+            (self.namespace, name),
+        ).fetchone()
+        return self._document(row) if row else None
+
+    def updated_at(self, name: str) -> Optional[float]:
+        row = self._execute(
+            "SELECT updated_at FROM documents WHERE namespace = ? AND name = ?", (self.namespace, name)
+        ).fetchone()
+        return float(row[0]) if row else None
+
+    def put(
+        self,
+        name: str,
+        payload: Any,
+        *,
+        symbol: str = "",
+        kind: str = "",
+        date: str = "",
+        updated_at: Optional[float] = None,
+    ) -> None:
+        stamp = self.database.clock() if updated_at is None else updated_at
+        self._execute(
+            "INSERT INTO documents (namespace, name, symbol, kind, date, updated_at, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (namespace, name) DO UPDATE SET symbol = excluded.symbol, kind = excluded.kind, "
+            "date = excluded.date, updated_at = excluded.updated_at, payload = excluded.payload",
+            (
+                self.namespace,
+                name,
+                str(symbol or ""),
+                str(kind or ""),
+                str(date or ""),
+                float(stamp),
+                json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+            ),
+        )
+
+    def touch(self, name: str, when: float) -> None:
+        cursor = self._execute(
+            "UPDATE documents SET updated_at = ? WHERE namespace = ? AND name = ?", (float(when), self.namespace, name)
+        )
+        if cursor.rowcount == 0:
+            raise FileNotFoundError(f"no stored document {self.namespace}/{name}")
+
+    def transaction(self) -> contextlib.AbstractContextManager:
+        return self.database.transaction()
+
+    def _where(self, symbol: Optional[str], kind: Optional[str], date: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses: List[str] = ["namespace = ?"]
+        parameters: List[Any] = [self.namespace]
+        for column, value in (("symbol", symbol), ("kind", kind), ("date", date)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                parameters.append(str(value))
+        return " AND ".join(clauses), parameters
+
+    def query(
+        self,
+        *,
+        symbol: Optional[str] = None,
+        kind: Optional[str] = None,
+        date: Optional[str] = None,
+    ) -> List[StoredDocument]:
+        """Documents matching every given key, newest date first within a kind."""
+
+        where, parameters = self._where(symbol, kind, date)
+        rows = self._execute(
+            f"SELECT name, symbol, kind, date, updated_at, payload FROM documents WHERE {where} "
+            "ORDER BY symbol, kind, date DESC, name",
+            parameters,
+        )
+        return [self._document(row) for row in rows.fetchall()]
+
+    def symbols(self) -> List[str]:
+        rows = self._execute(
+            "SELECT DISTINCT symbol FROM documents WHERE namespace = ? ORDER BY symbol", (self.namespace,)
+        )
+        return [row[0] for row in rows.fetchall()]
+
+    def delete(self, *, symbol: Optional[str] = None, kind: Optional[str] = None, date: Optional[str] = None) -> int:
+        where, parameters = self._where(symbol, kind, date)
+        return self._execute(f"DELETE FROM documents WHERE {where}", parameters).rowcount
+
+
+def export_json(store: SQLiteStore, directory: Path, *, names: Optional[Iterable[str]] = None, indent: Optional[int] = None) -> int:
+    """Write documents back to the JSON layout; file mtimes keep update times."""
+
+    target = JsonFileStore(directory, indent=indent)
+    documents = store.query() if names is None else [store.get(name) for name in names]
+    written = 0
+    for document in documents:
+        if document is None:
+            continue
+        target.put(document.name, document.payload, updated_at=document.updated_at)
+        written += 1
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export a SQLite storage namespace to JSON files.")
+    parser.add_argument("namespace", help="Namespace to export, e.g. results or sec.")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--database", type=Path, default=DEFAULT_SQLITE_PATH)
+    parser.add_argument("--indent", type=int)
+    args = parser.parse_args(argv)
+    if not args.database.is_file():
+        parser.error(f"storage database not found: {args.database}")
+    database = SQLiteDatabase(args.database)
+    try:
+        written = export_json(database.namespace(args.namespace), args.directory, indent=args.indent)
+    finally:
+        database.close()
+    print(f"Exported {written} {args.namespace} documents to {args.directory}")
+    return 0
+
+
+__all__ = [
+    "DEFAULT_SQLITE_PATH",
+    "DocumentStore",
+    "JsonFileStore",
+    "SQLiteDatabase",
+    "SQLiteStore",
+    "STORAGE_BACKENDS",
+    "StorageError",
+    "StoredDocument",
+    "export_json",
+    "file_lock",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from band_codec import BandCodecError, decode_bands, encode_bands
+from export_watcher_data import export_all, export_valuation, encode_json
+
+
+def valuation_summary():
+    rows = []
+    for index, day in enumerate(("2025-01-02", "2025-01-03", "2025-01-06", "2026-01-05")):
+        bands = {"mean": 100.5 + index, "up1": 110.25, "up2": 120.0, "down1": 90.0, "down2": None}
+        row = {"date": day, "price": 99.75 + index, "valuation": {}}
+        for window in ("1Y", "2Y", "3Y", "5Y"):
+            row["valuation"][window] = {metric: dict(bands) for metric in ("pe", "fcf", "ps")}
+        rows.append(row)
+    return {"ticker": "TEST", "last_updated": "2026-01-05 22:00:00", "data": rows}
+
+
+class BandCodecTests(unittest.TestCase):
+    def test_round_trip_preserves_dates_values_and_alignment(self):
+        payload = export_valuation(valuation_summary(), "TEST", "pe", "1Y")
+
+        packed = encode_bands(payload)
+        decoded = decode_bands(packed)
+
+        self.assertEqual(packed[:4], b"VBND")
+        self.assertEqual(packed[5], 2)
+        header_end = 8 + int.from_bytes(packed[6:8], "little")
+        self.assertEqual(header_end % 4, 0)
+        self.assertEqual(decoded["dates"], [point["date"] for point in payload["points"]])
+        self.assertEqual(decoded["series"]["price"], [point["price"] for point in payload["points"]])
+        self.assertEqual(decoded["series"]["up1"][0], 110.25)
+        self.assertEqual(decoded["series"]["down2"], [None] * 4)
+        self.assertEqual(decoded["header"]["symbol"], "TEST")
+        self.assertLess(len(packed), len(encode_json(payload)))
+
+    def test_long_spans_widen_offsets_and_corrupt_files_are_rejected(self):
+        payload = export_valuation(valuation_summary(), "TEST", "pe", "1Y")
+        payload["points"][-1]["date"] = "2120-01-01"
+
+        packed = encode_bands(payload)
+
+        self.assertEqual(packed[5], 4)
+        self.assertEqual(decode_bands(packed)["dates"][-1], "2120-01-01")
+        with self.assertRaises(BandCodecError):
+            decode_bands(packed[:-1])
+        with self.assertRaises(BandCodecError):
+            encode_bands({**payload, "points": list(reversed(payload["points"]))})
+
+    def test_export_writes_packed_siblings_when_requested(self):
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            (root / "results" / "TEST").mkdir(parents=True)
+            (root / "processed").mkdir()
+            (root / "results" / "TEST" / "valuation_summary.json").write_text(json.dumps(valuation_summary()), encoding="utf-8")
+            row = {
+                "date": "2025-12-31",
+                "source": "SEC Company Facts",
+                "sourceType": "sec_companyfacts",
+                "sourceFetchedAt": "2026-01-05T22:00:00Z",
+                "sourceDataAsOf": "2025-12-31",
+            }
+            (root / "processed" / "TEST_combined.json").write_text(json.dumps([row]), encoding="utf-8")
+
+            manifest = export_all(root / "results", root / "processed", root / "exports", binary_bands=True)
+            packed = (root / "exports/valuation/TEST/fcf/5Y.vbnd").read_bytes()
+
+        self.assertEqual(manifest["symbols"][0]["bandFormats"], ["json", "vbnd"])
+        self.assertIn("valuation/TEST/fcf/5Y.vbnd", manifest["objects"])
+        self.assertEqual(decode_bands(packed)["header"]["window"], "5Y")
+
+
+if __name__ == "__main__":
+    unittest.main()
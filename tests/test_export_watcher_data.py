@@ -1,10 +1,22 @@
+import gzip
 import json
 import tempfile
 import unittest
+from datetime import date, timedelta
 from pathlib import Path
 
-from export_watcher_data import ExportValidationError, export_all
-from ticker_universe import UniverseValidationError, resolve_tickers
+from export_watcher_data import (
+    EXPORT_POINTS,
+    RESOLUTIONS,
+    ExportValidationError,
+    delta_plan,
+    export_all,
+    export_pyramid,
+    export_valuation,
+    export_valuations,
+    merge_shard_symbols,
+)
+from ticker_universe import DEFAULT_TICKERS, UniverseValidationError, parse_shard, resolve_tickers, select_shard, shard_index
 
 
 def summary(symbol="TEST"):
@@ -68,6 +80,103 @@ class WatcherExportTests(unittest.TestCase):
                 export_all(results, processed, root / "exports", max_export_bytes=1)
             self.assertFalse((root / "exports/manifest.json").exists())
 
+    def test_release_is_promoted_whole_and_failed_release_keeps_previous(self):
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            results, processed = self.write_fixture(root)
+            exports = root / "exports"
+            (exports / "valuation" / "GONE").mkdir(parents=True)
+            export_all(results, processed, exports, generated_at="2026-07-31T00:00:00Z")
+            self.assertFalse((exports / "valuation" / "GONE").exists())
+            published = (exports / "manifest.json").read_text(encoding="utf-8")
+
+            with self.assertRaisesRegex(ExportValidationError, "byte limit"):
+                export_all(results, processed, exports, max_export_bytes=1)
+            self.assertEqual((exports / "manifest.json").read_text(encoding="utf-8"), published)
+            self.assertEqual(sorted(path.name for path in root.iterdir()), ["exports", "processed", "results"])
+
+    def test_delta_plan_reuses_unchanged_objects_from_recent_releases(self):
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            results, processed = self.write_fixture(root)
+            first = export_all(results, processed, root / "exports", generated_at="2026-07-31T00:00:00Z", release_id="r1")
+            files = sorted(path.relative_to(root / "exports").as_posix() for path in (root / "exports").rglob("*") if path.is_file())
+            second = export_all(results, processed, root / "exports", generated_at="2026-08-01T00:00:00Z", previous_manifest=first, release_id="r2")
+            stale = export_all(results, processed, root / "exports", generated_at="2026-08-20T00:00:00Z", previous_manifest=second, release_id="r3")
+            published = json.loads((root / "exports/manifest.json").read_text(encoding="utf-8"))
+            (results / "TEST" / "valuation_summary.json").write_text(json.dumps({**summary(), "last_updated": "2026-08-20 22:00:00"}), encoding="utf-8")
+            changed = export_all(results, processed, root / "exports", generated_at="2026-08-21T00:00:00Z", previous_manifest=stale, release_id="r4")
+
+        self.assertEqual(len(first["objects"]), 1 + 12)
+        self.assertEqual(sorted(delta_plan(first)["upload"]), files)
+        plan = delta_plan(second)
+        self.assertEqual((plan["uploadBytes"], plan["previousReleaseId"]), (0, "r1"))
+        self.assertTrue(all(key.startswith("manifest.json") for key in plan["upload"]))
+        self.assertEqual(set(plan["reuse"].values()), {"r1"})
+        self.assertEqual(delta_plan(stale)["reuse"], {})
+        self.assertEqual(published["objects"], stale["objects"])
+        self.assertNotEqual(changed["objects"]["financials/TEST.json"]["sha256"], stale["objects"]["financials/TEST.json"]["sha256"])
+        self.assertEqual(delta_plan(changed)["reuse"], {})
+
+    def test_writes_deterministic_gzip_siblings_and_can_budget_compressed_size(self):
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            results, processed = self.write_fixture(root)
+            plain = export_all(results, processed, root / "exports", generated_at="2026-07-31T00:00:00Z")
+            self.assertEqual(list((root / "exports").rglob("*.gz")), [])
+            self.assertFalse(any(key.endswith(".gz") for key in delta_plan(plain)["upload"]))
+            manifest = export_all(results, processed, root / "exports", generated_at="2026-07-31T00:00:00Z", precompress=True)
+            self.assertIn("manifest.json.gz", delta_plan(manifest)["upload"])
+            band = root / "exports/valuation/TEST/pe/1Y.json"
+            self.assertEqual(gzip.decompress(band.with_name("1Y.json.gz").read_bytes()), band.read_bytes())
+            entry = manifest["objects"]["valuation/TEST/pe/1Y.json"]
+            self.assertEqual(entry["encodings"]["gzip"], band.with_name("1Y.json.gz").stat().st_size)
+            raw_total = sum(item["bytes"] for item in manifest["objects"].values())
+            gzip_total = sum(item["encodings"]["gzip"] for item in manifest["objects"].values())
+            first_gzip = band.with_name("1Y.json.gz").read_bytes()
+
+            export_all(results, processed, root / "exports", generated_at="2026-07-31T00:00:00Z", max_export_bytes=raw_total, budget_encoding="gzip", precompress=True)
+            self.assertEqual(band.with_name("1Y.json.gz").read_bytes(), first_gzip)
+            with self.assertRaisesRegex(ExportValidationError, "slim gzip payload is .* exceeding the 1 byte limit"):
+                export_all(results, processed, root / "exports", max_export_bytes=1, budget_encoding="gzip")
+        self.assertLess(gzip_total, raw_total)
+
+    def test_pyramid_downsamples_long_history_by_week_and_month(self):
+        base = summary()["data"][0]
+        start = date(2019, 1, 1)
+        rows = []
+        for offset in range(0, 7 * 365):
+            day = start + timedelta(days=offset)
+            if day.weekday() < 5:
+                bands = {metric: {"mean": float(offset), "up1": 1, "up2": 2, "down1": None, "down2": 0} for metric in ("pe", "fcf", "ps")}
+                rows.append({**base, "date": day.isoformat(), "price": offset, "valuation": {window: bands for window in ("1Y", "2Y", "3Y", "5Y")}})
+        payloads = export_pyramid({**summary(), "data": rows}, "TEST")
+
+        daily, weekly, monthly = (payloads[("pe", "5Y", resolution)] for resolution in ("daily", "weekly", "monthly"))
+        self.assertEqual(len(daily["points"]), EXPORT_POINTS)
+        self.assertTrue(255 <= len(weekly["points"]) <= 262)
+        self.assertGreaterEqual(weekly["points"][0]["date"], "2020-12-")
+        self.assertEqual(len(monthly["points"]), 84)
+        self.assertEqual({daily["dataAsOf"], weekly["dataAsOf"], monthly["dataAsOf"]}, {rows[-1]["date"]})
+        self.assertEqual(weekly["latest"], daily["latest"])
+        self.assertEqual(monthly["latest"]["bands"]["mean"], float(rows[-1]["price"]))
+        january = monthly["points"][0]
+        self.assertEqual((january["date"], january["price"]), ("2019-01-31", 30))
+        self.assertEqual(january["bands"]["mean"], 15.0)
+        self.assertIsNone(january["bands"]["down1"])
+        self.assertEqual(weekly["resolution"], "weekly")
+
+    def test_weekly_and_monthly_levels_are_published_only_with_pyramid(self):
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            results, processed = self.write_fixture(root)
+            pyramid = export_all(results, processed, root / "exports", generated_at="2026-07-31T00:00:00Z", pyramid=True)
+            self.assertTrue((root / "exports/valuation/TEST/pe/1Y.weekly.json").is_file())
+
+        self.assertEqual(len(pyramid["objects"]), 1 + 12 * len(RESOLUTIONS))
+        self.assertEqual(list(pyramid["resolutions"]), list(RESOLUTIONS))
+        self.assertEqual(pyramid["symbols"][0]["resolutions"], list(RESOLUTIONS))
+
     def test_aborts_when_expected_ticker_has_no_complete_export(self):
         with tempfile.TemporaryDirectory() as temp:
             root = Path(temp)
@@ -88,8 +197,64 @@ class WatcherExportTests(unittest.TestCase):
                 export_all(results, processed, root / "exports")
             self.assertFalse((root / "exports/manifest.json").exists())
 
+    def test_shared_view_matches_per_payload_export_on_unsorted_history(self):
+        base = summary()["data"][0]
+        rows = [{**base, "date": f"2025-{month:02d}-{day:02d}", "price": month * 100 + day} for month in range(1, 13) for day in range(1, 29)]
+        rows.reverse()
+        payload = {**summary(), "data": rows}
+        shared = export_valuations(payload, "TEST")
+        self.assertEqual(len(shared), 12)
+        for (metric, window), valuation in shared.items():
+            self.assertEqual(valuation, export_valuation(payload, "TEST", metric, window))
+        points = shared[("pe", "1Y")]["points"]
+        self.assertEqual(len(points), EXPORT_POINTS)
+        self.assertEqual(points[-1]["date"], "2025-12-28")
+
+
+class ShardMergeTests(unittest.TestCase):
+    def write_shards(self, root: Path, universe, count):
+        paths = []
+        for index in range(1, count + 1):
+            path = root / f"shard-{index}.json"
+            body = {"symbols": select_shard(universe, index, count), "shard": {"index": index, "count": count, "universe": universe}}
+            path.write_text(json.dumps(body), encoding="utf-8")
+            paths.append(path)
+        return paths
+
+    def test_complete_shards_merge_back_to_the_universe(self):
+        universe = list(DEFAULT_TICKERS)
+        with tempfile.TemporaryDirectory() as temp:
+            paths = self.write_shards(Path(temp), universe, 3)
+            self.assertEqual(merge_shard_symbols(list(reversed(paths))), universe)
+
+    def test_missing_duplicate_or_drifted_shards_are_rejected(self):
+        universe = list(DEFAULT_TICKERS)
+        with tempfile.TemporaryDirectory() as temp:
+            paths = self.write_shards(Path(temp), universe, 3)
+            with self.assertRaisesRegex(ExportValidationError, "missing shards: 3/3"):
+                merge_shard_symbols(paths[:2])
+            with self.assertRaisesRegex(ExportValidationError, "repeats shard"):
+                merge_shard_symbols([*paths, paths[0]])
+            body = json.loads(paths[0].read_text(encoding="utf-8"))
+            body["symbols"] = body["symbols"][1:]
+            paths[0].write_text(json.dumps(body), encoding="utf-8")
+            with self.assertRaisesRegex(ExportValidationError, "does not hold the symbols"):
+                merge_shard_symbols(paths)
+
 
 class TickerUniverseTests(unittest.TestCase):
+    def test_shard_partition_is_stable_and_covers_every_symbol_once(self):
+        universe = list(DEFAULT_TICKERS)
+        shards = [select_shard(universe, index, 4) for index in range(1, 5)]
+        self.assertEqual(sorted(symbol for shard in shards for symbol in shard), sorted(universe))
+        self.assertEqual(select_shard(list(reversed(universe)), 2, 4), list(reversed(shards[1])))
+        self.assertEqual(shard_index("aapl", 4), shard_index("AAPL", 4))
+        self.assertTrue(all(shards))
+        self.assertEqual(parse_shard(" 3 / 4 "), (3, 4))
+        for value in ("0/4", "5/4", "1/0", "x/4"):
+            with self.assertRaises(UniverseValidationError):
+                parse_shard(value)
+
     def test_default_universe_excludes_unbackfilled_legacy_sq_symbol(self):
         self.assertNotIn("SQ", resolve_tickers())
 
@@ -1,6 +1,12 @@
+import json
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import Mock
+from pathlib import Path
+from unittest.mock import Mock, patch
 
+import storage
 from financial_source_router import (
     FMPStalePayloadError,
     FMPCircuitBreaker,
@@ -11,6 +17,10 @@ from financial_source_router import (
     FinancialSourceRouter,
     FinancialSourceError,
     FinancialSourceStale,
+    ROUTE_FMP_NEGATIVE_CACHE,
+    ROUTE_FMP_SEC_UNSUPPORTED,
+    ROUTE_SEC,
+    SECNegativeCoverageCache,
 )
 from sec_company_facts import SECInvalidPayloadError, SECTickerNotFoundError
 
@@ -137,5 +147,136 @@ class FinancialSourceRouterTests(unittest.TestCase):
             router.route("TSM")
 
 
+class FinancialSourceRouterBatchTests(unittest.TestCase):
+    def test_route_many_memoizes_results_and_typed_errors(self):
+        calls = []
+
+        def sec(symbol, max_quarters=None):
+            calls.append((symbol, max_quarters))
+            if symbol == "BAD":
+                raise SECInvalidPayloadError("invalid SEC JSON")
+            return rows("2026-06-30")
+
+        router = FinancialSourceRouter(sec_fetcher=sec, fmp_fetcher=Mock(), clock=lambda: 1_785_800_000)
+
+        outcomes = router.route_many(["aapl", "BAD", "MSFT", "AAPL"], max_workers=3)
+
+        self.assertEqual(list(outcomes), ["AAPL", "BAD", "MSFT"])
+        self.assertIsInstance(outcomes["AAPL"], FinancialSourceResult)
+        self.assertIsInstance(outcomes["BAD"], SECInvalidPayloadError)
+        self.assertIs(router.route("AAPL"), outcomes["AAPL"])
+        with self.assertRaises(SECInvalidPayloadError):
+            router.route("BAD")
+        self.assertEqual(sorted(calls), [("AAPL", 12), ("BAD", 12), ("MSFT", 12)])
+
+        router.clear_memo()
+        router.route("AAPL")
+        self.assertEqual(len(calls), 4)
+
+    def test_route_many_shares_breaker_across_serial_fmp_lane(self):
+        fmp = Mock(side_effect=FMPRateLimitError("429"))
+        router = FinancialSourceRouter(
+            sec_fetcher=Mock(side_effect=SECTickerNotFoundError("not covered")),
+            fmp_fetcher=fmp,
+            fmp_circuit_breaker=FMPCircuitBreaker(cooldown_seconds=300, clock=lambda: 10.0),
+        )
+
+        outcomes = router.route_many(["AAA", "BBB", "CCC"], max_workers=3)
+
+        self.assertEqual(fmp.call_count, 1)
+        self.assertEqual(
+            sorted(type(error).__name__ for error in outcomes.values()),
+            ["FMPCircuitOpenError", "FMPCircuitOpenError", "FMPRateLimitError"],
+        )
+
+
+class NegativeCoverageCacheTests(unittest.TestCase):
+    def router(self, cache, sec):
+        return FinancialSourceRouter(
+            sec_fetcher=sec,
+            fmp_fetcher=lambda symbol: rows("2026-06-30"),
+            clock=lambda: 1_785_800_000,
+            negative_coverage=cache,
+        )
+
+    def test_unsupported_symbol_skips_sec_until_reprobe_is_due(self):
+        now = [1_000.0]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "negative_coverage.json"
+            sec = Mock(side_effect=SECTickerNotFoundError("SEC ticker not found: XYZ"))
+
+            first = self.router(SECNegativeCoverageCache(path, ttl_seconds=100, clock=lambda: now[0]), sec).route("XYZ")
+            # A fresh cache instance reads the persisted entry, as a new run would.
+            second = self.router(SECNegativeCoverageCache(path, ttl_seconds=100, clock=lambda: now[0]), sec).route("XYZ")
+
+            self.assertEqual(sec.call_count, 1)
+            self.assertEqual(first.route_decision, ROUTE_FMP_SEC_UNSUPPORTED)
+            self.assertEqual(second.route_decision, ROUTE_FMP_NEGATIVE_CACHE)
+            self.assertEqual(second.metadata["routingDecision"], ROUTE_FMP_NEGATIVE_CACHE)
+            self.assertEqual(second.rows[0]["sourceRoutingDecision"], ROUTE_FMP_NEGATIVE_CACHE)
+
+            now[0] = 1_100.0
+            self.router(SECNegativeCoverageCache(path, ttl_seconds=100, clock=lambda: now[0]), sec).route("XYZ")
+            entry = json.loads(path.read_text(encoding="utf-8"))["symbols"]["XYZ"]
+            self.assertEqual(sec.call_count, 2)
+            self.assertEqual(entry["misses"], 2)
+            self.assertEqual(entry["reprobeAt"], 1_300.0)
+
+    def test_sec_success_on_reprobe_clears_entry(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = SECNegativeCoverageCache(Path(tmpdir) / "negative_coverage.json", ttl_seconds=1, clock=lambda: 0.0)
+            cache.record_unsupported("AAPL", "not covered")
+            later = SECNegativeCoverageCache(cache.path, ttl_seconds=1, clock=lambda: 5.0)
+
+            result = self.router(later, lambda symbol: rows("2026-06-30")).route("AAPL")
+
+            self.assertEqual(result.route_decision, ROUTE_SEC)
+            self.assertIsNone(later.lookup("AAPL"))
+            self.assertEqual(json.loads(cache.path.read_text(encoding="utf-8")), {"symbols": {}})
+
+    def test_concurrent_shards_keep_each_others_entries(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "negative_coverage.json"
+            SECNegativeCoverageCache(path, clock=lambda: 0.0).record_unsupported("XYZ", "not covered")
+            first = SECNegativeCoverageCache(path, clock=lambda: 0.0)
+            second = SECNegativeCoverageCache(path, clock=lambda: 0.0)
+            self.assertIsNotNone(first.lookup("XYZ"))
+            self.assertIsNotNone(second.lookup("XYZ"))
+
+            first.record_unsupported("AAA", "not covered")
+            first.clear("XYZ")
+            second.record_unsupported("BBB", "not covered")
+            first.record_unsupported("CCC", "not covered")
+
+            symbols = json.loads(path.read_text(encoding="utf-8"))["symbols"]
+        self.assertEqual(sorted(symbols), ["AAA", "BBB", "CCC"])
+
+    @unittest.skipIf(storage.fcntl is None, "the side-file lock needs fcntl")
+    def test_simultaneous_writers_do_not_lose_entries(self):
+        read = SECNegativeCoverageCache._read
+
+        def slow_read(cache):
+            # Widen the read-merge-replace window so unlocked writers overlap.
+            entries = read(cache)
+            time.sleep(0.01)
+            return entries
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "negative_coverage.json"
+            caches = [SECNegativeCoverageCache(path, clock=lambda: 0.0) for _ in range(6)]
+            with patch.object(SECNegativeCoverageCache, "_read", slow_read):
+                threads = [
+                    threading.Thread(target=cache.record_unsupported, args=("S" + str(index), "not covered"))
+                    for index, cache in enumerate(caches)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            symbols = json.loads(path.read_text(encoding="utf-8"))["symbols"]
+
+        self.assertEqual(sorted(symbols), ["S" + str(index) for index in range(6)])
+
+
 if __name__ == "__main__":
     unittest.main()
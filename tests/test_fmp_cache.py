@@ -0,0 +1,103 @@
+import hashlib
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import generate_valuation
+import generate_earning_report
+from fmp_cache import (
+    MANIFEST_NAME,
+    STORE_NAME,
+    latest_processed_quarter,
+    load_manifest,
+    load_statements,
+    write_statement,
+)
+
+
+ENDPOINTS = ("income-statement", "cash-flow-statement", "balance-sheet-statement", "enterprise-values")
+
+
+def statement(endpoint, day, period):
+    row = {"date": day, "symbol": "XYZ"}
+    if endpoint != "enterprise-values":
+        row["period"] = period
+    if endpoint == "income-statement":
+        row["filingDate"] = "2026-02-01" if day == "2025-12-31" else "2025-11-01"
+    return row
+
+
+class FMPCacheManifestTests(unittest.TestCase):
+    def write_legacy(self, ticker_dir, endpoints=ENDPOINTS):
+        ticker_dir.mkdir(parents=True, exist_ok=True)
+        for endpoint in ENDPOINTS:
+            rows = [statement(endpoint, "2025-09-30", "Q3")]
+            (ticker_dir / f"{endpoint}_q3.json").write_text(json.dumps(rows, indent=4), encoding="utf-8")
+        for endpoint in endpoints:
+            rows = [statement(endpoint, "2025-12-31", "Q4")]
+            (ticker_dir / f"{endpoint}_q4.json").write_text(json.dumps(rows, indent=4), encoding="utf-8")
+
+    def test_legacy_directory_is_migrated_once_into_store_and_manifest(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ticker_dir = Path(tmpdir) / "XYZ"
+            self.write_legacy(ticker_dir)
+
+            self.assertEqual(latest_processed_quarter(ticker_dir), "q4")
+            manifest = json.loads((ticker_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+            store = json.loads((ticker_dir / STORE_NAME).read_text(encoding="utf-8"))
+            entry = store["statements"]["income-statement_q4"]
+
+            self.assertEqual(sorted(path.name for path in ticker_dir.iterdir()), [MANIFEST_NAME, STORE_NAME])
+            self.assertEqual(list(entry), ["2025-12-31"])
+            self.assertEqual(manifest["latestDate"], "2025-12-31")
+            self.assertEqual(manifest["statements"]["income-statement_q4"]["records"], 1)
+            self.assertEqual(
+                manifest["statements"]["income-statement_q4"]["sha256"],
+                hashlib.sha256(json.dumps(entry, separators=(",", ":")).encode("utf-8")).hexdigest(),
+            )
+            self.assertEqual(manifest["filings"][0], {"date": "2025-12-31", "period": "Q4", "filingDate": "2026-02-01"})
+
+            with patch("fmp_cache.rebuild_manifest") as rebuild:
+                self.assertEqual(latest_processed_quarter(ticker_dir), "q4")
+            rebuild.assert_not_called()
+
+    def test_incomplete_newest_date_is_not_processed(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ticker_dir = Path(tmpdir) / "XYZ"
+            self.write_legacy(ticker_dir, endpoints=ENDPOINTS[:3])
+
+            self.assertEqual(latest_processed_quarter(ticker_dir), "q3")
+
+            manifest = write_statement(
+                ticker_dir, "enterprise-values_q4", [statement("enterprise-values", "2025-12-31", "Q4")]
+            )
+
+            self.assertEqual(manifest["latestPeriod"], "Q4")
+            self.assertEqual(load_manifest(ticker_dir)["latestDate"], "2025-12-31")
+            self.assertEqual(latest_processed_quarter(ticker_dir), "q4")
+            self.assertEqual(load_statements(ticker_dir)["enterprise-values_q4"][0]["date"], "2025-12-31")
+            self.assertEqual(list(ticker_dir.glob("*.tmp")), [])
+
+    def test_earnings_report_reads_legacy_and_consolidated_layouts_alike(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ticker_dir = Path(tmpdir) / "XYZ"
+            self.write_legacy(ticker_dir)
+
+            legacy = generate_earning_report.load_and_normalize_data(ticker_dir)
+            consolidated = generate_earning_report.load_and_normalize_data(ticker_dir)
+
+        self.assertEqual(legacy, consolidated)
+        self.assertEqual(sorted(row["date"] for row in consolidated["income-statement"]), ["2025-09-30", "2025-12-31"])
+
+    def test_pipeline_reads_quarter_from_manifest(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.write_legacy(Path(tmpdir) / "XYZ")
+            with patch.object(generate_valuation, "CACHE_BASE_DIR", tmpdir):
+                self.assertEqual(generate_valuation.get_latest_processed_quarter("xyz"), "q4")
+                self.assertIsNone(generate_valuation.get_latest_processed_quarter("MISSING"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import copy
 import json
 import tempfile
+import threading
 import unittest
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -23,6 +24,12 @@ FACTS = json.loads((FIXTURES / "sec_foreign_tsm_companyfacts.json").read_text(en
 SUBMISSIONS = json.loads((FIXTURES / "sec_foreign_submissions_20f.json").read_text(encoding="utf-8"))
 
 
+def by_url(url):
+    # Submissions and facts are requested concurrently, so answer by URL
+    # rather than by call order.
+    return copy.deepcopy(SUBMISSIONS if "/submissions/" in url else FACTS)
+
+
 class ForeignIssuerNormalizationTests(unittest.TestCase):
     def test_ifrs_fixture_normalizes_quarters_and_currency(self):
         rows = normalize_foreign_company_facts(
@@ -67,7 +74,7 @@ class ForeignIssuerSourceTests(unittest.TestCase):
                 cache_dir=root,
                 user_agent="FixtureTests/1.0 contact@test.invalid",
             )
-            with patch.object(source, "_request_json", side_effect=[SUBMISSIONS, FACTS]):
+            with patch.object(source, "_request_json", side_effect=by_url):
                 rows = source.fetch("TSM")
             self.assertEqual(len(rows), 4)
             self.assertTrue((root / "submissions_0001046179.json").exists())
@@ -85,6 +92,68 @@ class ForeignIssuerSourceTests(unittest.TestCase):
             self.assertEqual(context.exception.code, "UNAVAILABLE")
             self.assertIn("20-F", context.exception.reason)
 
+    def test_ruled_out_issuer_neither_waits_for_nor_caches_facts(self):
+        no_20f = json.loads((FIXTURES / "sec_foreign_submissions_no_20f.json").read_text(encoding="utf-8"))
+        release = threading.Event()
+        answered = threading.Event()
+
+        def slow_facts(url):
+            if "/submissions/" in url:
+                return copy.deepcopy(no_20f)
+            release.wait(5)
+            answered.set()
+            return copy.deepcopy(FACTS)
+
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            source = ForeignIssuerCoverageSource(cache_dir=root, user_agent="FixtureTests/1.0")
+            with patch.object(source, "_request_json", side_effect=slow_facts):
+                with self.assertRaises(ForeignIssuerUnavailable):
+                    source.fetch("TSM")
+                self.assertFalse(answered.is_set())
+                release.set()
+                for thread in threading.enumerate():
+                    if thread.name.startswith("ThreadPoolExecutor"):
+                        thread.join(5)
+            self.assertFalse((root / "companyfacts_0001046179.json").exists())
+
+    def test_prefetch_warms_configured_issuers_and_reports_failures(self):
+        def flaky(url):
+            if "0000313838" in url:
+                raise ForeignIssuerUnavailable("SEC request failed: HTTP 503", symbol="SONY")
+            return by_url(url)
+
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            source = ForeignIssuerCoverageSource(cache_dir=root, user_agent="FixtureTests/1.0")
+            with patch.object(source, "_request_json", side_effect=flaky) as request:
+                failures = source.prefetch(["tsm", "SONY", "AAPL"], max_workers=3)
+            # SONY's failed submissions request is not followed by its facts.
+            self.assertEqual(request.call_count, 3)
+            self.assertEqual(failures, {"SONY": "SEC request failed: HTTP 503"})
+
+            with patch.object(source, "_request_json") as request:
+                rows = source.fetch("TSM")
+            request.assert_not_called()
+            self.assertEqual(len(rows), 4)
+
+
+    def test_prefetch_does_not_cache_facts_for_an_issuer_without_a_20f(self):
+        no_20f = json.loads((FIXTURES / "sec_foreign_submissions_no_20f.json").read_text(encoding="utf-8"))
+
+        def by_kind(url):
+            return copy.deepcopy(no_20f) if "/submissions/" in url else by_url(url)
+
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            source = ForeignIssuerCoverageSource(cache_dir=root, user_agent="FixtureTests/1.0")
+            with patch.object(source, "_request_json", side_effect=by_kind) as request:
+                failures = source.prefetch(["TSM"])
+
+            request.assert_called_once()
+            self.assertEqual(failures, {"TSM": "SEC submissions contain no 20-F/20-F/A filing"})
+            self.assertFalse((root / "companyfacts_0001046179.json").exists())
+
 
 class ForeignIssuerRouterTests(unittest.TestCase):
     def test_known_foreign_issuer_never_enters_fmp(self):
@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+import generate_valuation
+from fx_rates import FXRateError, FXRateStore
+
+
+RATES = """date,currency,units_per_usd
+2024-01-01,JPY,140
+2024-06-28,JPY,160
+2024-03-29,EUR,0.9
+"""
+
+
+class FXRateStoreTests(unittest.TestCase):
+    def store(self, tmpdir, text=RATES):
+        path = Path(tmpdir) / "fx_rates.csv"
+        path.write_text(text, encoding="utf-8")
+        return FXRateStore(path)
+
+    def test_each_quarter_uses_rate_in_force_at_period_end(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rates = self.store(tmpdir).units_per_usd(
+                ["JPY", "USD", "EUR", "JPY"],
+                ["2024-06-30", "2024-06-30", "2024-03-31", "2024-03-31"],
+            )
+
+        self.assertEqual(rates.tolist(), [160.0, 1.0, 0.9, 140.0])
+
+    def test_to_usd_divides_every_metric_in_one_frame(self):
+        frame = pd.DataFrame(
+            {"eps_adj": [280.0, 320.0], "sales_ps_adj": [1400.0, 1600.0], "numberOfShares": [5.0, 5.0]},
+            index=pd.to_datetime(["2024-03-31", "2024-06-30"]),
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            converted = self.store(tmpdir).to_usd(frame, ["eps_adj", "sales_ps_adj"], ["JPY", "JPY"])
+
+        self.assertEqual(converted["eps_adj"].tolist(), [2.0, 2.0])
+        self.assertEqual(converted["sales_ps_adj"].tolist(), [10.0, 10.0])
+        self.assertEqual(converted["numberOfShares"].tolist(), [5.0, 5.0])
+
+    def test_unknown_currency_and_uncovered_dates_fail_closed(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = self.store(tmpdir)
+            with self.assertRaisesRegex(FXRateError, "unsupported financial currency CNY"):
+                store.units_per_usd(["CNY"], ["2024-06-30"])
+            with self.assertRaisesRegex(FXRateError, "no EUR FX rate on or before 2023-12-31"):
+                store.units_per_usd(["EUR"], ["2023-12-31"])
+
+    def test_invalid_rate_file_is_rejected(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = self.store(tmpdir, "date,currency,units_per_usd\n2024-01-01,JPY,0\n")
+            with self.assertRaisesRegex(FXRateError, "non-positive"):
+                store.load()
+
+    def test_routed_rows_are_converted_with_dated_rates(self):
+        rows = [
+            {
+                "date": f"2024-{month:02d}-{day}",
+                "reportedCurrency": "JPY",
+                "revenue": 1600.0,
+                "netIncome": 320.0,
+                "freeCashFlow": 160.0,
+                "numberOfShares": 1.0,
+            }
+            for month, day in ((3, 31), (6, 30), (9, 30), (12, 31))
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(generate_valuation, "FX_RATE_STORE", self.store(tmpdir)):
+                eps, _, sales = generate_valuation._build_quarterly_ttm_from_rows(rows)
+
+        self.assertAlmostEqual(eps["eps_ttm"].iloc[-1], 320 / 140 + 3 * 320 / 160)
+        self.assertAlmostEqual(sales["sales_ps_ttm"].iloc[-1], 1600 / 140 + 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
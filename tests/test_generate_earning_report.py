@@ -0,0 +1,127 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+import generate_earning_report
+from fmp_cache import write_statement
+
+
+class EarningReportDigestTests(unittest.TestCase):
+    def run_report(self, root):
+        with patch.object(generate_earning_report, "DATA_DIR", root / "fmp_cache"):
+            with patch.object(generate_earning_report, "OUTPUT_DIR", root / "processed"):
+                with patch.object(generate_earning_report, "SOURCE_FINANCIAL_DIR", root / "source_financials"):
+                    with patch.object(
+                        generate_earning_report,
+                        "merge_statements",
+                        wraps=generate_earning_report.merge_statements,
+                    ) as merge:
+                        generate_earning_report.main()
+        return merge.call_count
+
+    def setup_tree(self, root):
+        for name in ("fmp_cache/XYZ", "processed", "source_financials"):
+            (root / name).mkdir(parents=True)
+        write_statement(root / "fmp_cache" / "XYZ", "income-statement_q4", [{"date": "2025-12-31", "revenue": 10}])
+        (root / "source_financials" / "ABC_combined.json").write_text(
+            json.dumps([{"date": "2025-12-31", "revenue": 5, "sourceType": "SEC_COMPANY_FACTS"}]), encoding="utf-8"
+        )
+
+    def test_unchanged_inputs_are_skipped_and_changed_inputs_rebuilt(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            self.setup_tree(root)
+
+            self.assertEqual(self.run_report(root), 1)
+            digests = json.loads((root / "processed" / ".digests.json").read_text(encoding="utf-8"))
+            routed_output = root / "processed" / "ABC_combined.json"
+            routed_output.write_text("sentinel", encoding="utf-8")
+
+            self.assertEqual(self.run_report(root), 0)
+            self.assertEqual(routed_output.read_text(encoding="utf-8"), "sentinel")
+
+            write_statement(root / "fmp_cache" / "XYZ", "income-statement_q4", [{"date": "2025-12-31", "revenue": 11}])
+            self.assertEqual(self.run_report(root), 1)
+
+        self.assertEqual(sorted(digests), ["ABC", "XYZ"])
+        self.assertTrue(digests["ABC"].startswith(generate_earning_report.REPORT_FORMAT_VERSION + ":routed:"))
+
+    def test_failed_ticker_drops_its_digest_but_keeps_the_others(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            self.setup_tree(root)
+            (root / "source_financials" / "BAD_combined.json").write_text("[]", encoding="utf-8")
+
+            with self.assertRaisesRegex(RuntimeError, "BAD: invalid routed financial artifact"):
+                self.run_report(root)
+            digests = json.loads((root / "processed" / ".digests.json").read_text(encoding="utf-8"))
+
+        self.assertEqual(sorted(digests), ["ABC", "XYZ"])
+
+
+class CombineStatementsTests(unittest.TestCase):
+    def test_statements_merge_by_date_with_precedence_instead_of_suffixes(self):
+        data_store = {
+            "income-statement": [
+                {"date": "2025-12-31", "symbol": "XYZ", "period": "Q4", "revenue": 12.0},
+                {"date": "2024-12-31", "symbol": "XYZ", "period": "Q4", "revenue": 10.0},
+            ],
+            "cash-flow-statement": [{"date": "2025-12-31", "symbol": "XYZ-CF", "operatingCashFlow": 3.0}],
+            "enterprise-values": [],
+            "balance-sheet-statement": [
+                {"date": "2025-09-30", "symbol": "XYZ", "period": "Q3", "totalAssets": 50.0},
+                {"date": "2025-09-30", "symbol": "XYZ", "period": "Q3", "totalAssets": 55.0},
+            ],
+        }
+
+        combined = generate_earning_report.combine_statements(data_store)
+
+        self.assertFalse([column for column in combined.columns if column.endswith(("_1", "_2", "_3"))])
+        self.assertEqual(combined["date"].tolist(), ["2025-12-31", "2025-09-30", "2024-12-31"])
+        newest = combined.iloc[0]
+        self.assertEqual((newest["symbol"], newest["operatingCashFlow"]), ("XYZ", 3.0))
+        self.assertEqual(combined.iloc[1]["totalAssets"], 55.0)
+        self.assertEqual(combined.iloc[1]["period"], "Q3")
+
+
+
+class GrowthMetricsTests(unittest.TestCase):
+    def frame(self, dates, revenue):
+        return pd.DataFrame({"date": pd.to_datetime(dates), "revenue": revenue})
+
+    def test_missing_quarter_does_not_shift_year_over_year_comparison(self):
+        # 2025-06-30 is missing; positional shift(4) would compare against 2024-06-30.
+        frame = self.frame(
+            ["2025-12-31", "2025-09-30", "2025-03-31", "2024-12-31", "2024-09-30", "2024-06-30"],
+            [120.0, 110.0, 100.0, 100.0, 100.0, 50.0],
+        )
+
+        result = generate_earning_report.calculate_growth_metrics(frame)
+
+        self.assertEqual(result["date"].dt.strftime("%Y-%m-%d").tolist()[0], "2025-12-31")
+        self.assertAlmostEqual(result["revenue_yoy"].iloc[0], 20.0)
+        self.assertAlmostEqual(result["revenue_yoy"].iloc[1], 10.0)
+        self.assertTrue(pd.isna(result["revenue_qoq"].iloc[1]))
+        self.assertAlmostEqual(result["revenue_qoq"].iloc[2], 0.0)
+
+    def test_universe_growth_is_scattered_back_per_ticker(self):
+        frames = {
+            # A 16-week fiscal quarter still finds its prior quarter.
+            "COST": self.frame(["2025-08-31", "2025-05-11"], [136.0, 100.0]),
+            "XYZ": self.frame(["2025-12-31", "2024-12-28"], [11.0, 10.0]).assign(eps=[2.0, 1.0]),
+        }
+
+        result = generate_earning_report.calculate_growth_metrics_universe(frames)
+
+        self.assertAlmostEqual(result["COST"]["revenue_qoq"].iloc[0], 36.0)
+        self.assertNotIn("eps_yoy", result["COST"].columns)
+        self.assertAlmostEqual(result["XYZ"]["revenue_yoy"].iloc[0], 10.0)
+        self.assertAlmostEqual(result["XYZ"]["eps_yoy"].iloc[0], 100.0)
+        self.assertNotIn("_ticker", result["XYZ"].columns)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import json
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import patch
@@ -7,6 +9,7 @@ from unittest.mock import patch
 import pandas as pd
 
 import generate_valuation
+from financial_source_router import FMPCircuitBreaker, FMPCircuitOpenError, FMPRateLimitError
 from ticker_universe import yahoo_symbol
 
 
@@ -23,6 +26,13 @@ class GenerateValuationBehaviorTests(unittest.TestCase):
             }]), encoding="utf-8")
             self.assertTrue(generate_valuation._has_routed_financial_artifact(path))
 
+    def test_shard_argument_is_parsed_and_validated(self):
+        self.assertEqual(generate_valuation.parse_args(["--shard", "2/4"]).shard, (2, 4))
+        self.assertIsNone(generate_valuation.parse_args([]).shard)
+        with patch("sys.stderr"):
+            with self.assertRaises(SystemExit):
+                generate_valuation.parse_args(["--shard", "5/4"])
+
     def test_legacy_sq_uses_current_yahoo_symbol_without_changing_cache_key(self):
         self.assertEqual(yahoo_symbol("SQ"), "XYZ")
         self.assertEqual(yahoo_symbol("XYZ"), "XYZ")
@@ -121,6 +131,71 @@ class GenerateValuationBehaviorTests(unittest.TestCase):
                                     with self.assertRaisesRegex(RuntimeError, "refusing stale financial release"):
                                         generate_valuation.get_fmp_fragmented("income-statement", "XYZ")
 
+    def test_fmp_financials_fetch_endpoint_quarters_concurrently_within_limit(self):
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0, "calls": 0}
+
+        quarter_ends = {"q1": "2026-03-31", "q2": "2025-06-30", "q3": "2025-09-30", "q4": "2025-12-31"}
+
+        class Response:
+            def __init__(self, url):
+                self.day = quarter_ends[url.split("period=")[1][:2]]
+
+            def raise_for_status(self):
+                return None
+
+            def json(self):
+                return [{"date": self.day, "revenue": 10.0, "netIncome": 1.0}]
+
+        def fake_get(url, timeout=None):
+            with lock:
+                state["calls"] += 1
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            time.sleep(0.02)
+            with lock:
+                state["in_flight"] -= 1
+            return Response(url)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(generate_valuation, "CACHE_BASE_DIR", str(Path(tmpdir))):
+                with patch.object(generate_valuation, "FMP_API_KEY", "KEY"):
+                    with patch.object(generate_valuation.requests, "get", side_effect=fake_get):
+                        rows = generate_valuation.fetch_fmp_financials("XYZ")
+
+        self.assertEqual(state["calls"], 16)
+        self.assertGreater(state["peak"], 1)
+        self.assertLessEqual(state["peak"], generate_valuation.FMP_MAX_CONCURRENT_REQUESTS)
+        self.assertEqual([row["date"] for row in rows], ["2026-03-31", "2025-12-31", "2025-09-30", "2025-06-30"])
+        # Downloaded rows carry the schedule but are not reported as deferred.
+        self.assertNotIn("sourceRefreshPlan", rows[0])
+        self.assertIn("sourceRefreshSchedule", rows[0])
+
+    def test_first_fmp_rate_limit_trips_shared_breaker_and_cancels_outstanding_requests(self):
+        calls = []
+
+        class RateLimitedResponse:
+            status_code = 429
+
+            def raise_for_status(self):
+                raise generate_valuation.requests.exceptions.HTTPError("429", response=self)
+
+        def fake_get(url, timeout=None):
+            calls.append(url)
+            time.sleep(0.01)
+            return RateLimitedResponse()
+
+        breaker = FMPCircuitBreaker(cooldown_seconds=300, clock=lambda: 10.0)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(generate_valuation, "CACHE_BASE_DIR", str(Path(tmpdir))):
+                with patch.object(generate_valuation, "FMP_API_KEY", "KEY"):
+                    with patch.object(generate_valuation.requests, "get", side_effect=fake_get):
+                        with self.assertRaises((FMPRateLimitError, FMPCircuitOpenError)):
+                            generate_valuation.fetch_fmp_financials("XYZ", circuit_breaker=breaker)
+
+        self.assertTrue(breaker.is_open)
+        self.assertLessEqual(len(calls), generate_valuation.FMP_MAX_CONCURRENT_REQUESTS)
+
     def test_price_history_retries_then_returns_data(self):
         prices = pd.DataFrame({"Close": [10.0], "Adj Close": [9.5]})
 
@@ -0,0 +1,162 @@
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+import generate_valuation
+import pipeline_runner
+from financial_source_router import FinancialSourceResult
+from pipeline_runner import CheckpointStore, input_digest
+
+
+def at(stamp):
+    return lambda: stamp
+
+
+class CheckpointStoreTests(unittest.TestCase):
+    def test_stage_resumes_only_with_same_inputs_intact_artifacts_and_run(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            artifact = root / "AAPL_combined.json"
+            artifact.write_text("[1]", encoding="utf-8")
+            store = CheckpointStore(root / "pipeline.json", run_id="2026-10-19")
+            store.record("aapl", "financials", "inputs-1", [artifact], metadata={"sourceType": "SEC"})
+
+            resumed = CheckpointStore(root / "pipeline.json", run_id="2026-10-19")
+            self.assertTrue(resumed.is_complete("AAPL", "financials", "inputs-1"))
+            self.assertFalse(resumed.is_complete("AAPL", "financials", "inputs-2"))
+            self.assertFalse(resumed.is_complete("AAPL", "prices", "inputs-1"))
+            self.assertEqual(resumed.metadata("AAPL", "financials"), {"sourceType": "SEC"})
+            self.assertFalse(CheckpointStore(root / "pipeline.json", run_id="2026-10-20").is_complete("AAPL", "financials", "inputs-1"))
+
+            artifact.write_text("[2]", encoding="utf-8")
+            self.assertFalse(resumed.is_complete("AAPL", "financials", "inputs-1"))
+            with self.assertRaises(FileNotFoundError):
+                store.record("AAPL", "prices", "inputs", [root / "missing.json"])
+
+    def test_default_run_id_is_the_utc_date(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = CheckpointStore(Path(tmpdir) / "pipeline.json", clock=at(datetime(2026, 10, 18, 23, 59, tzinfo=timezone.utc).timestamp()))
+        self.assertEqual(store.run_id, "2026-10-18")
+        self.assertNotEqual(input_digest(store.run_id, "AAPL"), input_digest("2026-10-19", "AAPL"))
+
+
+class ExportCheckpointTests(unittest.TestCase):
+    def test_export_reruns_when_a_valuation_summary_changes(self):
+        import export_watcher_data
+        import generate_earning_report
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            resolved = root / "symbols.json"
+            resolved.write_text('{"symbols": ["AAPL"]}', encoding="utf-8")
+            summary = root / "results" / "AAPL" / "valuation_summary.json"
+            summary.parent.mkdir(parents=True)
+            summary.write_text('{"data": [1]}', encoding="utf-8")
+            (root / "processed").mkdir()
+            (root / "processed" / "AAPL_combined.json").write_text("[]", encoding="utf-8")
+
+            def export(argv):
+                (root / "exports").mkdir(exist_ok=True)
+                (root / "exports" / "manifest.json").write_text("{}", encoding="utf-8")
+
+            argv = ["--run-id", "2026-10-19", "--checkpoints", str(root / "pipeline.json"), "--resolved-symbols", str(resolved)]
+            with patch.object(generate_valuation, "main"), \
+                    patch.object(generate_earning_report, "main"), \
+                    patch.object(generate_earning_report, "OUTPUT_DIR", root / "processed"), \
+                    patch.object(export_watcher_data, "DEFAULT_RESULTS_DIR", root / "results"), \
+                    patch.object(export_watcher_data, "DEFAULT_OUTPUT_DIR", root / "exports"), \
+                    patch.object(export_watcher_data, "main", side_effect=export) as export_main:
+                pipeline_runner.run(argv)
+                pipeline_runner.run(argv)
+                self.assertEqual(export_main.call_count, 1)
+                summary.write_text('{"data": [2]}', encoding="utf-8")
+                pipeline_runner.run(argv)
+
+        self.assertEqual(export_main.call_count, 2)
+
+
+class ValuationCheckpointTests(unittest.TestCase):
+    def test_prices_and_routed_financials_resume_without_network(self):
+        prices = pd.DataFrame(
+            {"Close": [10.5, 11.25], "Adj Close": [10.0, 11.0]},
+            index=pd.to_datetime(["2026-10-15", "2026-10-16"]).tz_localize("America/New_York"),
+        )
+        rows = ({"date": "2026-06-30", "revenue": 1.0},)
+        result = FinancialSourceResult("AAPL", rows, "SEC Company Facts", "SEC_COMPANY_FACTS", None, "2026-10-19T00:00:00Z", "2026-06-30", "2026-07-30")
+        router = MagicMock()
+        router.route.return_value = result
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            store = CheckpointStore(root / "pipeline.json", run_id="2026-10-19")
+            source_file = str(root / "source" / "AAPL_combined.json")
+            with patch.object(generate_valuation, "PRICE_CHECKPOINT_DIR", root / "prices"), \
+                    patch.object(generate_valuation, "SOURCE_FINANCIAL_DIR", str(root / "source")), \
+                    patch.object(generate_valuation, "FINANCIAL_SOURCE_ROUTER", router), \
+                    patch.object(generate_valuation, "_build_quarterly_ttm_from_rows", side_effect=lambda rows: (len(rows), 2, 3)), \
+                    patch.object(generate_valuation, "fetch_price_history", return_value=prices) as fetch:
+                first_prices = generate_valuation._price_frame("AAPL", store)
+                first = generate_valuation._routed_financials("AAPL", source_file, store)
+                resumed_prices = generate_valuation._price_frame("AAPL", store)
+                resumed = generate_valuation._routed_financials("AAPL", source_file, store)
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(router.route.call_count, 1)
+        pd.testing.assert_frame_equal(resumed_prices, first_prices, check_names=False, check_freq=False)
+        self.assertEqual(resumed, first)
+        self.assertEqual(resumed[3]["sourceType"], "SEC_COMPANY_FACTS")
+
+    def test_missing_prices_abort_before_any_symbol_is_routed(self):
+        router = MagicMock()
+        router.foreign_source = None
+        with tempfile.TemporaryDirectory() as tmpdir:
+            args = generate_valuation.parse_args(["--symbols", "AAPL,MSFT"])
+            with patch.object(generate_valuation, "OUTPUT_DIR", tmpdir), \
+                    patch.object(generate_valuation, "RUN_COSTS_PATH", str(Path(tmpdir) / "run_costs.json")), \
+                    patch.object(generate_valuation, "create_financial_source_router", return_value=router), \
+                    patch.object(generate_valuation, "_valuation_is_fresh", return_value=False), \
+                    patch.object(generate_valuation, "fetch_price_history", return_value=pd.DataFrame()):
+                with self.assertRaisesRegex(RuntimeError, "no Yahoo price data"):
+                    generate_valuation._run_pipeline(args, None)
+
+        router.route_many.assert_not_called()
+        router.route.assert_not_called()
+
+    def test_prices_are_fetched_and_routed_one_batch_at_a_time(self):
+        events = []
+        router = MagicMock()
+        router.foreign_source = None
+        router.sec_source = None
+        router.route_many.side_effect = lambda symbols, **kwargs: events.append(("route", list(symbols)))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            args = generate_valuation.parse_args(["--symbols", "AAPL,MSFT,NVDA"])
+            with patch.object(generate_valuation, "OUTPUT_DIR", tmpdir), \
+                    patch.object(generate_valuation, "RUN_COSTS_PATH", str(Path(tmpdir) / "run_costs.json")), \
+                    patch.object(generate_valuation, "PRICE_BATCH_SIZE", 2), \
+                    patch.object(generate_valuation, "create_financial_source_router", return_value=router), \
+                    patch.object(generate_valuation, "_valuation_is_fresh", return_value=False), \
+                    patch.object(generate_valuation, "_price_frame", side_effect=lambda ticker, _: events.append(("prices", ticker)) or ticker), \
+                    patch.object(generate_valuation, "_build_valuation", side_effect=lambda ticker, prices, _: events.append(("build", prices))):
+                generate_valuation._run_pipeline(args, None)
+
+        self.assertEqual(events, [
+            ("prices", "AAPL"), ("prices", "MSFT"), ("route", ["AAPL", "MSFT"]), ("build", "AAPL"), ("build", "MSFT"),
+            ("prices", "NVDA"), ("route", ["NVDA"]), ("build", "NVDA"),
+        ])
+
+    def test_direct_runs_do_not_write_checkpoints(self):
+        prices = pd.DataFrame({"Close": [1.0], "Adj Close": [1.0]}, index=pd.to_datetime(["2026-10-16"]))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(generate_valuation, "PRICE_CHECKPOINT_DIR", Path(tmpdir) / "prices"):
+                with patch.object(generate_valuation, "fetch_price_history", return_value=prices):
+                    generate_valuation._price_frame("AAPL", None)
+            self.assertFalse((Path(tmpdir) / "prices").exists())
+        self.assertIsNone(generate_valuation.CHECKPOINTS)
+        self.assertEqual(pipeline_runner.TICKER_STAGES, ("prices", "financials"))
+
+
+if __name__ == "__main__":
+    unittest.main()
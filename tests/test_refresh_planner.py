@@ -0,0 +1,166 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import generate_valuation
+from financial_source_router import FinancialSourceRouter
+from refresh_planner import RefreshPlanner
+from sec_company_facts import SECCompanyFactsSource
+from source_telemetry import SourceTelemetry
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "sec_aapl_companyfacts.json"
+
+QUARTERLY_FILINGS = [
+    {"date": "2025-03-29", "filingDate": "2025-05-02"},
+    {"date": "2025-06-28", "filingDate": "2025-08-01"},
+    {"date": "2025-09-27", "filingDate": "2025-10-31"},
+    {"date": "2025-12-27", "filingDate": "2026-01-30"},
+    # An amendment re-files an old period and must not move the cadence.
+    {"date": "2025-06-28", "filingDate": "2025-12-15"},
+]
+
+
+def at(day):
+    return lambda: datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp()
+
+
+class RefreshPlannerTests(unittest.TestCase):
+    def test_window_is_projected_from_period_spacing_and_filing_lag(self):
+        plan = RefreshPlanner(clock=at("2026-03-01")).plan(QUARTERLY_FILINGS)
+
+        self.assertFalse(plan.due)
+        self.assertEqual(plan.latest_period_end, "2025-12-27")
+        self.assertEqual(plan.expected_period_end, "2026-03-28")
+        self.assertEqual((plan.window_start, plan.window_end), ("2026-04-24", "2026-05-08"))
+        self.assertEqual(plan.as_metadata()["expectedFilingWindow"]["start"], "2026-04-24")
+
+    def test_refresh_is_due_inside_and_after_the_window(self):
+        inside = RefreshPlanner(clock=at("2026-05-01")).plan(QUARTERLY_FILINGS)
+        after = RefreshPlanner(clock=at("2026-05-20")).plan(QUARTERLY_FILINGS)
+        overdue = RefreshPlanner(clock=at("2026-05-20"), max_deferral_days=30).plan(QUARTERLY_FILINGS)
+
+        self.assertEqual((inside.due, inside.reason), (True, "inside expected filing window"))
+        self.assertEqual((after.due, after.reason), (True, "expected filing window has passed"))
+        self.assertEqual(overdue.reason, "newest filing is older than 30 days")
+
+    def test_thin_or_undated_history_always_refreshes(self):
+        plan = RefreshPlanner(clock=at("2026-03-01")).plan(
+            QUARTERLY_FILINGS[:2] + [{"date": "2025-09-27"}, {"date": "bad", "filingDate": "2025-10-31"}]
+        )
+
+        self.assertTrue(plan.due)
+        self.assertIsNone(plan.as_metadata()["expectedFilingWindow"])
+
+
+class RefreshPlannerIntegrationTests(unittest.TestCase):
+    def test_sec_source_serves_expired_cache_before_the_filing_window(self):
+        facts = json.loads(FIXTURE.read_text(encoding="utf-8"))
+        clock = at("2025-03-01")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            ticker_cache = root / "company_tickers.json"
+            ticker_cache.write_text(json.dumps({"0": {"cik_str": 320193, "ticker": "AAPL"}}), encoding="utf-8")
+            os.utime(ticker_cache, (clock(), clock()))
+            facts_cache = root / "companyfacts_0000320193.json"
+            facts_cache.write_text(json.dumps(facts), encoding="utf-8")
+            stale = clock() - 10 * 86400
+            os.utime(facts_cache, (stale, stale))
+            source = SECCompanyFactsSource(
+                cache_dir=root,
+                user_agent="FixtureTests/1.0",
+                clock=clock,
+                cache_ttl_seconds=86400,
+                refresh_planner=RefreshPlanner(clock=clock),
+            )
+
+            with patch("sec_company_facts.requests.get") as request:
+                rows = source.fetch("AAPL")
+
+        request.assert_not_called()
+        self.assertEqual(len(rows), 4)
+        self.assertFalse(rows[0]["sourceRefreshPlan"]["refreshDue"])
+        self.assertEqual(rows[0]["sourceRefreshPlan"]["expectedFilingWindow"]["start"], "2025-04-26")
+
+    def test_deferred_route_reports_the_cache_download_and_one_cache_outcome(self):
+        facts = json.loads(FIXTURE.read_text(encoding="utf-8"))
+        clock = at("2025-03-01")
+        telemetry = SourceTelemetry(clock=clock)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            facts_cache = root / "companyfacts_0000320193.json"
+            facts_cache.write_text(json.dumps(facts), encoding="utf-8")
+            stale = clock() - 10 * 86400
+            os.utime(facts_cache, (stale, stale))
+            source = SECCompanyFactsSource(
+                cache_dir=root,
+                user_agent="FixtureTests/1.0",
+                clock=clock,
+                cache_ttl_seconds=86400,
+                refresh_planner=RefreshPlanner(clock=clock),
+                telemetry=telemetry,
+            )
+            router = FinancialSourceRouter(
+                sec_fetcher=lambda symbol: source.fetch(symbol, cik="320193"), clock=clock
+            )
+
+            with patch("sec_company_facts.requests.get") as request:
+                result = router.route("AAPL")
+
+        request.assert_not_called()
+        self.assertEqual(result.status, "deferred")
+        self.assertEqual(result.fetched_at, "2025-02-19T00:00:00Z")
+        self.assertEqual(result.metadata["freshness"]["status"], "deferred")
+        self.assertEqual(result.rows[0]["sourceFreshness"]["status"], "deferred")
+        self.assertEqual(result.rows[0]["sourceFetchedAt"], "2025-02-19T00:00:00Z")
+        cache = telemetry.snapshot()["run"]["sec"]["cache"]
+        self.assertEqual(cache.get("deferred"), 1)
+        self.assertFalse(cache.get("expired"))
+
+    def test_fmp_target_quarter_is_not_fetched_before_the_filing_window(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = Path(tmpdir) / "XYZ"
+            cache_dir.mkdir(parents=True)
+            for quarter, filing in zip(("q1", "q2", "q3", "q4"), QUARTERLY_FILINGS):
+                (cache_dir / f"income-statement_{quarter}.json").write_text(
+                    json.dumps([{**filing, "period": quarter.upper(), "value": 1}]), encoding="utf-8"
+                )
+            with patch.object(generate_valuation, "CACHE_BASE_DIR", str(Path(tmpdir))):
+                with patch.object(generate_valuation, "REFRESH_PLANNER", RefreshPlanner(clock=at("2026-03-01"))):
+                    with patch.object(generate_valuation, "FMP_API_KEY", "KEY"):
+                        with patch.object(generate_valuation, "get_latest_processed_quarter", return_value="q4"):
+                            with patch.object(generate_valuation.requests, "get") as request:
+                                rows = generate_valuation.get_fmp_fragmented("income-statement", "XYZ")
+
+        request.assert_not_called()
+        self.assertEqual(len(rows), 4)
+
+    def test_fmp_financials_served_from_cache_are_marked_deferred(self):
+        endpoints = ("income-statement", "cash-flow-statement", "enterprise-values", "balance-sheet-statement")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = Path(tmpdir) / "XYZ"
+            cache_dir.mkdir(parents=True)
+            for endpoint in endpoints:
+                for quarter, filing in zip(("q1", "q2", "q3", "q4"), QUARTERLY_FILINGS):
+                    (cache_dir / f"{endpoint}_{quarter}.json").write_text(
+                        json.dumps([{**filing, "period": quarter.upper(), "value": 1}]), encoding="utf-8"
+                    )
+            with patch.object(generate_valuation, "CACHE_BASE_DIR", str(Path(tmpdir))):
+                with patch.object(generate_valuation, "REFRESH_PLANNER", RefreshPlanner(clock=at("2026-03-01"))):
+                    with patch.object(generate_valuation, "FMP_API_KEY", "KEY"):
+                        with patch.object(generate_valuation, "get_latest_processed_quarter", return_value="q4"):
+                            with patch.object(generate_valuation.requests, "get") as request:
+                                rows = generate_valuation.fetch_fmp_financials("XYZ")
+
+        request.assert_not_called()
+        self.assertFalse(rows[0]["sourceRefreshPlan"]["refreshDue"])
+        self.assertEqual(rows[0]["sourceRefreshPlan"], rows[0]["sourceRefreshSchedule"])
+        self.assertTrue(rows[0]["sourceCachedAt"].endswith("Z"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import generate_valuation
+import storage
+from run_status import StatusIndex
+
+PROVENANCE = {
+    "source": "SEC Company Facts",
+    "sourceType": "SEC_COMPANY_FACTS",
+    "sourceFetchedAt": "2026-10-19T00:00:00Z",
+    "sourceDataAsOf": "2026-06-30",
+}
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class StatusIndexTests(unittest.TestCase):
+    def test_freshness_comes_from_the_index_and_artifact_stats(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            summary = root / "results" / "AAPL" / "valuation_summary.json"
+            summary.parent.mkdir(parents=True)
+            summary.write_text('{"data": []}', encoding="utf-8")
+            clock = Clock(1_000_000.0)
+            index = StatusIndex(root / "results" / "status_index.json", base_dir=root, clock=clock)
+
+            self.assertIsNone(index.is_fresh("AAPL"))
+            index.record("aapl", {"summary": summary}, inputs={"financials": "abc"})
+            body = json.loads((root / "results" / "status_index.json").read_text(encoding="utf-8"))
+            self.assertEqual(body["tickers"]["AAPL"]["artifacts"]["summary"]["path"], "results/AAPL/valuation_summary.json")
+            self.assertEqual(body["tickers"]["AAPL"]["inputs"], {"financials": "abc"})
+
+            reopened = StatusIndex(root / "results" / "status_index.json", base_dir=root, clock=clock)
+            self.assertTrue(reopened.is_fresh("AAPL"))
+            clock.now += 24 * 60 * 60
+            self.assertFalse(reopened.is_fresh("AAPL"))
+
+    def test_checkout_mtime_is_restamped_but_changed_content_is_not_fresh(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            summary = root / "valuation_summary.json"
+            summary.write_text('{"data": [1]}', encoding="utf-8")
+            index = StatusIndex(root / "status_index.json", base_dir=root, clock=Clock(1_000_000.0))
+            index.record("AAPL", {"summary": summary})
+
+            os.utime(summary, ns=(1, 1))
+            self.assertTrue(index.is_fresh("AAPL"))
+            self.assertEqual(index.entry("AAPL")["artifacts"]["summary"]["mtimeNs"], 1)
+
+            summary.write_text('{"data": [2]}', encoding="utf-8")
+            self.assertFalse(index.is_fresh("AAPL"))
+            summary.unlink()
+            self.assertFalse(index.is_fresh("AAPL"))
+
+    def test_concurrent_indexes_keep_each_others_newer_entries(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            summary = root / "valuation_summary.json"
+            summary.write_text('{"data": []}', encoding="utf-8")
+            path = root / "status_index.json"
+            clock = Clock(1_000_000.0)
+            StatusIndex(path, base_dir=root, clock=clock).record("AAPL", {"summary": summary}, inputs={"run": "old"})
+            first = StatusIndex(path, base_dir=root, clock=clock)
+            second = StatusIndex(path, base_dir=root, clock=clock)
+            self.assertEqual(first.entry("AAPL")["inputs"], {"run": "old"})
+            self.assertEqual(second.entry("AAPL")["inputs"], {"run": "old"})
+
+            first.record("AAPL", {"summary": summary}, inputs={"run": "new"})
+            second.record("MSFT", {"summary": summary})
+            first.record("NVDA", {"summary": summary})
+
+            tickers = json.loads(path.read_text(encoding="utf-8"))["tickers"]
+            self.assertEqual(sorted(tickers), ["AAPL", "MSFT", "NVDA"])
+            self.assertEqual(tickers["AAPL"]["inputs"], {"run": "new"})
+
+    @unittest.skipIf(storage.fcntl is None, "the side-file lock needs fcntl")
+    def test_simultaneous_shard_records_keep_every_entry(self):
+        read = StatusIndex._read
+
+        def slow_read(index):
+            # Widen the read-merge-replace window so unlocked writers overlap.
+            tickers = read(index)
+            time.sleep(0.01)
+            return tickers
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            summary = root / "valuation_summary.json"
+            summary.write_text('{"data": []}', encoding="utf-8")
+            path = root / "status_index.json"
+            shards = [StatusIndex(path, base_dir=root, clock=Clock(1_000_000.0)) for _ in range(6)]
+            for shard in shards:
+                shard.entry("AAPL")  # every shard loads the index before any writes
+            with patch.object(StatusIndex, "_read", slow_read):
+                threads = [
+                    threading.Thread(target=shard.record, args=("S" + str(index), {"summary": summary}))
+                    for index, shard in enumerate(shards)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            tickers = json.loads(path.read_text(encoding="utf-8"))["tickers"]
+
+        self.assertEqual(sorted(tickers), ["S" + str(index) for index in range(6)])
+
+    def test_valuation_freshness_backfills_unknown_tickers_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            summary = root / "results" / "AAPL" / "valuation_summary.json"
+            summary.parent.mkdir(parents=True)
+            stamp = generate_valuation.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            summary.write_text(json.dumps({"last_updated": stamp, "data": []}), encoding="utf-8")
+            (root / "source").mkdir()
+            (root / "source" / "AAPL_combined.json").write_text(json.dumps([PROVENANCE]), encoding="utf-8")
+            index = StatusIndex(root / "results" / "status_index.json", base_dir=root)
+
+            with patch.object(generate_valuation, "OUTPUT_DIR", str(root)), \
+                    patch.object(generate_valuation, "SOURCE_FINANCIAL_DIR", str(root / "source")), \
+                    patch.object(generate_valuation, "STATUS_INDEX", index):
+                self.assertTrue(generate_valuation._valuation_is_fresh("AAPL"))
+                with patch.object(generate_valuation, "_has_routed_financial_artifact") as full_check:
+                    self.assertTrue(generate_valuation._valuation_is_fresh("AAPL"))
+                self.assertFalse(generate_valuation._valuation_is_fresh("MSFT"))
+
+        full_check.assert_not_called()
+        self.assertEqual(sorted(index.entry("AAPL")["artifacts"]), ["financials", "summary"])
+        self.assertIsNone(index.entry("MSFT"))
+
+
+if __name__ == "__main__":
+    unittest.main()
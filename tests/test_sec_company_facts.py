@@ -1,15 +1,19 @@
 import copy
 import json
 import tempfile
+import threading
 import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from unittest.mock import patch
 
 from sec_company_facts import (
     SECCompanyFactsSource,
+    SECFramesSource,
     SECInvalidPayloadError,
     SECRateLimitError,
+    SECRequestError,
     normalize_company_facts,
 )
 
@@ -184,6 +188,161 @@ class SECCompanyFactsSourceTests(unittest.TestCase):
                 with self.assertRaises(SECInvalidPayloadError):
                     source.fetch("AAPL")
 
+    def write_expired_facts_cache(self, root, accession="0004"):
+        facts_cache = root / "companyfacts_0000320193.json"
+        facts_cache.write_text(json.dumps(self.payload), encoding="utf-8")
+        (root / "companyfacts_0000320193.state.json").write_text(
+            json.dumps({"accessionNumber": accession}), encoding="utf-8"
+        )
+        stale = time.time() - 3600
+        import os
+        os.utime(facts_cache, (stale, stale))
+        return facts_cache
+
+    @staticmethod
+    def submissions(latest_accession):
+        return {
+            "filings": {
+                "recent": {
+                    "form": ["8-K", "10-K", "10-Q"],
+                    "accessionNumber": ["0009", latest_accession, "0003"],
+                    "filingDate": ["2025-03-01", "2025-02-01", "2024-11-01"],
+                }
+            }
+        }
+
+    def test_expired_facts_cache_is_reused_when_submissions_show_no_new_filing(self):
+        calls = []
+
+        def fake_get(url, headers, timeout):
+            calls.append(url)
+            if "submissions" in url:
+                return FakeResponse(self.submissions("0004"))
+            raise AssertionError("Company Facts must not be downloaded: " + url)
+
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            facts_cache = self.write_expired_facts_cache(root)
+            source = SECCompanyFactsSource(cache_dir=root, user_agent="FixtureTests/1.0", cache_ttl_seconds=60)
+            with patch("sec_company_facts.requests.get", side_effect=fake_get):
+                rows = source.fetch("AAPL", cik="320193")
+                again = source.fetch("AAPL", cik="320193")
+            refreshed_age = time.time() - facts_cache.stat().st_mtime
+
+        self.assertEqual(len(calls), 1)
+        self.assertIn("CIK0000320193", calls[0])
+        self.assertEqual(rows[0]["revenue"], 170)
+        self.assertEqual(again, rows)
+        self.assertLess(refreshed_age, 60)
+
+    def test_new_periodic_filing_triggers_company_facts_download(self):
+        calls = []
+
+        def fake_get(url, headers, timeout):
+            calls.append(url)
+            if "submissions" in url:
+                return FakeResponse(self.submissions("0005"))
+            return FakeResponse(self.payload)
+
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            self.write_expired_facts_cache(root, accession="0004")
+            source = SECCompanyFactsSource(cache_dir=root, user_agent="FixtureTests/1.0", cache_ttl_seconds=60)
+            with patch("sec_company_facts.requests.get", side_effect=fake_get):
+                source.fetch("AAPL", cik="320193")
+            state = json.loads((root / "companyfacts_0000320193.state.json").read_text(encoding="utf-8"))
+
+        self.assertEqual(len(calls), 2)
+        self.assertIn("companyfacts", calls[1])
+        # The downloaded facts do not include 0005 yet, so the next check
+        # downloads again instead of trusting the lagging payload.
+        self.assertEqual(state, {"accessionNumber": "0004"})
+
+    def test_first_download_records_the_payload_accession(self):
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            source = SECCompanyFactsSource(cache_dir=root, user_agent="FixtureTests/1.0", cache_ttl_seconds=60)
+            with patch("sec_company_facts.requests.get", return_value=FakeResponse(self.payload)) as request:
+                source.fetch("AAPL", cik="320193")
+            state = json.loads((root / "companyfacts_0000320193.state.json").read_text(encoding="utf-8"))
+
+        request.assert_called_once()
+        self.assertEqual(state, {"accessionNumber": "0004"})
+
+    def test_state_that_does_not_match_the_cached_payload_is_not_trusted(self):
+        calls = []
+
+        def fake_get(url, headers, timeout):
+            calls.append(url)
+            if "submissions" in url:
+                return FakeResponse(self.submissions("0005"))
+            return FakeResponse(self.payload)
+
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            self.write_expired_facts_cache(root, accession="0005")
+            source = SECCompanyFactsSource(cache_dir=root, user_agent="FixtureTests/1.0", cache_ttl_seconds=60)
+            with patch("sec_company_facts.requests.get", side_effect=fake_get):
+                source.fetch("AAPL", cik="320193")
+
+        self.assertEqual(len(calls), 2)
+        self.assertIn("companyfacts", calls[1])
+
+    def test_amendment_without_facts_does_not_force_a_download(self):
+        submissions = self.submissions("0004")
+        recent = submissions["filings"]["recent"]
+        recent["form"].insert(0, "10-K/A")
+        recent["accessionNumber"].insert(0, "0010")
+        recent["filingDate"].insert(0, "2025-04-01")
+
+        def fake_get(url, headers, timeout):
+            if "submissions" in url:
+                return FakeResponse(submissions)
+            raise AssertionError("Company Facts must not be downloaded: " + url)
+
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            self.write_expired_facts_cache(root)
+            source = SECCompanyFactsSource(cache_dir=root, user_agent="FixtureTests/1.0", cache_ttl_seconds=60)
+            with patch("sec_company_facts.requests.get", side_effect=fake_get):
+                rows = source.fetch("AAPL", cik="320193")
+
+        self.assertEqual(rows[0]["revenue"], 170)
+
+    def test_failed_submissions_check_raises_without_downloading_facts(self):
+        calls = []
+
+        def fake_get(url, headers, timeout):
+            calls.append(url)
+            if "submissions" in url:
+                return FakeResponse({}, status_code=503)
+            raise AssertionError("Company Facts must not be downloaded: " + url)
+
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            self.write_expired_facts_cache(root)
+            source = SECCompanyFactsSource(cache_dir=root, user_agent="FixtureTests/1.0", cache_ttl_seconds=60)
+            with patch("sec_company_facts.requests.get", side_effect=fake_get):
+                with self.assertRaises(SECRequestError):
+                    source.fetch("AAPL", cik="320193")
+
+        self.assertEqual(len(calls), 1)
+
+    def test_cache_state_reports_facts_freshness_without_requests(self):
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp)
+            source = SECCompanyFactsSource(cache_dir=root, user_agent="FixtureTests/1.0", cache_ttl_seconds=60)
+            self.assertIsNone(source.cache_state("AAPL"))
+            source._write_cache(root / "company_tickers.json", {"0": {"cik_str": 320193, "ticker": "AAPL"}})
+            with patch("sec_company_facts.requests.get") as request:
+                self.assertEqual(source.cache_state("AAPL"), "cold")
+                self.write_expired_facts_cache(root)
+                self.assertEqual(source.cache_state("AAPL"), "cold")
+                source._write_cache(root / "companyfacts_0000320193.json", self.payload)
+                self.assertEqual(source.cache_state("AAPL"), "warm")
+
+        request.assert_not_called()
+
     def test_ticker_alias_matches_sec_dash_symbol(self):
         with tempfile.TemporaryDirectory() as temp:
             source = SECCompanyFactsSource(cache_dir=Path(temp), user_agent="FixtureTests/1.0")
@@ -194,5 +353,202 @@ class SECCompanyFactsSourceTests(unittest.TestCase):
             self.assertEqual(source.resolve_cik("BRK.B"), "0000320193")
 
 
+class StandInSECServer:
+    """Serve fixture documents by path from a local HTTP server."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.path)
+                body = server.documents.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                encoded = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = "http://127.0.0.1:" + str(self.httpd.server_address[1])
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def frame(tag, period, start, end, points, taxonomy="us-gaap"):
+    return {
+        "taxonomy": taxonomy,
+        "tag": tag,
+        "ccp": period,
+        "data": [
+            {"accn": "000" + str(cik), "cik": cik, "entityName": "Fixture", "start": start, "end": end, "val": value}
+            for cik, value in points
+        ],
+    }
+
+
+def concept(tag, observations):
+    return {
+        "taxonomy": "us-gaap",
+        "tag": tag,
+        "units": {
+            "USD": [
+                {"start": start, "end": end, "val": value, "fy": 2024, "fp": fp, "form": form, "filed": filed, "accn": "0001-" + fp}
+                for start, end, value, fp, form, filed in observations
+            ]
+        },
+    }
+
+
+def year_to_date(q1, h1, m9, year):
+    # Cash flow as most filers report it: Q1, then YTD, then the annual 10-K.
+    return [
+        ("2024-01-01", "2024-03-31", q1, "Q1", "10-Q", "2024-05-01"),
+        ("2024-01-01", "2024-06-30", h1, "Q2", "10-Q", "2024-08-01"),
+        ("2024-01-01", "2024-09-30", m9, "Q3", "10-Q", "2024-11-01"),
+        ("2024-01-01", "2024-12-31", year, "FY", "10-K", "2025-01-10"),
+    ]
+
+
+class SECFramesSourceTests(unittest.TestCase):
+    QUARTERS = {
+        "CY2024Q4": ("2024-10-01", "2024-12-31"),
+        "CY2024Q3": ("2024-07-01", "2024-09-30"),
+        "CY2024Q2": ("2024-04-01", "2024-06-30"),
+        "CY2024Q1": ("2024-01-01", "2024-03-31"),
+    }
+
+    def frame_documents(self, *, aapl_capex=True):
+        documents = {"/files/company_tickers.json": {
+            "0": {"cik_str": 320193, "ticker": "AAPL"},
+            "1": {"cik_str": 789019, "ticker": "MSFT"},
+        }}
+        concepts = (
+            ("RevenueFromContractWithCustomerExcludingAssessedTax", "USD", 100),
+            ("NetIncomeLoss", "USD", 20),
+            ("EarningsPerShareDiluted", "USD-per-shares", 2),
+            ("WeightedAverageNumberOfDilutedSharesOutstanding", "shares", 10),
+        )
+        for offset, (period, (start, end)) in enumerate(self.QUARTERS.items()):
+            for tag, unit, value in concepts:
+                points = [(320193, value + offset), (789019, value * 2)]
+                documents["/frames/us-gaap/" + tag + "/" + unit + "/" + period + ".json"] = frame(
+                    tag, period, start, end, points
+                )
+        for cik in ("0000320193", "0000789019"):
+            documents["/concept/CIK" + cik + "/NetCashProvidedByUsedInOperatingActivities.json"] = concept(
+                "NetCashProvidedByUsedInOperatingActivities", year_to_date(30, 60, 90, 130)
+            )
+            if cik != "0000320193" or aapl_capex:
+                documents["/concept/CIK" + cik + "/PaymentsToAcquirePropertyPlantAndEquipment.json"] = concept(
+                    "PaymentsToAcquirePropertyPlantAndEquipment", year_to_date(5, 10, 15, 20)
+                )
+        return documents
+
+    def source(self, root, server):
+        return SECFramesSource(
+            cache_dir=root,
+            user_agent="FixtureTests/1.0 contact@test.invalid",
+            ticker_url=server.base_url + "/files/company_tickers.json",
+            facts_url_template=server.base_url + "/companyfacts/CIK{cik}.json",
+            frames_url_template=server.base_url + "/frames/{taxonomy}/{tag}/{unit}/{period}.json",
+            concept_url_template=server.base_url + "/concept/CIK{cik}/{tag}.json",
+            frame_quarters=4,
+            clock=lambda: 1_736_899_200,  # 2025-01-15
+        )
+
+    def test_frames_fill_normalized_rows_for_every_issuer_with_shared_requests(self):
+        with tempfile.TemporaryDirectory() as temp, StandInSECServer(self.frame_documents()) as server:
+            source = self.source(Path(temp), server)
+            aapl = source.fetch("AAPL")
+            msft = source.fetch("MSFT")
+
+        frame_requests = [path for path in server.requests if path.startswith("/frames/")]
+        concept_requests = [path for path in server.requests if path.startswith("/concept/")]
+        # Quarterly concepts x periods, plus the 2024 annual and instant share frames.
+        self.assertEqual(len(frame_requests), 4 * 5 + 4 + 4)
+        self.assertEqual(len(concept_requests), 2 * 2)  # cash-flow concepts x issuers
+        self.assertFalse(any(path.startswith("/companyfacts/") for path in server.requests))
+        self.assertEqual([row["date"] for row in aapl], ["2024-12-31", "2024-09-30", "2024-06-30", "2024-03-31"])
+        self.assertEqual(aapl[0]["revenue"], 100)
+        self.assertEqual(aapl[3]["revenue"], 103)
+        # Q2/Q3 are differenced from year-to-date values and Q4 from the annual filing.
+        self.assertEqual([row["operatingCashFlow"] for row in aapl], [40, 30, 30, 30])
+        self.assertEqual(aapl[0]["freeCashFlow"], 35)
+        self.assertEqual(aapl[0]["capexSigned"], -5)
+        self.assertEqual(aapl[0]["filingDate"], "2025-01-10")
+        self.assertEqual(aapl[0]["cik"], "0000320193")
+        self.assertEqual((aapl[0]["source"], aapl[0]["sourceType"]), ("SEC XBRL Frames", "SEC_FRAMES"))
+        self.assertTrue(aapl[0]["sourceUrl"].endswith("/frames"))
+        self.assertEqual(msft[0]["revenue"], 200)
+        company_facts_row = normalize_company_facts(
+            json.loads(FIXTURE.read_text(encoding="utf-8")), "AAPL", "0000320193"
+        )[0]
+        self.assertEqual(set(aapl[0]), set(company_facts_row))
+
+    def test_fourth_quarter_reported_only_in_the_10k_is_derived_from_annual_frames(self):
+        documents = self.frame_documents()
+        documents["/files/company_tickers.json"]["2"] = {"cik_str": 1000, "ticker": "TENK"}
+        concepts = (
+            ("RevenueFromContractWithCustomerExcludingAssessedTax", "USD", 50, 230),
+            ("NetIncomeLoss", "USD", 5, 26),
+            ("EarningsPerShareDiluted", "USD-per-shares", 1, 5),
+            ("WeightedAverageNumberOfDilutedSharesOutstanding", "shares", 4, 4),
+        )
+        for tag, unit, quarterly, annual in concepts:
+            for period in ("CY2024Q1", "CY2024Q2", "CY2024Q3"):
+                path = "/frames/us-gaap/" + tag + "/" + unit + "/" + period + ".json"
+                documents[path]["data"].append(
+                    {"accn": "0001000", "cik": 1000, "start": self.QUARTERS[period][0], "end": self.QUARTERS[period][1], "val": quarterly}
+                )
+            documents["/frames/us-gaap/" + tag + "/" + unit + "/CY2024.json"] = frame(
+                tag, "CY2024", "2024-01-01", "2024-12-31", [(1000, annual)]
+            )
+        documents["/frames/dei/EntityCommonStockSharesOutstanding/shares/CY2024Q4I.json"] = frame(
+            "EntityCommonStockSharesOutstanding", "CY2024Q4I", None, "2024-10-25", [(1000, 4)], taxonomy="dei"
+        )
+        for tag in ("NetCashProvidedByUsedInOperatingActivities", "PaymentsToAcquirePropertyPlantAndEquipment"):
+            documents["/concept/CIK0000001000/" + tag + ".json"] = concept(tag, year_to_date(30, 60, 90, 130))
+
+        with tempfile.TemporaryDirectory() as temp, StandInSECServer(documents) as server:
+            rows = self.source(Path(temp), server).fetch("TENK")
+
+        self.assertFalse(any(path.startswith("/companyfacts/") for path in server.requests))
+        self.assertEqual(rows[0]["sourceType"], "SEC_FRAMES")
+        self.assertEqual([row["date"] for row in rows], ["2024-12-31", "2024-09-30", "2024-06-30", "2024-03-31"])
+        self.assertEqual(rows[0]["revenue"], 80)
+        self.assertEqual(rows[0]["netIncome"], 11)
+        self.assertEqual(rows[0]["eps"], 2)
+        self.assertEqual(rows[0]["shares"], 4)
+
+    def test_issuer_missing_a_required_concept_falls_back_to_company_facts(self):
+        documents = self.frame_documents(aapl_capex=False)
+        documents["/companyfacts/CIK0000320193.json"] = json.loads(FIXTURE.read_text(encoding="utf-8"))
+        with tempfile.TemporaryDirectory() as temp, StandInSECServer(documents) as server:
+            rows = self.source(Path(temp), server).fetch("AAPL")
+
+        self.assertIn("/companyfacts/CIK0000320193.json", server.requests)
+        self.assertEqual(rows[0]["revenue"], 170)
+        self.assertIn("companyfacts", rows[0]["sourceUrl"])
+        self.assertEqual(rows[0]["sourceType"], "SEC_COMPANY_FACTS")
+
+
 if __name__ == "__main__":
     unittest.main()
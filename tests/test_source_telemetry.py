@@ -0,0 +1,127 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from financial_source_router import FMPCircuitBreaker, FMPRateLimitError, FinancialSourceRouter
+from sec_company_facts import SECCompanyFactsSource, SECTickerNotFoundError
+from source_telemetry import LATENCY_BUCKETS_MS, SourceTelemetry, measure
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "sec_aapl_companyfacts.json"
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def json(self):
+        return self.payload
+
+
+class SteppingClock:
+    def __init__(self, step):
+        self.value = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.value += self.step
+        return self.value
+
+
+class SourceTelemetryTests(unittest.TestCase):
+    def test_requests_fill_run_and_symbol_histograms(self):
+        telemetry = SourceTelemetry(clock=lambda: 1_736_899_200, perf_counter=SteppingClock(0.2))
+
+        with telemetry.symbol_scope("aapl"):
+            with measure(telemetry, "sec") as record:
+                record.observe(FakeResponse({"ok": True}))
+        with self.assertRaises(RuntimeError):
+            with measure(telemetry, "sec", symbol="MSFT"):
+                raise RuntimeError("boom")
+        telemetry.record_cache("sec", "expired", symbol="AAPL")
+
+        snapshot = telemetry.snapshot()
+        run = snapshot["run"]["sec"]
+        self.assertEqual(run["requests"], 2)
+        self.assertEqual(run["errors"], 1)
+        self.assertEqual(run["bytes"], len(b'{"ok": true}'))
+        self.assertEqual(run["statusCodes"], {"200": 1})
+        self.assertEqual(run["latencyMs"]["count"], 2)
+        self.assertEqual(run["latencyMs"]["buckets"][LATENCY_BUCKETS_MS.index(250)], 2)
+        self.assertEqual(snapshot["symbols"]["AAPL"]["sources"]["sec"]["cache"]["expired"], 1)
+        self.assertEqual(snapshot["symbols"]["MSFT"]["sources"]["sec"]["errors"], 1)
+        self.assertIsNone(telemetry.current_symbol)
+
+    def test_symbol_scope_is_thread_local(self):
+        telemetry = SourceTelemetry()
+        seen = []
+        with telemetry.symbol_scope("AAPL"):
+            worker = threading.Thread(target=lambda: seen.append(telemetry.current_symbol))
+            worker.start()
+            worker.join()
+        self.assertEqual(seen, [None])
+
+    def test_write_emits_machine_readable_metrics(self):
+        telemetry = SourceTelemetry(clock=lambda: 1_736_899_200)
+        telemetry.record_breaker_trip("fmp", symbol="XYZ")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = telemetry.write(Path(tmpdir) / "results" / "source_metrics.json")
+            payload = json.loads(path.read_text(encoding="utf-8"))
+
+        self.assertEqual(payload["schemaVersion"], "1.0")
+        self.assertEqual(payload["generatedAt"], "2025-01-15T00:00:00Z")
+        self.assertEqual(payload["run"]["fmp"]["breakerTrips"], 1)
+        self.assertEqual(payload["symbols"]["XYZ"]["sources"]["fmp"]["breakerTrips"], 1)
+
+
+class SourceTelemetryIntegrationTests(unittest.TestCase):
+    def test_router_scope_attributes_sec_requests_and_cache_to_symbol(self):
+        facts = json.loads(FIXTURE.read_text(encoding="utf-8"))
+        tickers = {"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}}
+        telemetry = SourceTelemetry(clock=lambda: 1_736_899_200)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = SECCompanyFactsSource(
+                cache_dir=Path(tmpdir),
+                user_agent="FixtureTests/1.0",
+                clock=lambda: 1_736_899_200,
+                telemetry=telemetry,
+            )
+            router = FinancialSourceRouter(sec_source=source, clock=lambda: 1_736_899_200, telemetry=telemetry)
+
+            def fake_get(url, headers=None, timeout=None):
+                return FakeResponse(tickers if "company_tickers" in url else facts)
+
+            with patch("sec_company_facts.requests.get", side_effect=fake_get):
+                router.route("AAPL")
+
+        symbol = telemetry.snapshot()["symbols"]["AAPL"]
+        self.assertEqual(symbol["route"]["sourceType"], "SEC_COMPANY_FACTS")
+        self.assertEqual(symbol["route"]["outcome"], "ok")
+        self.assertEqual(symbol["sources"]["sec"]["requests"], 2)
+        self.assertEqual(symbol["sources"]["sec"]["cache"]["miss"], 2)
+        self.assertGreater(symbol["sources"]["sec"]["bytes"], 0)
+
+    def test_breaker_trip_is_recorded_for_fmp_lane(self):
+        telemetry = SourceTelemetry()
+        router = FinancialSourceRouter(
+            sec_fetcher=Mock(side_effect=SECTickerNotFoundError("not covered")),
+            fmp_fetcher=Mock(side_effect=FMPRateLimitError("429")),
+            fmp_circuit_breaker=FMPCircuitBreaker(cooldown_seconds=300, clock=lambda: 10.0, telemetry=telemetry),
+            telemetry=telemetry,
+        )
+
+        with self.assertRaises(FMPRateLimitError):
+            router.route("XYZ")
+
+        snapshot = telemetry.snapshot()
+        self.assertEqual(snapshot["run"]["fmp"]["breakerTrips"], 1)
+        self.assertEqual(snapshot["symbols"]["XYZ"]["route"]["error"], "FMPRateLimitError")
+
+
+if __name__ == "__main__":
+    unittest.main()
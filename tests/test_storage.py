@@ -0,0 +1,147 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import fmp_cache
+from sec_company_facts import SECCompanyFactsSource
+from storage import JsonFileStore, SQLiteDatabase, StorageError, export_json, file_lock
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FileLockTests(unittest.TestCase):
+    @unittest.skipIf(fcntl is None, "advisory locks need fcntl")
+    def test_lock_excludes_other_holders_until_released(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "nested" / "side.json"
+            with file_lock(path):
+                with open(path.with_name("side.json.lock"), "a", encoding="utf-8") as other:
+                    with self.assertRaises(BlockingIOError):
+                        fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            with open(path.with_name("side.json.lock"), "a", encoding="utf-8") as other:
+                fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(other.fileno(), fcntl.LOCK_UN)
+
+
+class SQLiteStoreTests(unittest.TestCase):
+    def test_batched_writes_commit_together_and_queries_use_the_key(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            database = SQLiteDatabase(Path(tmpdir) / "store.sqlite3", clock=Clock(1000.0))
+            store = database.namespace("fmp")
+            with store.transaction():
+                for day in ("2025-09-30", "2025-12-31"):
+                    store.put(f"XYZ/income_q4/{day}", {"date": day}, symbol="XYZ", kind="income_q4", date=day)
+                store.put("ABC/income_q4/2025-12-31", {"date": "2025-12-31"}, symbol="ABC", kind="income_q4", date="2025-12-31")
+            with self.assertRaises(RuntimeError):
+                with store.transaction():
+                    store.put("XYZ/income_q4/2026-03-31", {"date": "2026-03-31"}, symbol="XYZ", kind="income_q4", date="2026-03-31")
+                    raise RuntimeError("abort")
+
+            self.assertEqual([doc.date for doc in store.query(symbol="XYZ", kind="income_q4")], ["2025-12-31", "2025-09-30"])
+            self.assertEqual(store.get("ABC/income_q4/2025-12-31").payload, {"date": "2025-12-31"})
+            self.assertIsNone(database.namespace("sec").get("ABC/income_q4/2025-12-31"))
+            self.assertEqual(store.delete(symbol="ABC"), 1)
+            self.assertEqual(store.symbols(), ["XYZ"])
+            mode = database.connection().execute("PRAGMA journal_mode").fetchone()[0]
+            database.close()
+        self.assertEqual(mode, "wal")
+
+    def test_export_writes_the_json_layout_with_update_times(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            database = SQLiteDatabase(root / "store.sqlite3")
+            results = database.namespace("results")
+            results.put("AAPL/valuation_summary.json", {"ticker": "AAPL"}, symbol="AAPL", updated_at=1_000_000.0)
+
+            self.assertEqual(export_json(results, root / "results", indent=4), 1)
+            exported = root / "results" / "AAPL" / "valuation_summary.json"
+            self.assertEqual(exported.read_text(encoding="utf-8"), json.dumps({"ticker": "AAPL"}, indent=4))
+            self.assertEqual(exported.stat().st_mtime, 1_000_000.0)
+            self.assertEqual(JsonFileStore(root / "results").get("AAPL/valuation_summary.json").updated_at, 1_000_000.0)
+            (root / "bad.json").write_text("{", encoding="utf-8")
+            with self.assertRaises(StorageError):
+                JsonFileStore(root).get("bad.json")
+            database.close()
+
+
+class SQLiteBackedCacheTests(unittest.TestCase):
+    def test_sec_cache_ttl_reads_the_stored_update_time(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            database = SQLiteDatabase(Path(tmpdir) / "store.sqlite3")
+            clock = Clock(1_000_000.0)
+            source = SECCompanyFactsSource(
+                cache_dir=Path(tmpdir) / "unused",
+                user_agent="FixtureTests/1.0",
+                clock=clock,
+                cache_ttl_seconds=60,
+                store=database.namespace("sec"),
+            )
+            database.namespace("sec").put(
+                "company_tickers.json", {"0": {"cik_str": 320193, "ticker": "AAPL"}}, kind="company_tickers", updated_at=clock.now
+            )
+            with patch("sec_company_facts.requests.get", side_effect=AssertionError("network")):
+                self.assertEqual(source.resolve_cik("AAPL"), "0000320193")
+            clock.now += 120
+            self.assertIsNone(source._load_cache(source._cache_path("company_tickers.json")))
+            self.assertFalse((Path(tmpdir) / "unused").exists())
+            database.close()
+
+    def test_sec_company_facts_are_indexed_by_ticker(self):
+        facts = json.loads((Path(__file__).parent / "fixtures" / "sec_aapl_companyfacts.json").read_text(encoding="utf-8"))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            database = SQLiteDatabase(Path(tmpdir) / "store.sqlite3")
+            store = database.namespace("sec")
+            source = SECCompanyFactsSource(cache_dir=Path(tmpdir), user_agent="FixtureTests/1.0", store=store)
+            response = Mock(status_code=200)
+            response.json.return_value = facts
+            with patch("sec_company_facts.requests.get", return_value=response):
+                source.fetch("AAPL", cik="320193")
+
+            self.assertEqual(
+                [(doc.name, doc.kind) for doc in store.query(symbol="AAPL")],
+                [("companyfacts_0000320193.json", "companyfacts"), ("companyfacts_0000320193.state.json", "companyfacts.state")],
+            )
+            database.close()
+
+    def test_fmp_cache_imports_json_once_and_exports_the_same_store(self):
+        rows = {
+            "income-statement_q4": [{"date": "2025-12-31", "period": "Q4", "revenue": 10}],
+            "income-statement_q3": [{"date": "2025-09-30", "period": "Q3", "revenue": 9}],
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            for key, records in rows.items():
+                fmp_cache.write_statement(root / "json" / "XYZ", key, records)
+            database = SQLiteDatabase(root / "store.sqlite3")
+            fmp_cache.configure_store(database.namespace("fmp"))
+            try:
+                self.assertEqual(fmp_cache.load_statements(root / "json" / "XYZ"), rows)
+                updated = [{"date": "2026-03-31", "period": "Q4", "revenue": 12}, *rows["income-statement_q4"]]
+                manifest = fmp_cache.write_statement(root / "json" / "XYZ", "income-statement_q4", updated)
+                queried = database.namespace("fmp").query(symbol="XYZ", kind="income-statement_q4")
+                self.assertEqual(fmp_cache.export_store(root / "exported"), 1)
+            finally:
+                fmp_cache.configure_store(None)
+            exported = fmp_cache.load_statements(root / "exported" / "XYZ")
+            database.close()
+
+        self.assertEqual([doc.date for doc in queried], ["2026-03-31", "2025-12-31"])
+        self.assertEqual(manifest["statements"]["income-statement_q4"]["records"], 2)
+        self.assertEqual(exported, {**rows, "income-statement_q4": updated})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import storage
+from ticker_scheduler import TickerScheduler, cache_state
+
+
+def scheduler(history, path=None):
+    return TickerScheduler(path=path or Path("/nonexistent/run_costs.json"), clock=lambda: 1767225600.0, history=history)
+
+
+class TickerSchedulerTests(unittest.TestCase):
+    def test_longest_first_order_and_lpt_makespan(self):
+        costs = scheduler({
+            "SEC": {"seconds": 0.2, "sourceType": "SEC_COMPANY_FACTS"},
+            "FMP": {"seconds": 40.0, "sourceType": "FMP"},
+            "TSM": {"seconds": 90.0, "sourceType": "SEC_FOREIGN_IFRS"},
+            "KO": {"seconds": 30.0, "sourceType": "FMP"},
+            "NEW": {"sourceType": "FMP"},
+        })
+
+        plan = costs.plan(["SEC", "FMP", "TSM", "KO", "NEW", "UNSEEN"], workers=2)
+
+        self.assertEqual(plan.order, ["TSM", "UNSEEN", "FMP", "NEW", "KO", "SEC"])
+        self.assertEqual(costs.estimate("NEW").basis, "lane")
+        self.assertEqual(costs.estimate("NEW").seconds, 35.0)
+        self.assertEqual((costs.estimate("UNSEEN").basis, costs.estimate("UNSEEN").seconds), ("unseen", 90.0))
+        self.assertEqual([costs.estimate(symbol).lane for symbol in ("SEC", "TSM", "KO", "UNSEEN")], ["sec", "foreign", "fmp", "sec"])
+        # The serial FMP lane runs FMP, NEW and KO back to back after TSM.
+        self.assertAlmostEqual(plan.makespan_seconds, 195.0)
+        self.assertAlmostEqual(plan.lower_bound_seconds, 285.2 / 2)
+        self.assertEqual([cost.symbol for cost in plan.critical_path], ["TSM", "FMP", "NEW", "KO"])
+        self.assertIn("predicted makespan 195.0s", plan.describe())
+
+        # Without lane caps the plan is plain LPT packing on the workers.
+        unbounded = costs.plan(["SEC", "FMP", "TSM", "KO", "NEW", "UNSEEN"], workers=2, lane_limits={"fmp": 8, "foreign": 8, "sec": 8})
+        self.assertAlmostEqual(unbounded.makespan_seconds, 155.0)
+        self.assertEqual([cost.symbol for cost in unbounded.critical_path], ["UNSEEN", "NEW", "KO"])
+
+    def test_lane_caps_bound_the_makespan_with_idle_workers(self):
+        history = {f"F{index}": {"seconds": 10.0, "sourceType": "FMP"} for index in range(3)}
+        history.update({f"T{index}": {"seconds": 10.0, "sourceType": "SEC_FOREIGN_IFRS"} for index in range(4)})
+
+        plan = scheduler(history).plan(sorted(history), workers=8)
+
+        self.assertAlmostEqual(plan.makespan_seconds, 30.0)
+        self.assertAlmostEqual(plan.lower_bound_seconds, 30.0)
+        self.assertEqual(len(plan.critical_path), 3)
+        self.assertEqual({cost.lane for cost in plan.critical_path}, {"fmp"})
+
+    def test_current_cache_state_reorders_tickers_recorded_in_another_state(self):
+        history = {
+            "WARM": {"seconds": 0.5, "sourceType": "SEC_COMPANY_FACTS", "cacheState": "warm"},
+            "COLD": {"seconds": 6.0, "sourceType": "SEC_COMPANY_FACTS", "cacheState": "cold"},
+            "MID": {"seconds": 3.0, "sourceType": "SEC_COMPANY_FACTS", "cacheState": "cold"},
+            "STALE": {"seconds": 0.4, "sourceType": "SEC_COMPANY_FACTS", "cacheState": "warm"},
+        }
+        symbols = ["WARM", "COLD", "MID", "STALE"]
+        self.assertEqual(scheduler(history).order(symbols), ["COLD", "MID", "WARM", "STALE"])
+
+        # STALE's cache has expired since its warm run, and COLD's has been
+        # filled: each is costed from peers recorded in its current state.
+        current = {"WARM": "warm", "COLD": "warm", "MID": "cold", "STALE": "cold"}
+        costs = scheduler(history)
+        costs.cache_probe = current.get
+
+        self.assertEqual(costs.order(symbols), ["STALE", "MID", "WARM", "COLD"])
+        self.assertEqual((costs.estimate("STALE").basis, costs.estimate("STALE").seconds), ("cache", 4.5))
+        self.assertEqual((costs.estimate("COLD").basis, costs.estimate("COLD").seconds), ("cache", 0.45))
+        self.assertEqual(costs.estimate("MID").basis, "history")
+
+    def test_telemetry_updates_smoothed_history_and_write_keeps_other_shards(self):
+        snapshot = {
+            "symbols": {
+                "AAPL": {
+                    "route": {"sourceType": "SEC_COMPANY_FACTS", "latencyMs": 3000.0, "outcome": "ok"},
+                    "sources": {"sec": {"cache": {"hit": 1, "miss": 1}}},
+                },
+                "BAD": {"route": {"latencyMs": 9000.0, "outcome": "error"}, "sources": {}},
+            }
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "run_costs.json"
+            path.write_text(json.dumps({"schemaVersion": "1.0", "tickers": {"MSFT": {"seconds": 5.0}}}), encoding="utf-8")
+            costs = scheduler({"AAPL": {"seconds": 1.0, "runs": 2}}, path=path)
+
+            self.assertEqual(costs.record_telemetry(snapshot), 1)
+            costs.write()
+            written = json.loads(path.read_text(encoding="utf-8"))["tickers"]
+
+        self.assertEqual(sorted(written), ["AAPL", "MSFT"])
+        self.assertEqual(written["AAPL"]["seconds"], 2.0)
+        self.assertEqual(written["AAPL"]["lastSeconds"], 3.0)
+        self.assertEqual((written["AAPL"]["runs"], written["AAPL"]["cacheState"]), (3, "mixed"))
+
+    def test_write_does_not_restore_stale_copies_of_other_shards_entries(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "run_costs.json"
+            path.write_text(json.dumps({"schemaVersion": "1.0", "tickers": {"MSFT": {"seconds": 5.0}}}), encoding="utf-8")
+            first = TickerScheduler(path=path, clock=lambda: 1767225600.0)
+            second = TickerScheduler(path=path, clock=lambda: 1767225600.0)
+
+            second.record("MSFT", 9.0)
+            second.write()
+            first.record("AAPL", 1.0)
+            first.write()
+            written = json.loads(path.read_text(encoding="utf-8"))["tickers"]
+
+        self.assertEqual(sorted(written), ["AAPL", "MSFT"])
+        self.assertEqual(written["MSFT"]["lastSeconds"], 9.0)
+
+    @unittest.skipIf(storage.fcntl is None, "the side-file lock needs fcntl")
+    def test_simultaneous_shard_writes_keep_every_observation(self):
+        read = TickerScheduler._read
+
+        def slow_read(costs):
+            # Widen the read-merge-replace window so unlocked writers overlap.
+            history = read(costs)
+            time.sleep(0.01)
+            return history
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "run_costs.json"
+            shards = [TickerScheduler(path=path, clock=lambda: 1767225600.0) for _ in range(6)]
+            for index, shard in enumerate(shards):
+                shard.record("S" + str(index), 1.0)
+            with patch.object(TickerScheduler, "_read", slow_read):
+                threads = [threading.Thread(target=shard.write) for shard in shards]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            written = json.loads(path.read_text(encoding="utf-8"))["tickers"]
+
+        self.assertEqual(sorted(written), ["S" + str(index) for index in range(6)])
+
+    def test_unreadable_history_falls_back_to_default_costs(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "run_costs.json"
+            path.write_text("{not json", encoding="utf-8")
+            costs = TickerScheduler(path=path)
+
+        self.assertEqual(costs.order(["A", "B"]), ["A", "B"])
+        self.assertEqual(costs.estimate("A").basis, "default")
+        self.assertEqual(cache_state({"hit": 2}), "warm")
+        self.assertIsNone(cache_state({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
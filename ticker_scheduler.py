@@ -0,0 +1,368 @@
+"""Cost-aware ordering for the per-ticker source routing phase.
+
+Routing cost varies by orders of magnitude across the universe: a ticker
+served from a fresh SEC cache routes in milliseconds, while an FMP fallback
+or a foreign filer can take minutes.  Submitting work in registry order lets
+a slow ticker start last and stretch the run long after the other workers
+have gone idle.
+
+The scheduler keeps per-ticker cost history in ``run_costs.json``: the last
+route latency (smoothed), the source lane that served it and the cache
+state its sources reported.  It orders work longest-first (the LPT rule),
+which keeps the makespan within 4/3 of optimal, and predicts the critical
+path before the run begins.  The prediction replays the router's batch:
+workers take tickers in order and then wait for a slot in their source
+lane, so a serial FMP lane can set the makespan on its own.
+
+Estimates fail toward caution.  A ticker without history is assumed to
+start cold and is costed at a high percentile of known costs, so new
+coverage is started early rather than discovered late.  A history recorded
+under a different cache state than the SEC cache is in now is replaced by
+the cost of lane peers recorded in the current state; a warm history for a
+ticker whose cache has since gone cold is never costed below the unseen
+percentile.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from financial_source_router import DEFAULT_LANE_LIMITS, FMP_SOURCE_TYPE
+from foreign_issuer_coverage import SEC_FOREIGN_SOURCE_TYPE
+from storage import file_lock
+
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_COSTS_PATH = BASE_DIR / "data" / "results" / "run_costs.json"
+COSTS_SCHEMA_VERSION = "1.0"
+# Weight of the newest observation in the smoothed duration.
+DEFAULT_SMOOTHING = 0.5
+# Unseen tickers are costed at this percentile of known costs.
+UNSEEN_COST_PERCENTILE = 0.9
+# Used only when there is no history at all.
+DEFAULT_COST_SECONDS = 1.0
+
+
+def _iso(value: float) -> str:
+    stamp = datetime.fromtimestamp(float(value), tz=timezone.utc)
+    return stamp.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def source_lane(source_type: Optional[str]) -> str:
+    """Return the router lane that served ``source_type``.
+
+    Unknown tickers are routed through SEC first, so they count against
+    the SEC lane.
+    """
+
+    if source_type == SEC_FOREIGN_SOURCE_TYPE:
+        return "foreign"
+    if source_type == FMP_SOURCE_TYPE:
+        return "fmp"
+    return "sec"
+
+
+def cache_state(cache_counts: Mapping[str, Any]) -> Optional[str]:
+    """Summarize one symbol's cache outcomes as ``warm``, ``cold`` or ``mixed``."""
+
+    served = sum(int(cache_counts.get(outcome) or 0) for outcome in ("hit", "revalidated", "deferred"))
+    fetched = sum(int(cache_counts.get(outcome) or 0) for outcome in ("miss", "expired"))
+    if not served and not fetched:
+        return None
+    if not fetched:
+        return "warm"
+    return "cold" if not served else "mixed"
+
+
+@dataclass(frozen=True)
+class TickerCost:
+    symbol: str
+    seconds: float
+    basis: str
+    lane: str = "sec"
+
+
+@dataclass(frozen=True)
+class SchedulePlan:
+    """Longest-first order plus the predicted per-worker packing."""
+
+    order: List[str]
+    workers: int
+    makespan_seconds: float
+    lower_bound_seconds: float
+    critical_path: List[TickerCost]
+
+    def describe(self) -> str:
+        path = ", ".join(f"{cost.symbol} {cost.seconds:.1f}s" for cost in self.critical_path[:5])
+        if len(self.critical_path) > 5:
+            path += f", +{len(self.critical_path) - 5} more"
+        return (
+            f"Schedule: {len(self.order)} tickers on {self.workers} workers; "
+            f"predicted makespan {self.makespan_seconds:.1f}s "
+            f"(lower bound {self.lower_bound_seconds:.1f}s); critical path: {path or 'none'}"
+        )
+
+
+@dataclass
+class TickerScheduler:
+    """Order tickers by expected routing cost from previous runs."""
+
+    path: Path = DEFAULT_COSTS_PATH
+    clock: Callable[[], float] = time.time
+    smoothing: float = DEFAULT_SMOOTHING
+    history: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Reports a symbol's current SEC cache state (``warm``/``cold``), if
+    # known; consulted only for tickers the SEC lane serves.
+    cache_probe: Optional[Callable[[str], Optional[str]]] = None
+
+    def __post_init__(self) -> None:
+        if not 0 < self.smoothing <= 1:
+            raise ValueError("scheduler smoothing must be in (0, 1]")
+        self.path = Path(self.path)
+        self._lock = threading.Lock()
+        self._changed: Set[str] = set()
+        if not self.history:
+            self.history = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        # A missing or unreadable history only costs scheduling quality.
+        try:
+            body = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        tickers = body.get("tickers") if isinstance(body, dict) else None
+        if not isinstance(body, dict) or body.get("schemaVersion") != COSTS_SCHEMA_VERSION or not isinstance(tickers, dict):
+            return {}
+        return {str(symbol).upper(): entry for symbol, entry in tickers.items() if isinstance(entry, dict)}
+
+    def _known_costs(self) -> List[float]:
+        return [
+            float(entry["seconds"])
+            for entry in self.history.values()
+            if isinstance(entry.get("seconds"), (int, float)) and entry["seconds"] >= 0
+        ]
+
+    def estimate(self, symbol: str) -> TickerCost:
+        symbol = str(symbol).upper()
+        entry = self.history.get(symbol) or {}
+        lane = source_lane(entry.get("sourceType"))
+        seconds = entry.get("seconds")
+        known = self._known_costs()
+        if isinstance(seconds, (int, float)) and seconds >= 0:
+            current = self.cache_probe(symbol) if self.cache_probe is not None and lane == "sec" else None
+            recorded = entry.get("cacheState")
+            if current is None or recorded is None or current == recorded:
+                return TickerCost(symbol, float(seconds), "history", lane)
+            peers = [
+                float(other["seconds"])
+                for other in self.history.values()
+                if source_lane(other.get("sourceType")) == lane
+                and other.get("cacheState") == current
+                and isinstance(other.get("seconds"), (int, float))
+            ]
+            if peers:
+                return TickerCost(symbol, statistics.median(peers), "cache", lane)
+            if current == "cold":
+                return TickerCost(symbol, max(float(seconds), _percentile(known, UNSEEN_COST_PERCENTILE)), "cache", lane)
+            return TickerCost(symbol, float(seconds), "history", lane)
+        peers = [
+            float(other["seconds"])
+            for other in self.history.values()
+            if entry.get("sourceType")
+            and other.get("sourceType") == entry.get("sourceType")
+            and isinstance(other.get("seconds"), (int, float))
+        ]
+        if peers:
+            return TickerCost(symbol, statistics.median(peers), "lane", lane)
+        if known:
+            return TickerCost(symbol, _percentile(known, UNSEEN_COST_PERCENTILE), "unseen", lane)
+        return TickerCost(symbol, DEFAULT_COST_SECONDS, "default", lane)
+
+    def order(self, symbols: Iterable[str]) -> List[str]:
+        """Return ``symbols`` longest-first; ties keep their input order."""
+
+        symbols = list(symbols)
+        costs = [self.estimate(symbol).seconds for symbol in symbols]
+        ranked = sorted(range(len(symbols)), key=lambda index: (-costs[index], index))
+        return [symbols[index] for index in ranked]
+
+    def plan(
+        self,
+        symbols: Iterable[str],
+        workers: int,
+        *,
+        lane_limits: Optional[Mapping[str, int]] = None,
+    ) -> SchedulePlan:
+        """Predict the batch the router runs for ``symbols``.
+
+        Like ``route_many``, each worker takes the next ticker in order and
+        holds it while waiting for a slot in its lane.  The critical path is
+        the chain of routes, each started by the previous one finishing,
+        that ends last.
+        """
+
+        if workers <= 0:
+            raise ValueError("schedule worker count must be positive")
+        limits = dict(DEFAULT_LANE_LIMITS)
+        limits.update(lane_limits or {})
+        if any(int(value) <= 0 for value in limits.values()):
+            raise ValueError("source lane limits must be positive")
+        order = self.order(symbols)
+        costs = [self.estimate(symbol) for symbol in order]
+        running: Dict[str, int] = {lane: 0 for lane in limits}
+        waiting: Dict[str, Deque[int]] = {lane: deque() for lane in limits}
+        # (finish time, start sequence, ticker index)
+        finishing: List[Tuple[float, int, int]] = []
+        previous: Dict[int, Optional[int]] = {}
+        started = 0
+        queued = 0
+        now = 0.0
+
+        def start(index: int, after: Optional[int]) -> None:
+            nonlocal started
+            running[costs[index].lane] += 1
+            previous[index] = after
+            heapq.heappush(finishing, (now + costs[index].seconds, started, index))
+            started += 1
+
+        def take(after: Optional[int]) -> None:
+            # A free worker takes the next ticker and waits for its lane.
+            nonlocal queued
+            if queued >= len(costs):
+                return
+            index, queued = queued, queued + 1
+            lane = costs[index].lane
+            if running[lane] < limits[lane]:
+                start(index, after)
+            else:
+                waiting[lane].append(index)
+
+        for _ in range(min(workers, len(costs))):
+            take(None)
+        last: Optional[int] = None
+        while finishing:
+            now, _, index = heapq.heappop(finishing)
+            last = index
+            lane = costs[index].lane
+            running[lane] -= 1
+            if waiting[lane]:
+                start(waiting[lane].popleft(), index)
+            take(index)
+        critical: List[TickerCost] = []
+        while last is not None:
+            critical.append(costs[last])
+            last = previous[last]
+        critical.reverse()
+        total = sum(cost.seconds for cost in costs)
+        longest = max((cost.seconds for cost in costs), default=0.0)
+        lane_bounds = [
+            sum(cost.seconds for cost in costs if cost.lane == lane) / limits[lane]
+            for lane in {cost.lane for cost in costs}
+        ]
+        return SchedulePlan(
+            order=order,
+            workers=workers,
+            makespan_seconds=now,
+            lower_bound_seconds=max([longest, total / workers, *lane_bounds]),
+            critical_path=critical,
+        )
+
+    def record(
+        self,
+        symbol: str,
+        seconds: float,
+        *,
+        source_type: Optional[str] = None,
+        cache: Optional[str] = None,
+    ) -> None:
+        symbol = str(symbol).upper()
+        with self._lock:
+            entry = dict(self.history.get(symbol) or {})
+            observed = max(0.0, float(seconds))
+            previous = entry.get("seconds")
+            smoothed = observed
+            if isinstance(previous, (int, float)):
+                smoothed = self.smoothing * observed + (1 - self.smoothing) * float(previous)
+            entry.update(
+                seconds=round(smoothed, 3),
+                lastSeconds=round(observed, 3),
+                runs=int(entry.get("runs") or 0) + 1,
+                updatedAt=_iso(self.clock()),
+            )
+            if source_type:
+                entry["sourceType"] = source_type
+            if cache:
+                entry["cacheState"] = cache
+            self.history[symbol] = entry
+            self._changed.add(symbol)
+
+    def record_telemetry(self, snapshot: Mapping[str, Any]) -> int:
+        """Fold the successful routes of a telemetry snapshot into the history."""
+
+        recorded = 0
+        for symbol, entry in (snapshot.get("symbols") or {}).items():
+            route = entry.get("route") if isinstance(entry, dict) else None
+            if not isinstance(route, dict) or route.get("outcome") != "ok":
+                continue
+            cache_counts: Dict[str, int] = {}
+            for stats in (entry.get("sources") or {}).values():
+                for outcome, count in (stats.get("cache") or {}).items():
+                    cache_counts[outcome] = cache_counts.get(outcome, 0) + int(count or 0)
+            self.record(
+                symbol,
+                float(route.get("latencyMs") or 0.0) / 1000.0,
+                source_type=route.get("sourceType"),
+                cache=cache_state(cache_counts),
+            )
+            recorded += 1
+        return recorded
+
+    def write(self) -> Path:
+        """Atomically write the symbols recorded here over a fresh read of the file.
+
+        The read, merge and replace hold a ``file_lock``, so shards finishing
+        together cannot drop each other's observations.
+        """
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, file_lock(self.path):
+            # Concurrent shards may have written since the history was
+            # loaded; only this run's observations replace theirs.
+            merged = self._read()
+            merged.update((symbol, self.history[symbol]) for symbol in self._changed)
+            self._changed.clear()
+            body = {
+                "schemaVersion": COSTS_SCHEMA_VERSION,
+                "updatedAt": _iso(self.clock()),
+                "tickers": dict(sorted(merged.items())),
+            }
+            temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_text(json.dumps(body, indent=2), encoding="utf-8")
+            os.replace(temp_path, self.path)
+        return self.path
+
+
+__all__ = [
+    "COSTS_SCHEMA_VERSION",
+    "DEFAULT_COSTS_PATH",
+    "SchedulePlan",
+    "TickerCost",
+    "TickerScheduler",
+    "cache_state",
+    "source_lane",
+]
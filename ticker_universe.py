@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import re
 from pathlib import Path
@@ -10,6 +11,7 @@ from typing import Any
 
 REGISTRY_SCHEMA_VERSION = "1.0"
 SYMBOL_RE = re.compile(r"^[A-Z0-9][A-Z0-9.-]{0,14}$")
+SHARD_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
 
 # Yahoo uses the current listed symbol, while the valuation cache still uses
 # the legacy `SQ` key. Block changed NYSE `SQ` to `XYZ` effective 2025-01-21;
@@ -110,3 +112,30 @@ def resolve_tickers(explicit_symbols: str | None = None, registry_path: Path | N
             raise UniverseValidationError("--symbols must contain at least one ticker")
         return deduplicate_symbols(values)
     return deduplicate_symbols([*DEFAULT_TICKERS, *load_registry_symbols(registry_path)])
+
+
+def parse_shard(value: Any) -> tuple[int, int]:
+    """Parse a 1-based ``i/N`` shard selector."""
+
+    match = SHARD_RE.fullmatch(str(value or ""))
+    if not match:
+        raise UniverseValidationError(f"Shard must look like i/N, got {value!r}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise UniverseValidationError(f"Shard {index}/{count} is out of range")
+    return index, count
+
+
+def shard_index(symbol: Any, count: int) -> int:
+    """Return the 1-based shard owning ``symbol``.
+
+    The partition hashes the symbol alone, so a ticker stays on the same shard
+    across runs and machines regardless of universe order or size.
+    """
+
+    digest = hashlib.sha256(normalize_symbol(symbol).encode("ascii")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def select_shard(symbols: list[str], index: int, count: int) -> list[str]:
+    return [symbol for symbol in symbols if shard_index(symbol, count) == index]